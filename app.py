@@ -1,6 +1,7 @@
 import streamlit as st
-from db import get_user_by_email
+from auth import get_user_role
 from pages.admin_dashboard import show_admin_dashboard
+from utils.contest_rollup import get_contest_rollup_refresher
 
 
 # Функция для загрузки CSS-файла
@@ -12,6 +13,9 @@ def load_css(file_path):
 # Загружаем глобальные стили
 load_css("styles/global.css")
 
+# Фоновый пересчёт сводки хакатонов запускается один раз на процесс, не дожидаясь открытия страницы хакатонов
+get_contest_rollup_refresher()
+
 
 def main():
     if not st.experimental_user.is_logged_in:
@@ -31,9 +35,9 @@ def main():
         user_info = st.experimental_user
         email = user_info.email
 
-        db_user = get_user_by_email(email)
-        if db_user:
-            _, _, role = db_user
+        # Роль кэшируется в сессии, чтобы не ходить в БД на каждом перезапуске скрипта
+        found, role = get_user_role(email)
+        if found:
             if role == 'ADMIN':
                 show_admin_dashboard(email)
             else:
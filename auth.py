@@ -1,7 +1,12 @@
 # auth.py
+import time
+import streamlit as st
 from db import get_user_by_email
 from utils.hashing import verify_password
 
+# Сколько секунд роль пользователя, закэшированная в сессии, считается актуальной
+ROLE_CACHE_TTL = 60
+
 def authenticate_user(email: str, password: str):
     user = get_user_by_email(email)
     if user is None:
@@ -10,3 +15,26 @@ def authenticate_user(email: str, password: str):
     if verify_password(password, db_password):
         return {"email": db_email, "role": role}
     return None
+
+
+def get_user_role(email: str):
+    """
+    Возвращает (найден ли пользователь, роль) для email с кэшированием в сессии Streamlit:
+    запрос в БД выполняется не чаще раза в ROLE_CACHE_TTL секунд и заново — при смене email.
+    Хранится только роль, без хэша пароля.
+    """
+    cached = st.session_state.get("user_role")
+    if cached and cached["email"] == email and time.monotonic() - cached["checked_at"] < ROLE_CACHE_TTL:
+        return cached["found"], cached["role"]
+
+    user = get_user_by_email(email)
+    found, role = user is not None, user[2] if user else None
+    st.session_state["user_role"] = {"email": email, "found": found, "role": role, "checked_at": time.monotonic()}
+    return found, role
+
+
+def clear_user_role():
+    """
+    Сбрасывает закэшированную роль (при выходе из аккаунта).
+    """
+    st.session_state.pop("user_role", None)
@@ -11,3 +11,23 @@ DB_CONFIG = {
     'user': os.getenv('DB_USER'),
     'password': os.getenv('DB_PASSWORD')
 }
+
+# Общий пул соединений с БД (один на процесс, см. db.get_pool)
+DB_POOL_CONFIG = {
+    'minconn': int(os.getenv('DB_POOL_MIN', 1)),
+    'maxconn': int(os.getenv('DB_POOL_MAX', 10)),
+    # Сколько секунд ждать свободное соединение, прежде чем выдать ошибку
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    # Соединение, простоявшее без дела дольше этого (секунды), перед выдачей проверяется запросом SELECT 1
+    'healthcheck_interval': float(os.getenv('DB_POOL_HEALTHCHECK_INTERVAL', 30))
+}
+
+# Пул соединений асинхронного слоя доступа к БД (asyncpg, см. db_async.get_async_pool)
+DB_ASYNC_POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_ASYNC_POOL_MIN', 1)),
+    'max_size': int(os.getenv('DB_ASYNC_POOL_MAX', 10)),
+    # Сколько секунд ждать свободное соединение, прежде чем выдать ошибку
+    'timeout': float(os.getenv('DB_ASYNC_POOL_TIMEOUT', 10)),
+    # Соединение, простоявшее без дела дольше этого (секунды), закрывается пулом
+    'max_inactive_connection_lifetime': float(os.getenv('DB_ASYNC_POOL_MAX_IDLE', 300))
+}
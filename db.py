@@ -1,27 +1,218 @@
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date, datetime
+import io
+import threading
+import time
 import psycopg2
-from config import DB_CONFIG
+from psycopg2 import pool as psycopg2_pool
+from config import DB_CONFIG, DB_POOL_CONFIG
 import uuid
-from psycopg2.extras import RealDictCursor
-
-def get_connection():
-    conn = psycopg2.connect(
-        host=DB_CONFIG['host'],
-        port=DB_CONFIG['port'],
-        database=DB_CONFIG['database'],
-        user=DB_CONFIG['user'],
-        password=DB_CONFIG['password']
-    )
-    return conn
+from psycopg2.extras import RealDictCursor, execute_values
+from utils.query_stats import InstrumentedConnection, LatencyHistogram, query_helper
+
+# Начиная с такого числа строк insert_rows загружает их через COPY, а не многострочным INSERT
+COPY_THRESHOLD = 1000
+
+class ConnectionPool:
+    """
+    Потокобезопасный пул соединений с БД поверх psycopg2 ThreadedConnectionPool.
+
+    Если свободных соединений нет, connection() ждёт освобождения не дольше timeout секунд
+    (ThreadedConnectionPool в этом случае сразу бросает PoolError).
+    Соединение, которое простояло без дела дольше healthcheck_interval, перед выдачей проверяется
+    запросом SELECT 1; закрытые и сломанные соединения выбрасываются из пула и заменяются новыми.
+    Все запросы через соединения пула замеряются (см. utils.query_stats).
+    """
+
+    def __init__(self, minconn, maxconn, timeout, healthcheck_interval):
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self._pool = psycopg2_pool.ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            host=DB_CONFIG['host'],
+            port=DB_CONFIG['port'],
+            database=DB_CONFIG['database'],
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            connection_factory=InstrumentedConnection
+        )
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "acquired": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0,
+            "timeouts": 0, "healthchecks": 0, "discarded": 0
+        }
+        self._wait_histogram = LatencyHistogram()
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        if time.monotonic() - self._last_used.get(id(conn), 0.0) < self.healthcheck_interval:
+            return True
+        with self._lock:
+            self._stats["healthchecks"] += 1
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self._stats["discarded"] += 1
+            self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def _getconn(self):
+        while True:
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Выдаёт соединение из пула и возвращает его обратно после блока with.
+        Незакоммиченные изменения при возврате откатываются, поэтому запись нужно явно закоммитить.
+        """
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise psycopg2_pool.PoolError(f"Нет свободных соединений с БД за {self.timeout} с")
+        wait = time.monotonic() - start
+        with self._lock:
+            self._stats["acquired"] += 1
+            self._stats["wait_total"] += wait
+            self._stats["wait_max"] = max(self._stats["wait_max"], wait)
+            self._wait_histogram.add(wait)
+            if wait > 0.001:
+                self._stats["waited"] += 1
+
+        try:
+            conn = self._getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            try:
+                if not broken and not conn.closed:
+                    conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            if broken or conn.closed:
+                self._discard(conn)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+            self._slots.release()
+
+    def stats(self):
+        """
+        Метрики пула: размер (maxconn, open — открытые соединения, in_use, idle),
+        число выдач, сколько из них ждали свободного соединения, суммарное/максимальное ожидание (секунды)
+        и гистограмма ожиданий (wait_histogram), отказы по таймауту, проверки SELECT 1 и выброшенные соединения.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["wait_histogram"] = self._wait_histogram.to_dict()
+        in_use = len(self._pool._used)
+        idle = len(self._pool._pool)
+        stats.update({
+            "maxconn": self.maxconn,
+            "open": in_use + idle,
+            "in_use": in_use,
+            "idle": idle,
+            "wait_avg": stats["wait_total"] / stats["acquired"] if stats["acquired"] else 0.0
+        })
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Возвращает общий для процесса пул соединений (один на все сессии Streamlit), создавая его при первом обращении.
+    Размер, таймаут ожидания и интервал проверки соединений задаются в config.DB_POOL_CONFIG.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(**DB_POOL_CONFIG)
+        return _pool
+
+
+def connection():
+    """
+    Соединение из общего пула: with connection() as conn: ...
+    """
+    return get_pool().connection()
+
+
+def get_pool_stats():
+    return get_pool().stats()
+
+def _copy_value(value):
+    """
+    Значение поля в текстовом формате COPY (NULL — \\N, массивы — литерал вида {"a","b"}).
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, (list, tuple)):
+        value = "{" + ",".join(
+            "NULL" if item is None else '"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for item in value
+        ) + "}"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+@query_helper
+def insert_rows(cur, table, columns, rows, copy_threshold=COPY_THRESHOLD):
+    """
+    Вставляет строки в таблицу одним многострочным INSERT, а пачки от copy_threshold строк — через COPY FROM STDIN.
+    Выполняется в текущей транзакции курсора cur, коммит — на вызывающей стороне.
+    columns — имена столбцов (без кавычек), rows — кортежи значений в том же порядке.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    if len(rows) >= copy_threshold:
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row) + "\n")
+        buffer.seek(0)
+        cur.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN', buffer)
+    else:
+        execute_values(cur, f'INSERT INTO "{table}" ({column_list}) VALUES %s', rows, page_size=len(rows))
+
 
 def get_user_by_email(email: str):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = 'SELECT email, password, role FROM public."User" WHERE email = %s'
-    cur.execute(query, (email,))
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor()
+        query = 'SELECT email, password, role FROM public."User" WHERE email = %s'
+        cur.execute(query, (email,))
+        user = cur.fetchone()
+        cur.close()
     return user
 
 def get_all_tasks():
@@ -29,14 +220,52 @@ def get_all_tasks():
     Получает все задачи (Problem) из БД, возвращает список словарей с ключами id и title.
     Выбираются только задачи, которые не скрыты (hidden = false).
     """
-    conn = get_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute('SELECT id, title FROM "Problem" WHERE hidden = false;')
-    tasks = cur.fetchall()
-    cur.close()
-    conn.close()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute('SELECT id, title FROM "Problem" WHERE hidden = false;')
+        tasks = cur.fetchall()
+        cur.close()
     return tasks
 
+def search_problems(query="", difficulties=None, after=None, limit=20):
+    """
+    Ищет нескрытые задачи по подстроке в title или description (без учёта регистра), с фильтром по сложности.
+    Результаты упорядочены по (title, id) и листаются keyset-пагинацией: after — курсор (title, id)
+    последней строки предыдущей страницы.
+    Возвращает (список словарей {"id", "title", "difficulty"}, курсор следующей страницы или None).
+    Индексы для поиска создаются разовой миграцией: python -m utils.problem_catalog install-indexes.
+    """
+    conditions = ["hidden = false"]
+    params = []
+    query = (query or "").strip()
+    if query:
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        conditions.append("(title ILIKE %s OR description ILIKE %s)")
+        params += [pattern, pattern]
+    if difficulties:
+        conditions.append("difficulty::text = ANY(%s)")
+        params.append([difficulty.upper() for difficulty in difficulties])
+    if after:
+        conditions.append("(title, id) > (%s, %s)")
+        params += list(after)
+
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            f'SELECT id, title, difficulty FROM "Problem" WHERE {" AND ".join(conditions)} '
+            f'ORDER BY title, id LIMIT %s',
+            (*params, limit + 1)
+        )
+        rows = cur.fetchall()
+        cur.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["title"], rows[-1]["id"])
+    return rows, next_cursor
+
+
 def create_hackathon(hackathon_data):
     """
     Создаёт новый хакатон (Contest) и связывает его с выбранными задачами (ContestProblem).
@@ -44,47 +273,280 @@ def create_hackathon(hackathon_data):
     Для таблицы ContestProblem требуются поля: id, contestId, problemId, index, updatedAt, solved.
     """
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        now_dt = datetime.now()
+        with connection() as conn:
+            cur = conn.cursor()
+            now_dt = datetime.now()
 
-        # Вставка записи в таблицу Contest с указанием обязательных столбцов
-        insert_contest_query = """
-        INSERT INTO "Contest" (id, title, description, "startTime", "endTime", hidden, "updatedAt", leaderboard)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id;
-        """
-        cur.execute(insert_contest_query, (
-            hackathon_data["id"],
-            hackathon_data["title"],
-            hackathon_data["description"],
-            hackathon_data["startTime"],
-            hackathon_data["endTime"],
-            hackathon_data["hidden"],
-            now_dt,     # updatedAt
-            True       # leaderboard (по умолчанию true)
-        ))
-        contest_id = cur.fetchone()[0]
-
-        # Вставка записей в таблицу ContestProblem для каждой выбранной задачи
-        for index, problem_id in enumerate(hackathon_data["selected_problem_ids"]):
-            contest_problem_id = str(uuid.uuid4())
-            insert_contest_problem_query = """
-            INSERT INTO "ContestProblem" (id, "contestId", "problemId", "index", "updatedAt", solved)
-            VALUES (%s, %s, %s, %s, %s, %s);
+            # Вставка записи в таблицу Contest с указанием обязательных столбцов
+            insert_contest_query = """
+            INSERT INTO "Contest" (id, title, description, "startTime", "endTime", hidden, "updatedAt", leaderboard)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id;
             """
-            cur.execute(insert_contest_problem_query, (
-                contest_problem_id,
-                contest_id,
-                problem_id,
-                index,
-                now_dt,  # updatedAt для ContestProblem
-                0        # solved по умолчанию 0
+            cur.execute(insert_contest_query, (
+                hackathon_data["id"],
+                hackathon_data["title"],
+                hackathon_data["description"],
+                hackathon_data["startTime"],
+                hackathon_data["endTime"],
+                hackathon_data["hidden"],
+                now_dt,     # updatedAt
+                True       # leaderboard (по умолчанию true)
             ))
+            contest_id = cur.fetchone()[0]
 
-        conn.commit()
-        cur.close()
-        conn.close()
-        return True
+            # Все записи ContestProblem для выбранных задач вставляются одним запросом
+            insert_rows(
+                cur,
+                "ContestProblem",
+                ["id", "contestId", "problemId", "index", "updatedAt", "solved"],
+                [
+                    (
+                        str(uuid.uuid4()),
+                        contest_id,
+                        problem_id,
+                        index,
+                        now_dt,  # updatedAt для ContestProblem
+                        0        # solved по умолчанию 0
+                    )
+                    for index, problem_id in enumerate(hackathon_data["selected_problem_ids"])
+                ]
+            )
+
+            conn.commit()
+            cur.close()
     except Exception as e:
         print("Ошибка при создании хакатона:", e)
         return False
+
+    # Новый хакатон должен сразу появиться на странице хакатонов; ошибка сводки не отменяет его создание
+    try:
+        refresh_contest_rollup([contest_id])
+    except Exception as e:
+        print("Не удалось обновить сводку хакатонов:", e)
+    return True
+
+
+def is_leaderboard_installed():
+    """
+    Установлены ли сводные таблицы "ContestLeaderboard", "ContestLeaderboardStats" и триггер, который их ведёт.
+    Они создаются разовой миграцией python -m utils.leaderboard install, а не админкой.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT to_regclass('"ContestLeaderboard"') IS NOT NULL
+                AND to_regclass('"ContestLeaderboardStats"') IS NOT NULL AND EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'contest_leaderboard_apply' AND tgrelid = to_regclass('"ContestSubmission"')
+            )
+        """)
+        installed = cur.fetchone()[0]
+        cur.close()
+    return installed
+
+
+def rebuild_leaderboard(contest_id=None):
+    """
+    Полностью пересчитывает "ContestLeaderboard" и счётчики участников "ContestLeaderboardStats"
+    по "ContestSubmission" (для одного контеста или для всех).
+    Нужен только для первоначального заполнения и починки (python -m utils.leaderboard rebuild):
+    в обычной работе таблицу ведёт триггер.
+    На время пересчёта запись в "ContestSubmission" блокируется, чтобы не потерять отправки.
+    """
+    condition, params = ('WHERE "contestId" = %s', (contest_id,)) if contest_id else ("", ())
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute('LOCK TABLE "ContestSubmission" IN SHARE MODE')
+        cur.execute(f'DELETE FROM "ContestLeaderboard" {condition}', params)
+        cur.execute(f"""
+            INSERT INTO "ContestLeaderboard" ("contestId", "userId", points, solved, submissions, "lastSubmissionAt")
+            SELECT "contestId", "userId", SUM(points), COUNT(*) FILTER (WHERE points > 0), COUNT(*), MAX("updatedAt")
+            FROM "ContestSubmission" {condition}
+            GROUP BY "contestId", "userId"
+        """, params)
+        cur.execute(f'DELETE FROM "ContestLeaderboardStats" {condition}', params)
+        cur.execute(f"""
+            INSERT INTO "ContestLeaderboardStats" ("contestId", participants)
+            SELECT "contestId", COUNT(*) FROM "ContestLeaderboard" {condition}
+            GROUP BY "contestId"
+        """, params)
+        conn.commit()
+        cur.close()
+
+
+def get_leaderboard_contests():
+    """
+    Контесты с включённым лидербордом, сначала новые: список словарей {"id", "title", "startTime", "endTime"}.
+    """
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            'SELECT id, title, "startTime", "endTime" FROM "Contest" WHERE leaderboard = true '
+            'ORDER BY "startTime" DESC'
+        )
+        contests = cur.fetchall()
+        cur.close()
+    return contests
+
+
+def get_leaderboard(contest_id, limit=100):
+    """
+    Топ-N участников контеста из сводной таблицы "ContestLeaderboard" и число участников
+    (счётчик "ContestLeaderboardStats", который ведёт триггер лидерборда).
+    Порядок — по очкам (убывание), при равенстве — кто раньше набрал очки; rank одинаков при равных очках.
+    Возвращает (список словарей {"rank", "userId", "email", "name", "points", "solved", "lastSubmissionAt"},
+    число участников). Таблица должна быть установлена (см. is_leaderboard_installed).
+    """
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("""
+            SELECT RANK() OVER (ORDER BY top.points DESC) AS rank, top."userId", u.email, u.name,
+                   top.points, top.solved, top."lastSubmissionAt"
+            FROM (
+                SELECT "userId", points, solved, "lastSubmissionAt"
+                FROM "ContestLeaderboard"
+                WHERE "contestId" = %s
+                ORDER BY points DESC, "lastSubmissionAt", "userId"
+                LIMIT %s
+            ) top
+            LEFT JOIN "User" u ON u.id = top."userId"
+            ORDER BY top.points DESC, top."lastSubmissionAt", top."userId"
+        """, (contest_id, limit))
+        rows = cur.fetchall()
+        cur.execute('SELECT participants FROM "ContestLeaderboardStats" WHERE "contestId" = %s', (contest_id,))
+        stats = cur.fetchone()
+        participants = stats["participants"] if stats else 0
+        cur.close()
+    return rows, participants
+
+
+# Статусы хакатона по времени начала и окончания (на момент запроса)
+CONTEST_STATUS_SQL = """
+    CASE WHEN LOCALTIMESTAMP < "startTime" THEN 'upcoming'
+         WHEN LOCALTIMESTAMP < "endTime" THEN 'running'
+         ELSE 'finished' END
+"""
+
+def is_contest_rollup_installed():
+    """
+    Установлена ли сводная таблица хакатонов "ContestRollup": по строке на контест с числом задач,
+    участников и решений. Она создаётся разовой миграцией python -m utils.contest_rollup install, а не админкой.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""SELECT to_regclass('"ContestRollup"') IS NOT NULL""")
+        installed = cur.fetchone()[0]
+        cur.close()
+    return installed
+
+
+def refresh_contest_rollup(contest_ids=None, full=False):
+    """
+    Пересчитывает строки "ContestRollup" и возвращает число обновлённых контестов.
+
+    contest_ids — пересчитать только эти контесты (например, только что созданный хакатон).
+    Без contest_ids пересчитываются контесты, которые могли измениться с прошлого пересчёта:
+    новые, изменённые (по "updatedAt") и ещё не закончившиеся к прошлому пересчёту;
+    full=True — пересчитать все. Строки удалённых контестов удаляются.
+    Пока лидерборд не установлен (python -m utils.leaderboard install), участники и решения считаются нулевыми.
+    Пока не установлена сама сводка (см. is_contest_rollup_installed), ничего не пересчитывается.
+    """
+    if not is_contest_rollup_installed():
+        return 0
+    if is_leaderboard_installed():
+        leaderboard_sql = """
+            SELECT COUNT(*) AS participants, SUM(solved) AS solves
+            FROM "ContestLeaderboard" l
+            WHERE l."contestId" = c.id
+        """
+    else:
+        leaderboard_sql = "SELECT NULL::bigint AS participants, NULL::bigint AS solves"
+    with connection() as conn:
+        cur = conn.cursor()
+        if contest_ids is not None:
+            condition, params = 'c.id = ANY(%s)', (list(contest_ids),)
+        elif full:
+            condition, params = 'TRUE', ()
+        else:
+            condition, params = """
+                r."contestId" IS NULL
+                OR c."updatedAt" IS DISTINCT FROM r."contestUpdatedAt"
+                OR c."endTime" >= r."refreshedAt"
+            """, ()
+        cur.execute(f"""
+            INSERT INTO "ContestRollup" (
+                "contestId", title, "startTime", "endTime", hidden, problems, participants, solves,
+                "contestUpdatedAt", "refreshedAt"
+            )
+            SELECT c.id, c.title, c."startTime", c."endTime", c.hidden,
+                   (SELECT COUNT(*) FROM "ContestProblem" cp WHERE cp."contestId" = c.id),
+                   COALESCE(lb.participants, 0),
+                   COALESCE(lb.solves, 0),
+                   c."updatedAt",
+                   LOCALTIMESTAMP
+            FROM "Contest" c
+            LEFT JOIN "ContestRollup" r ON r."contestId" = c.id
+            LEFT JOIN LATERAL ({leaderboard_sql}) lb ON TRUE
+            WHERE {condition}
+            ON CONFLICT ("contestId") DO UPDATE
+            SET title = EXCLUDED.title,
+                "startTime" = EXCLUDED."startTime",
+                "endTime" = EXCLUDED."endTime",
+                hidden = EXCLUDED.hidden,
+                problems = EXCLUDED.problems,
+                participants = EXCLUDED.participants,
+                solves = EXCLUDED.solves,
+                "contestUpdatedAt" = EXCLUDED."contestUpdatedAt",
+                "refreshedAt" = EXCLUDED."refreshedAt"
+        """, params)
+        refreshed = cur.rowcount
+        if contest_ids is None:
+            cur.execute("""
+                DELETE FROM "ContestRollup" r
+                WHERE NOT EXISTS (SELECT 1 FROM "Contest" c WHERE c.id = r."contestId")
+            """)
+        conn.commit()
+        cur.close()
+    return refreshed
+
+
+def get_contest_rollup_page(status=None, after=None, limit=20):
+    """
+    Страница сводки хакатонов, сначала более поздние по времени начала.
+    status — 'upcoming', 'running' или 'finished' (None — все); after — курсор ("startTime", "contestId")
+    последней строки предыдущей страницы.
+    Возвращает (список словарей {"contestId", "title", "startTime", "endTime", "hidden", "status",
+    "problems", "participants", "solves", "refreshedAt"}, курсор следующей страницы или None, всего контестов
+    с этим статусом). Сводка должна быть установлена (см. is_contest_rollup_installed).
+    """
+    conditions, params = [], []
+    if status:
+        conditions.append(f"({CONTEST_STATUS_SQL}) = %s")
+        params.append(status)
+    where = f'WHERE {" AND ".join(conditions)}' if conditions else ""
+    page_conditions, page_params = list(conditions), list(params)
+    if after:
+        page_conditions.append('("startTime", "contestId") < (%s, %s)')
+        page_params += list(after)
+    page_where = f'WHERE {" AND ".join(page_conditions)}' if page_conditions else ""
+
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(f"""
+            SELECT "contestId", title, "startTime", "endTime", hidden, {CONTEST_STATUS_SQL} AS status,
+                   problems, participants, solves, "refreshedAt"
+            FROM "ContestRollup"
+            {page_where}
+            ORDER BY "startTime" DESC, "contestId" DESC
+            LIMIT %s
+        """, (*page_params, limit + 1))
+        rows = cur.fetchall()
+        cur.execute(f'SELECT COUNT(*) AS total FROM "ContestRollup" {where}', params)
+        total = cur.fetchone()["total"]
+        cur.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["startTime"], rows[-1]["contestId"])
+    return rows, next_cursor, total
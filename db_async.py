@@ -0,0 +1,228 @@
+import asyncio
+import threading
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncpg
+from config import DB_ASYNC_POOL_CONFIG, DB_CONFIG
+from db import refresh_contest_rollup
+from utils.add_problem import DEFAULTCODE_COLUMNS, PROBLEM_COLUMNS, TESTCASE_COLUMNS, build_problem_rows
+
+# Начиная с такого числа строк insert_rows_async загружает их через COPY, а не через executemany
+COPY_THRESHOLD = 1000
+
+# Пул asyncpg привязан к event loop, в котором создан, поэтому пулы хранятся отдельно для каждого loop
+_pools = weakref.WeakKeyDictionary()
+_pool_locks = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+_stats = {"acquired": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0, "timeouts": 0}
+_stats_lock = threading.Lock()
+
+
+def _drop_closed_loop_pools():
+    """
+    Убирает пулы loop-ов, которые уже закрыты без close_async_pool (например, asyncio.run завершился с ошибкой).
+    Такими соединениями больше никто не пользуется, поэтому их можно просто оборвать.
+    """
+    with _pools_lock:
+        closed = [(loop, pool) for loop, pool in _pools.items() if loop.is_closed()]
+        for loop, _ in closed:
+            del _pools[loop]
+    for _, pool in closed:
+        try:
+            pool.terminate()
+        except RuntimeError:
+            pass
+
+
+async def get_async_pool():
+    """
+    Возвращает пул соединений asyncpg для текущего event loop, создавая его при первом обращении.
+    У каждого loop (например, у каждого asyncio.run в своём рабочем потоке) свой пул, и потоки не мешают друг другу;
+    закрывать пул нужно из того же loop (close_async_pool).
+    Размер, таймаут ожидания и время жизни простаивающих соединений задаются в config.DB_ASYNC_POOL_CONFIG.
+    """
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.get(loop)
+        if pool is not None:
+            return pool
+        lock = _pool_locks.setdefault(loop, asyncio.Lock())
+    _drop_closed_loop_pools()
+    async with lock:
+        with _pools_lock:
+            pool = _pools.get(loop)
+        if pool is None:
+            pool = await asyncpg.create_pool(
+                host=DB_CONFIG['host'],
+                port=DB_CONFIG['port'],
+                database=DB_CONFIG['database'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                min_size=DB_ASYNC_POOL_CONFIG['min_size'],
+                max_size=DB_ASYNC_POOL_CONFIG['max_size'],
+                max_inactive_connection_lifetime=DB_ASYNC_POOL_CONFIG['max_inactive_connection_lifetime']
+            )
+            with _pools_lock:
+                _pools[loop] = pool
+        return pool
+
+
+async def close_async_pool():
+    """
+    Закрывает пул текущего event loop (вызывается в конце фоновой задачи перед выходом из asyncio.run).
+    """
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pool = _pools.pop(loop, None)
+        _pool_locks.pop(loop, None)
+    if pool is not None:
+        await pool.close()
+
+
+@asynccontextmanager
+async def connection():
+    """
+    Соединение из асинхронного пула: async with connection() as conn: ...
+    Ждёт свободное соединение не дольше DB_ASYNC_POOL_CONFIG['timeout'] секунд.
+    Открытые транзакции откатываются при возврате соединения в пул.
+    """
+    pool = await get_async_pool()
+    start = time.monotonic()
+    try:
+        conn = await pool.acquire(timeout=DB_ASYNC_POOL_CONFIG['timeout'])
+    except asyncio.TimeoutError:
+        with _stats_lock:
+            _stats["timeouts"] += 1
+        raise
+    wait = time.monotonic() - start
+    with _stats_lock:
+        _stats["acquired"] += 1
+        _stats["wait_total"] += wait
+        _stats["wait_max"] = max(_stats["wait_max"], wait)
+        if wait > 0.001:
+            _stats["waited"] += 1
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def get_async_pool_stats():
+    """
+    Метрики асинхронных пулов (суммарно по всем event loop) в том же виде, что db.get_pool_stats:
+    maxconn (на один пул), pools, open, in_use, idle, число выдач и ожиданий свободного соединения,
+    суммарное/среднее/максимальное ожидание (секунды) и отказы по таймауту.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    with _pools_lock:
+        pools = list(_pools.values())
+    open_count = sum(pool.get_size() for pool in pools)
+    idle = sum(pool.get_idle_size() for pool in pools)
+    stats.update({
+        "maxconn": DB_ASYNC_POOL_CONFIG['max_size'],
+        "pools": len(pools),
+        "open": open_count,
+        "in_use": open_count - idle,
+        "idle": idle,
+        "wait_avg": stats["wait_total"] / stats["acquired"] if stats["acquired"] else 0.0
+    })
+    return stats
+
+
+async def insert_rows_async(conn, table, columns, rows, copy_threshold=COPY_THRESHOLD):
+    """
+    Асинхронный аналог db.insert_rows: вставляет строки через executemany (одна конвейерная отправка),
+    а пачки от copy_threshold строк — через бинарный COPY. Выполняется в текущей транзакции conn.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    if len(rows) >= copy_threshold:
+        await conn.copy_records_to_table(table, records=rows, columns=columns)
+    else:
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join(f"${index}" for index in range(1, len(columns) + 1))
+        await conn.executemany(f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})', rows)
+
+
+async def get_user_by_email(email: str):
+    async with connection() as conn:
+        user = await conn.fetchrow('SELECT email, password, role FROM public."User" WHERE email = $1', email)
+    return tuple(user) if user is not None else None
+
+
+async def get_all_tasks():
+    """
+    Получает все нескрытые задачи (Problem) из БД, возвращает список словарей с ключами id и title.
+    """
+    async with connection() as conn:
+        rows = await conn.fetch('SELECT id, title FROM "Problem" WHERE hidden = false')
+    return [dict(row) for row in rows]
+
+
+async def create_hackathon(hackathon_data):
+    """
+    Асинхронный вариант db.create_hackathon: создаёт Contest и записи ContestProblem для выбранных задач
+    в одной транзакции, после коммита обновляет строку хакатона в "ContestRollup".
+    Возвращает True при успехе, False при ошибке.
+    """
+    try:
+        async with connection() as conn:
+            async with conn.transaction():
+                now_dt = datetime.now()
+                contest_id = await conn.fetchval(
+                    """
+                    INSERT INTO "Contest" (id, title, description, "startTime", "endTime", hidden, "updatedAt", leaderboard)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8) RETURNING id
+                    """,
+                    hackathon_data["id"],
+                    hackathon_data["title"],
+                    hackathon_data["description"],
+                    hackathon_data["startTime"],
+                    hackathon_data["endTime"],
+                    hackathon_data["hidden"],
+                    now_dt,  # updatedAt
+                    True     # leaderboard (по умолчанию true)
+                )
+                await insert_rows_async(
+                    conn,
+                    "ContestProblem",
+                    ["id", "contestId", "problemId", "index", "updatedAt", "solved"],
+                    [
+                        (str(uuid.uuid4()), contest_id, problem_id, index, now_dt, 0)
+                        for index, problem_id in enumerate(hackathon_data["selected_problem_ids"])
+                    ]
+                )
+    except Exception as e:
+        print("Ошибка при создании хакатона:", e)
+        return False
+
+    # Как и в db.create_hackathon: новый хакатон сразу попадает в сводку, а её ошибка не отменяет создание.
+    # Сводка пересчитывается синхронным db.refresh_contest_rollup в отдельном потоке, чтобы не блокировать loop
+    try:
+        await asyncio.to_thread(refresh_contest_rollup, [contest_id])
+    except Exception as e:
+        print("Не удалось обновить сводку хакатонов:", e)
+    return True
+
+
+async def save_problem_data(json_data):
+    """
+    Асинхронный вариант utils.add_problem.save_problem_data (формат json_data — там же):
+    сохраняет задачу в Problem, TestCase и DefaultCode в одной транзакции.
+    Возвращает {"status": "success" | "error", "message"}.
+    """
+    try:
+        rows = build_problem_rows(json_data)
+        async with connection() as conn:
+            async with conn.transaction():
+                await insert_rows_async(conn, "Problem", PROBLEM_COLUMNS, rows["Problem"])
+                await insert_rows_async(conn, "TestCase", TESTCASE_COLUMNS, rows["TestCase"])
+                await insert_rows_async(conn, "DefaultCode", DEFAULTCODE_COLUMNS, rows["DefaultCode"])
+        return {"status": "success", "message": "Сохранено"}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -2,6 +2,10 @@ import streamlit as st
 from pages.settings import show_settings_page
 from pages.create_task import show_create_task_page
 from pages.create_hackathon import show_create_hackathon_page
+from pages.diagnostics import show_diagnostics_page
+from pages.hackathons import show_hackathons_page
+from pages.ranking import show_ranking_page
+from pages.reports import show_reports_page
 
 def show_admin_dashboard(email: str):
     # Функция для подключения локального CSS файла
@@ -37,6 +41,8 @@ def show_admin_dashboard(email: str):
         set_page("CreateHackathon")
     if st.sidebar.button(" ✒️ Создать задачу"):
         set_page("CreateTask")
+    if st.sidebar.button(" 🩺 Диагностика"):
+        set_page("Diagnostics")
     if st.sidebar.button(" ⚙️ Настройки"):
         set_page("Settings")
 
@@ -45,18 +51,17 @@ def show_admin_dashboard(email: str):
         st.title("Admin Panel")
         st.write("Добро пожаловать в админ-панель!")
     elif st.session_state.page == "Hackathons":
-        st.title("Hackathons")
-        st.write("Здесь отображаются все хакатоны.")
+        show_hackathons_page()
     elif st.session_state.page == "Reports":
-        st.title("Reports")
-        st.write("Здесь можно просматривать отчеты.")
+        show_reports_page()
     elif st.session_state.page == "Ranking":
-        st.title("Ranking")
-        st.write("Здесь отображается рейтинг участников.")
+        show_ranking_page()
     elif st.session_state.page == "CreateHackathon":
         show_create_hackathon_page()
     elif st.session_state.page == "CreateTask":
         show_create_task_page()
+    elif st.session_state.page == "Diagnostics":
+        show_diagnostics_page()
     elif st.session_state.page == "Settings":
         show_settings_page()
 
@@ -1,7 +1,8 @@
 import streamlit as st
 from datetime import datetime
 import uuid
-from db import get_all_tasks, create_hackathon
+from db import create_hackathon
+from utils.problem_catalog import get_problem_catalog
 
 @st.dialog("Подтвердите создание хакатона")
 def confirm_create_hackathon(hackathon_data):
@@ -17,6 +18,79 @@ def confirm_create_hackathon(hackathon_data):
         st.session_state.hackathon_created = result
         st.rerun()
 
+# Сколько задач показывается на одной странице поиска
+PROBLEM_PAGE_SIZE = 20
+
+
+def toggle_problem(problem_id, title):
+    if st.session_state[f"problem_pick_{problem_id}"]:
+        st.session_state.selected_problems[problem_id] = title
+    else:
+        st.session_state.selected_problems.pop(problem_id, None)
+
+
+def remove_problem(problem_id):
+    st.session_state.selected_problems.pop(problem_id, None)
+    st.session_state.pop(f"problem_pick_{problem_id}", None)
+
+
+def show_problem_picker():
+    """
+    Выбор задач хакатона: поиск по названию и условию с фильтром по сложности на стороне БД
+    и постраничный просмотр результатов (keyset-пагинация), чтобы не загружать весь каталог.
+    Выбранные задачи хранятся в session_state.selected_problems ({id: title}, в порядке выбора),
+    поэтому задачи с одинаковыми названиями различаются.
+    """
+    selected = st.session_state.setdefault("selected_problems", {})
+
+    st.markdown("#### Задачи хакатона")
+    search_col, difficulty_col = st.columns([3, 1])
+    search_query = search_col.text_input(
+        "Поиск задач", key="problem_search", placeholder="Часть названия или условия задачи"
+    )
+    difficulties = difficulty_col.multiselect(
+        "Сложность", options=["Easy", "Medium", "Hard"], key="problem_difficulty", placeholder="Любая"
+    )
+
+    # Стек курсоров просмотренных страниц; при изменении поиска или фильтра листание начинается сначала
+    search_key = (search_query.strip(), tuple(difficulties))
+    if st.session_state.get("problem_search_key") != search_key:
+        st.session_state.problem_search_key = search_key
+        st.session_state.problem_page_cursors = [None]
+    cursors = st.session_state.problem_page_cursors
+
+    rows, next_cursor = get_problem_catalog().search(search_query, difficulties, cursors[-1], PROBLEM_PAGE_SIZE)
+    if not rows:
+        st.info("Задачи не найдены")
+    for row in rows:
+        checkbox_key = f"problem_pick_{row['id']}"
+        if checkbox_key not in st.session_state:
+            st.session_state[checkbox_key] = row["id"] in selected
+        st.checkbox(
+            f"{row['title']} · {(row['difficulty'] or '').capitalize()}",
+            key=checkbox_key,
+            on_change=toggle_problem,
+            args=(row["id"], row["title"])
+        )
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    prev_col.button(
+        "← Назад", disabled=len(cursors) == 1, on_click=cursors.pop, key="problem_page_prev"
+    )
+    page_col.caption(f"Страница {len(cursors)}")
+    next_col.button(
+        "Далее →", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,),
+        key="problem_page_next"
+    )
+
+    if selected:
+        st.markdown(f"**Выбрано задач: {len(selected)}**")
+        for index, (problem_id, title) in enumerate(list(selected.items())):
+            title_col, remove_col = st.columns([5, 1])
+            title_col.write(f"{index + 1}. {title}")
+            remove_col.button("✕", key=f"problem_remove_{problem_id}", on_click=remove_problem, args=(problem_id,))
+
+
 def show_create_hackathon_page():
     # Функция для подключения CSS-стилей
     def local_css(file_name):
@@ -54,14 +128,7 @@ def show_create_hackathon_page():
     is_open = st.checkbox("Открытый хакатон", key="is_open")
 
     st.markdown("---")
-    # Получение списка задач из БД (ожидается, что функция вернёт список словарей с ключами id и title)
-    tasks = get_all_tasks()
-    task_options = {task["title"]: task["id"] for task in tasks}
-    selected_tasks = st.multiselect(
-        "Выберите задачи для хакатона",
-        placeholder="Выберите задачи",
-        options=list(task_options.keys())
-    )
+    show_problem_picker()
 
     if st.button("Создать хакатон", type="primary"):
         error_messages = []
@@ -87,8 +154,8 @@ def show_create_hackathon_page():
                 "startTime": start_datetime,
                 "endTime": end_datetime,
                 "hidden": not is_open,  # если хакатон открытый, hidden будет False
-                "selected_problem_ids": [task_options[title] for title in selected_tasks],
-                "selected_task_names": selected_tasks
+                "selected_problem_ids": list(st.session_state.selected_problems.keys()),
+                "selected_task_names": list(st.session_state.selected_problems.values())
             }
             # Открываем диалоговое окно для подтверждения создания хакатона
             confirm_create_hackathon(hackathon_data)
@@ -1,14 +1,117 @@
 import streamlit as st
 from streamlit_ace import st_ace, KEYBINDINGS, LANGUAGES, THEMES
 import json
+import os
+import time
 from utils.problem_generator import problem_generator
 from utils.generate_leetcode_task import generate_leetcode_task
 from utils.generate_tests import generate_tests
 from utils.parse_tests import parse_tests
-from utils.run_tests_on_code import run_judge0_testcases
+from utils.run_tests_on_code import FAIL_FAST_COMPILE, FAIL_FAST_FIRST_FAILURE, JUDGE0_STATUS_NAMES
+from utils.judge_jobs import (
+    JOB_CANCELLING, JOB_DONE, JOB_FAILED, JOB_FINISHED_STATUSES, get_judge_job_queue
+)
+from utils.verify_solutions import SOLUTION_LANGUAGES, prepare_source_code
 from utils.add_problem import add_problem
 
 
+def show_test_result(result):
+    """
+    Выводит итог прогона тесткейсов: кэш, метрики, счётчики Judge0 и список непройденных тестов.
+    """
+    cache_stats = result.get("cache", {})
+    st.caption(
+        f"Кэш результатов: попаданий {cache_stats.get('hits', 0)}, "
+        f"промахов {cache_stats.get('misses', 0)}, записей {cache_stats.get('size', 0)}"
+    )
+    metrics = result.get("metrics", {})
+    if any(value["max"] is not None for value in metrics.values()):
+        metric_names = {"time": "CPU, с", "wall_time": "Реальное время, с", "memory": "Память, КБ"}
+        st.dataframe([
+            {"Метрика": metric_names[key], "max": value["max"], "p50": value["p50"], "p95": value["p95"]}
+            for key, value in metrics.items()
+        ])
+
+    judge_stats = result.get("judge_stats")
+    if judge_stats:
+        st.caption(
+            f"Запросов к Judge0: {judge_stats['requests']}, повторов: {judge_stats['retries']}, "
+            f"ответов 429: {judge_stats['rate_limited']}"
+        )
+
+    if result.get("status") == 1:
+        st.success("Все тесты успешно прошли!")
+    else:
+        incorrect_indexes = result.get("incorrect_test_indexes", [])
+        stderr = result.get("stderr")
+        incorrect_indexes = [str(idx + 1) for idx in incorrect_indexes]
+        skipped_indexes = [str(idx + 1) for idx in result.get("skipped_test_indexes", [])]
+        if skipped_indexes:
+            st.warning("Прогон остановлен досрочно, пропущены тесты: " + ", ".join(skipped_indexes))
+        error_indexes = [str(idx + 1) for idx in result.get("error_test_indexes", [])]
+        if error_indexes:
+            st.warning("Не удалось получить ответ Judge0 для тестов: " + ", ".join(error_indexes))
+        if stderr != "Правильно":
+            st.error("Следующие тесты не прошли: " + ", ".join(incorrect_indexes))
+            st.error("Вывод компиляции: " + stderr)
+        else:
+            st.error("Следующие тесты не прошли: " + ", ".join(incorrect_indexes))
+            st.error("Важно: если вы уверены, что тесткейсы правильные, возможно, код содержит ошибку. Убедитесь, что написанный код также верный!")
+
+
+@st.fragment
+def show_judge_job(job_id, save_result=True):
+    """
+    Показывает прогресс задания из очереди прогонов. Пока задание выполняется, фрагмент
+    перезапускается раз в секунду, не трогая остальную страницу.
+    save_result — сохранить итог как результат тестирования задачи (от него зависит кнопка «Добавить задачу»);
+    для проверки эталонных решений на других языках итог только показывается.
+    """
+    job_queue = get_judge_job_queue()
+    job = job_queue.get(job_id)
+    if job is None:
+        st.warning("Задание на прогон не найдено.")
+        return
+
+    finished = job["status"] in JOB_FINISHED_STATUSES
+    tests_count = max(job["tests_count"], 1)
+    if finished:
+        progress_text = "Прогон завершён" if job["status"] == JOB_DONE else "Прогон остановлен"
+    elif job["status"] == JOB_CANCELLING:
+        progress_text = "Прогон останавливается..."
+    else:
+        progress_text = f"Готово {job['done_count']} из {job['tests_count']}"
+    st.progress(job["done_count"] / tests_count, text=progress_text)
+
+    stoppable = not finished and job["status"] != JOB_CANCELLING
+    if stoppable and st.button("⏹ Остановить прогон", key=f"cancel_job_{job_id}"):
+        job_queue.cancel(job_id)
+
+    for idx, test_result in enumerate(job["results"]):
+        if test_result is None or test_result.get("skipped"):
+            continue
+        status_name = JUDGE0_STATUS_NAMES.get(test_result.get("status_id"), "Нет ответа от Judge0")
+        icon = "✅" if test_result.get("status_id") == 3 else "❌"
+        elapsed = f" ({test_result['time']} с)" if test_result.get("time") is not None else ""
+        st.write(f"{icon} Тест {idx + 1}: {status_name}{elapsed}")
+
+    if job["status"] == JOB_FAILED:
+        st.error("Ошибка при выполнении прогона: " + (job["error"] or ""))
+    elif finished and job["answer"]:
+        if save_result and st.session_state.get("test_result_job_id") != job_id:
+            # Сохраняем результат тестирования и перерисовываем страницу целиком,
+            # чтобы появилась кнопка добавления задачи
+            print("Результаты тестирования:")
+            print(json.dumps(job["answer"], ensure_ascii=False, indent=4))
+            st.session_state["test_result"] = job["answer"]
+            st.session_state["test_result_job_id"] = job_id
+            st.rerun()
+        show_test_result(job["answer"])
+    else:
+        time.sleep(1)
+        st.rerun(scope="fragment")
+
+
 def show_create_task_page():
     def local_css(file_name):
         with open(file_name, "r", encoding="utf-8") as f:
@@ -48,6 +151,23 @@ def show_create_task_page():
         st.session_state["formatted_tests"].append({"input": "", "expected_output": ""})
         st.session_state["add_test_flag"] = not st.session_state.get("add_test_flag", False)
 
+    def get_reference_solutions(boilerplate_dict):
+        """
+        Собирает эталонные решения для сохранения вместе с задачей: решение из редактора тестов
+        и решения из проверки на всех языках, если они отличаются от пустого шаблона.
+        """
+        ace_to_language = {"c_cpp": "C++", "javascript": "JavaScript", "rust": "Rust", "java": "Java"}
+        solutions = {}
+        for lang, lang_info in SOLUTION_LANGUAGES.items():
+            code = st.session_state.get(f"reference_solution_{lang}", "")
+            if code.strip() and code != boilerplate_dict.get(lang_info["template_key"], ""):
+                solutions[lang] = code
+        ace_language = st.session_state.get("ace_language", "c_cpp")
+        test_code = st.session_state.get(f"ace_{ace_language}")
+        if test_code and test_code.strip():
+            solutions[ace_to_language[ace_language]] = test_code
+        return solutions
+
     def add_task_callback():
         boilerplate_dict = st.session_state.get("boilerplate_dict", {})
         task_data = {
@@ -68,7 +188,9 @@ def show_create_task_page():
                 "Rust": boilerplate_dict.get("fullRust", ""),
                 "Java": boilerplate_dict.get("fullJava", "")
             },
-            "Сгенерированные тесткейсы": st.session_state.get("formatted_tests", [])
+            "Сгенерированные тесткейсы": st.session_state.get("formatted_tests", []),
+            "Метрики эталонного решения": st.session_state.get("test_result", {}).get("metrics", {}),
+            "Эталонные решения": get_reference_solutions(boilerplate_dict)
         }
         # Выводим JSON в консоль (для отладки)
         print(json.dumps(task_data, ensure_ascii=False, indent=4))
@@ -263,6 +385,25 @@ def show_create_task_page():
 
         test_count = c2.slider("Количество тестов", 1, 20, 10)
 
+        # Режим проверки -> имя раннера в очереди прогонов (utils/judge_jobs.py)
+        judge_runners = {
+            "Пакетный": "batch",
+            "Параллельный": "concurrent",
+            "Последовательный": "sequential",
+            "Локально": "local"
+        }
+        # Режим с callback доступен, только если Judge0 может достучаться до нашего приёмника
+        if os.getenv("JUDGE0_CALLBACK_URL"):
+            judge_runners["Callback"] = "callback"
+        judge_mode = c2.selectbox("Режим проверки", options=list(judge_runners.keys()), key="judge_mode")
+
+        fail_fast_modes = {
+            "При ошибке компиляции": FAIL_FAST_COMPILE,
+            "При первой ошибке": FAIL_FAST_FIRST_FAILURE,
+            "Не останавливать": None
+        }
+        fail_fast_mode = c2.selectbox("Остановка прогона", options=list(fail_fast_modes.keys()), key="fail_fast_mode")
+
         if c2.button("✨ Тесткейсы", type="primary"):
             if "metadata" not in st.session_state:
                 st.error("Сначала создайте шаблон задачи!")
@@ -336,25 +477,66 @@ def show_create_task_page():
                 }
                 print(data_payload)
 
-                result = run_judge0_testcases(data_payload)
-                print("Результаты тестирования:")
-                print(json.dumps(result, ensure_ascii=False, indent=4))
-
-                # Сохраняем результат тестирования для дальнейшего использования
-                st.session_state["test_result"] = result
-
-                if result.get("status") == 1:
-                    st.success("Все тесты успешно прошли!")
+                # Прогон выполняется в фоновой очереди: он не прерывается перезапусками страницы,
+                # а id задания сохраняется в URL, чтобы результат пережил и обновление браузера
+                job_id = get_judge_job_queue().submit(
+                    data_payload,
+                    runner=judge_runners[judge_mode],
+                    fail_fast=fail_fast_modes[fail_fast_mode]
+                )
+                st.session_state["judge_job_id"] = job_id
+                st.session_state.pop("test_result", None)
+                st.query_params["judge_job"] = job_id
+
+        judge_job_id = st.session_state.get("judge_job_id") or st.query_params.get("judge_job")
+        if judge_job_id:
+            show_judge_job(judge_job_id)
+
+        # Проверка эталонных решений сразу на всех языках: ловит ошибки в сгенерированных полных шаблонах
+        with st.expander("Проверка эталонных решений на всех языках"):
+            reference_solutions = {}
+            for lang, lang_info in SOLUTION_LANGUAGES.items():
+                reference_solutions[lang] = st.text_area(
+                    f"Решение ({lang})",
+                    value=boilerplate_dict.get(lang_info["template_key"], ""),
+                    height=150,
+                    key=f"reference_solution_{lang}"
+                )
+
+            if st.button("Проверить все языки"):
+                if "formatted_tests" not in st.session_state:
+                    st.error("Сначала сгенерируйте тесткейсы!")
                 else:
-                    incorrect_indexes = result.get("incorrect_test_indexes", [])
-                    stderr = result.get("stderr")
-                    incorrect_indexes = [str(idx + 1) for idx in incorrect_indexes]
-                    if stderr != "Правильно":
-                        st.error("Следующие тесты не прошли: " + ", ".join(incorrect_indexes))
-                        st.error("Вывод компиляции: " + stderr)
-                    else:
-                        st.error("Следующие тесты не прошли: " + ", ".join(incorrect_indexes))
-                        st.error("Важно: если вы уверены, что тесткейсы правильные, возможно, код содержит ошибку. Убедитесь, что написанный код также верный!")
+                    testcases = [
+                        {
+                            "stdin": str(st.session_state.get(f"test_input_{i}", t.get("input", ""))),
+                            "expected_output": str(st.session_state.get(f"test_output_{i}", t.get("expected_output", "")))
+                        }
+                        for i, t in enumerate(st.session_state["formatted_tests"])
+                    ]
+                    # Как и основной прогон, каждый язык проверяется отдельным заданием фоновой очереди
+                    job_queue = get_judge_job_queue()
+                    reference_jobs = {
+                        lang: job_queue.submit(
+                            {
+                                "language_id": SOLUTION_LANGUAGES[lang]["language_id"],
+                                "source_code": prepare_source_code(boilerplate_dict, lang, code),
+                                "testcases": testcases
+                            },
+                            runner=judge_runners[judge_mode],
+                            fail_fast=fail_fast_modes[fail_fast_mode]
+                        )
+                        for lang, code in reference_solutions.items() if code.strip()
+                    }
+                    st.session_state["reference_jobs"] = reference_jobs
+                    st.query_params["reference_job"] = [f"{lang}:{job_id}" for lang, job_id in reference_jobs.items()]
+
+            reference_jobs = st.session_state.get("reference_jobs") or dict(
+                item.split(":", 1) for item in st.query_params.get_all("reference_job")
+            )
+            for lang, job_id in reference_jobs.items():
+                st.markdown(f"**{lang}**")
+                show_judge_job(job_id, save_result=False)
 
         # Если тесты прошли успешно (результат сохранён в session_state), показываем кнопку для добавления задачи
         if st.session_state.get("test_result", {}).get("status") == 1:
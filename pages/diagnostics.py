@@ -0,0 +1,111 @@
+import psycopg2
+import streamlit as st
+from db import get_pool_stats
+from utils.judge0_client import get_judge0_client
+from utils.judge_cache import get_judge_cache
+from utils.leaderboard_cache import get_leaderboard_cache
+from utils.problem_catalog import get_problem_catalog
+from utils.query_stats import get_query_stats
+
+
+def _ms(value):
+    return "—" if value is None else "∞" if value == float("inf") else f"{value:.1f}"
+
+
+def show_pool_stats():
+    st.subheader("Пул соединений с БД 🔌")
+    try:
+        stats = get_pool_stats()
+    except psycopg2.Error as e:
+        st.error(f"Не удалось подключиться к БД: {e}")
+        return
+    cols = st.columns(4)
+    cols[0].metric("Занято / открыто", f"{stats['in_use']} / {stats['open']}", help=f"Максимум: {stats['maxconn']}")
+    cols[1].metric("Выдач соединений", stats["acquired"], help=f"Из них с ожиданием: {stats['waited']}")
+    cols[2].metric("Ожидание, мс (сред. / макс.)", f"{stats['wait_avg'] * 1000:.1f} / {stats['wait_max'] * 1000:.1f}")
+    cols[3].metric("Отказы по таймауту", stats["timeouts"],
+                   help=f"Проверок SELECT 1: {stats['healthchecks']}, выброшено соединений: {stats['discarded']}")
+    if stats["acquired"]:
+        st.caption("Время ожидания свободного соединения")
+        st.bar_chart(stats["wait_histogram"])
+
+
+def show_query_stats():
+    query_stats = get_query_stats()
+    st.subheader("SQL-запросы 🐘")
+    sites = query_stats.sites()
+    if not sites:
+        st.info("Запросов к БД ещё не было.")
+    else:
+        st.dataframe([
+            {
+                "Место вызова": row["site"],
+                "Запросов": row["count"],
+                "Ошибок": row["errors"],
+                "Строк": row["rows"],
+                "Всего, мс": _ms(row["total_ms"]),
+                "Среднее, мс": _ms(row["avg_ms"]),
+                "p50 ≤, мс": _ms(row["p50_ms"]),
+                "p95 ≤, мс": _ms(row["p95_ms"]),
+                "Макс., мс": _ms(row["max_ms"])
+            }
+            for row in sites
+        ], hide_index=True)
+
+        site = st.selectbox("Гистограмма задержек", [row["site"] for row in sites], key="diagnostics_site")
+        st.bar_chart(next(row["histogram"] for row in sites if row["site"] == site))
+
+    st.markdown(f"#### Медленные запросы (от {query_stats.slow_query_ms:g} мс)")
+    slow_queries = query_stats.slow_queries()
+    if slow_queries:
+        st.dataframe([
+            {
+                "Время": entry["time"],
+                "Место вызова": entry["site"],
+                "Длительность, мс": entry["duration_ms"],
+                "Строк": entry["rows"],
+                "Ошибка": entry["error"] or "",
+                "Запрос": entry["statement"]
+            }
+            for entry in slow_queries
+        ], hide_index=True)
+    else:
+        st.write("Медленных запросов не было.")
+
+    if st.button("Сбросить статистику запросов"):
+        query_stats.reset()
+        st.rerun()
+
+
+def show_cache_stats():
+    st.subheader("Кэши и Judge0 ⚡")
+    catalog_col, leaderboard_col, judge_cache_col, judge0_col = st.columns(4)
+
+    catalog = get_problem_catalog().stats()
+    catalog_col.markdown("**Каталог задач**")
+    catalog_col.write(f"Попаданий: {catalog['hits']}, промахов: {catalog['misses']}")
+    catalog_col.write(f"Задач: {catalog['size']}, страниц поиска: {catalog['pages']}")
+    catalog_col.write(f"Загружен: {catalog['age']:.0f} с назад" if catalog["age"] is not None else "Не загружен")
+
+    leaderboard = get_leaderboard_cache().stats()
+    leaderboard_col.markdown("**Снимки лидербордов**")
+    leaderboard_col.write(f"Попаданий: {leaderboard['hits']}, промахов: {leaderboard['misses']}")
+    leaderboard_col.write(f"Снимков: {leaderboard['snapshots']}")
+
+    judge_cache = get_judge_cache().stats()
+    judge_cache_col.markdown("**Кэш результатов Judge0**")
+    judge_cache_col.write(f"Попаданий: {judge_cache['hits']}, промахов: {judge_cache['misses']}")
+    judge_cache_col.write(f"Записей: {judge_cache['size']}")
+
+    judge0 = get_judge0_client().stats
+    judge0_col.markdown("**Клиент Judge0**")
+    judge0_col.write(f"Запросов: {judge0['requests']}, повторов: {judge0['retries']}")
+    judge0_col.write(f"Ответов 429: {judge0['rate_limited']}, неудач: {judge0['failures']}")
+
+
+def show_diagnostics_page():
+    st.title("Диагностика")
+    st.write("Статистика процесса с момента запуска: запросы к БД, пул соединений, кэши и Judge0.")
+    show_pool_stats()
+    show_query_stats()
+    show_cache_stats()
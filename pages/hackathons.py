@@ -0,0 +1,68 @@
+import streamlit as st
+from db import get_contest_rollup_page, is_contest_rollup_installed
+from utils.contest_rollup import get_contest_rollup_refresher
+
+# Сколько хакатонов показывается на одной странице
+CONTEST_PAGE_SIZE = 20
+
+CONTEST_STATUSES = {
+    None: "Все",
+    "running": "Идут",
+    "upcoming": "Предстоящие",
+    "finished": "Завершённые"
+}
+
+
+def show_hackathons_page():
+    """
+    Список хакатонов из сводной таблицы "ContestRollup" (пересчитывается фоновым потоком и при создании хакатона)
+    с фильтром по статусу и постраничным просмотром на стороне БД (keyset-пагинация).
+    """
+    st.title("Хакатоны")
+    if not is_contest_rollup_installed():
+        st.warning("Сводная таблица хакатонов не установлена. Выполните: `python -m utils.contest_rollup install`")
+        return
+    refresher = get_contest_rollup_refresher()
+
+    status = st.radio(
+        "Статус", list(CONTEST_STATUSES), format_func=CONTEST_STATUSES.get, horizontal=True, key="contest_status"
+    )
+
+    # Стек курсоров просмотренных страниц; при смене фильтра листание начинается сначала
+    if "contest_page_cursors" not in st.session_state or st.session_state.contest_page_status != status:
+        st.session_state.contest_page_status = status
+        st.session_state.contest_page_cursors = [None]
+    cursors = st.session_state.contest_page_cursors
+
+    rows, next_cursor, total = get_contest_rollup_page(status, cursors[-1], CONTEST_PAGE_SIZE)
+    if not rows:
+        st.info("Хакатонов нет.")
+        return
+
+    st.dataframe([
+        {
+            "Название": row["title"],
+            "Статус": CONTEST_STATUSES[row["status"]],
+            "Начало": row["startTime"],
+            "Окончание": row["endTime"],
+            "Задач": row["problems"],
+            "Участников": row["participants"],
+            "Решений": row["solves"],
+            "Скрытый": "Да" if row["hidden"] else "Нет"
+        }
+        for row in rows
+    ], hide_index=True)
+
+    pages = max(1, -(-total // CONTEST_PAGE_SIZE))
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    prev_col.button("← Назад", disabled=len(cursors) == 1, on_click=cursors.pop, key="contest_page_prev")
+    page_col.caption(f"Страница {len(cursors)} из {pages}, всего хакатонов: {total}")
+    next_col.button(
+        "Далее →", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,),
+        key="contest_page_next"
+    )
+
+    if refresher.interval > 0:
+        st.caption(f"Сводка обновляется раз в {refresher.interval:g} с и при создании хакатона.")
+    else:
+        st.caption("Сводка обновляется по расписанию (python -m utils.contest_rollup refresh) и при создании хакатона.")
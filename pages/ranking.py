@@ -0,0 +1,53 @@
+import streamlit as st
+from db import get_leaderboard_contests, is_leaderboard_installed
+from utils.leaderboard_cache import get_leaderboard_cache
+
+# Варианты размера топа на странице рейтинга
+LEADERBOARD_SIZES = [10, 50, 100, 500]
+
+
+def show_ranking_page():
+    st.title("Рейтинг")
+    st.write("Лидерборд контестов: участники с наибольшим числом очков.")
+
+    if not is_leaderboard_installed():
+        st.warning("Сводная таблица лидерборда не установлена. Выполните: `python -m utils.leaderboard install`")
+        return
+
+    contests = get_leaderboard_contests()
+    if not contests:
+        st.info("Пока нет контестов с лидербордом.")
+        return
+
+    contest_col, size_col = st.columns([3, 1])
+    contest = contest_col.selectbox(
+        "Контест",
+        contests,
+        format_func=lambda c: f"{c['title']} ({c['startTime']:%d.%m.%Y})",
+        key="ranking_contest"
+    )
+    limit = size_col.selectbox("Показать", LEADERBOARD_SIZES, index=2, key="ranking_limit")
+
+    cache = get_leaderboard_cache()
+    if st.button("Обновить 🔄"):
+        cache.invalidate(contest["id"])
+    snapshot = cache.get(contest["id"], limit)
+
+    st.caption(
+        f"Участников: {snapshot['participants']}. "
+        f"Данные на {snapshot['refreshed_at']:%H:%M:%S} (обновляются раз в {cache.ttl:g} с)"
+    )
+    if not snapshot["rows"]:
+        st.write("В этом контесте ещё нет отправок.")
+        return
+
+    st.dataframe([
+        {
+            "Место": row["rank"],
+            "Участник": row["name"] or row["email"] or row["userId"],
+            "Очки": row["points"],
+            "Решено задач": row["solved"],
+            "Последняя отправка": row["lastSubmissionAt"]
+        }
+        for row in snapshot["rows"]
+    ], hide_index=True)
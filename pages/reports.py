@@ -0,0 +1,180 @@
+import glob
+import os
+import tempfile
+import time
+import streamlit as st
+from utils.reports import (
+    REPORT_EXPORTS,
+    export_report,
+    get_contest_activity,
+    get_difficulty_stats,
+    get_problem_stats,
+    get_report_contests,
+    get_report_state,
+    run_report_aggregation
+)
+
+PROBLEM_ORDERS = {
+    "hardest": "Самые сложные",
+    "easiest": "Самые простые",
+    "popular": "Самые популярные"
+}
+
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+# Файл для download_button целиком читается в память сервера и уходит через websocket Streamlit,
+# поэтому из админки выгружаются только файлы до этого размера; большие — через python -m utils.reports export
+REPORT_EXPORT_MAX_BYTES = int(os.getenv("REPORT_EXPORT_MAX_BYTES", 50 * 1024 * 1024))
+
+# Из админки выгружаются только сводные таблицы отчётов; выгрузка всех отправок сортирует "Submission" целиком
+# и доступна только через python -m utils.reports export submissions
+PAGE_REPORT_EXPORTS = ["problem_stats", "difficulty_stats", "contest_activity"]
+
+# Временные файлы выгрузок: префикс и сколько секунд файл живёт, если сессия закончилась без новой выгрузки
+REPORT_EXPORT_PREFIX = "codigma-report-"
+REPORT_EXPORT_TTL = 60 * 60
+
+
+def _percent(value):
+    return "—" if value is None else f"{value * 100:.1f}%"
+
+
+def show_difficulty_stats():
+    st.subheader("По сложности 📊")
+    rows = get_difficulty_stats()
+    if not rows:
+        st.write("Нет данных.")
+        return
+    cols = st.columns(len(rows))
+    for col, row in zip(cols, rows):
+        col.metric(
+            row["difficulty"].capitalize(),
+            _percent(row["avgSolveRate"]),
+            help=f"Задач: {row['problems']}, отправок: {row['submissions']}, принято: {row['accepted']}"
+        )
+    st.caption("Средняя доля принятых отправок по задачам")
+
+
+def show_problem_stats():
+    st.subheader("Решаемость задач 🧩")
+    order_col, difficulty_col = st.columns([3, 1])
+    order = order_col.radio(
+        "Порядок", list(PROBLEM_ORDERS), format_func=PROBLEM_ORDERS.get, horizontal=True, key="report_problem_order"
+    )
+    difficulty = difficulty_col.selectbox(
+        "Сложность", [None, "Easy", "Medium", "Hard"], format_func=lambda d: d or "Любая",
+        key="report_problem_difficulty"
+    )
+    rows = get_problem_stats(order, difficulty)
+    if not rows:
+        st.write("Нет задач с проверенными отправками.")
+        return
+    st.dataframe([
+        {
+            "Задача": row["title"],
+            "Сложность": row["difficulty"].capitalize(),
+            "Отправок": row["submissions"],
+            "Принято": row["accepted"],
+            "Доля принятых": _percent(row["solveRate"]),
+            "Пытались": row["usersAttempted"],
+            "Решили": row["usersSolved"]
+        }
+        for row in rows
+    ], hide_index=True)
+
+
+def show_contest_activity():
+    st.subheader("Активность в контестах 📈")
+    contests = get_report_contests()
+    if not contests:
+        st.write("В контестах ещё не было отправок.")
+        return
+    contest = st.selectbox(
+        "Контест", contests, format_func=lambda c: f"{c['contestTitle']} ({c['submissions']} отправок)",
+        key="report_contest"
+    )
+    rows = get_contest_activity(contest["contestId"])
+    st.line_chart(
+        {
+            "Отправок": {row["day"].isoformat(): row["submissions"] for row in rows},
+            "Принято": {row["day"].isoformat(): row["accepted"] for row in rows},
+            "Участников": {row["day"].isoformat(): row["activeUsers"] for row in rows}
+        }
+    )
+
+
+def _remove_stale_exports():
+    """
+    Удаляет временные файлы выгрузок старше REPORT_EXPORT_TTL, оставшиеся от закончившихся сессий.
+    """
+    deadline = time.time() - REPORT_EXPORT_TTL
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), f"{REPORT_EXPORT_PREFIX}*")):
+        try:
+            if os.path.getmtime(path) < deadline:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def show_report_export():
+    st.subheader("Выгрузка 💾")
+    report_col, format_col = st.columns([3, 1])
+    report = report_col.selectbox(
+        "Отчёт", PAGE_REPORT_EXPORTS, format_func=lambda r: REPORT_EXPORTS[r]["title"], key="report_export_name"
+    )
+    fmt = format_col.selectbox("Формат", list(EXPORT_MIME_TYPES), format_func=str.upper, key="report_export_format")
+
+    if st.button("Подготовить файл"):
+        _remove_stale_exports()
+        previous = st.session_state.pop("report_export", None)
+        if previous and os.path.exists(previous["path"]):
+            os.remove(previous["path"])
+        # Файл пишется на диск пачками через серверный курсор, а не собирается в памяти
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}", prefix=f"{REPORT_EXPORT_PREFIX}{report}-")
+        os.close(fd)
+        try:
+            with st.spinner("Выгрузка..."):
+                rows = export_report(report, path, fmt, max_bytes=REPORT_EXPORT_MAX_BYTES)
+        except ValueError as e:
+            os.remove(path)
+            st.warning(str(e))
+        else:
+            st.session_state.report_export = {"path": path, "report": report, "format": fmt, "rows": rows}
+
+    export = st.session_state.get("report_export")
+    if export and os.path.exists(export["path"]):
+        with open(export["path"], "rb") as f:
+            st.download_button(
+                f"Скачать {REPORT_EXPORTS[export['report']]['title']} ({export['rows']} строк, {export['format'].upper()})",
+                f,
+                file_name=f"{export['report']}.{export['format']}",
+                mime=EXPORT_MIME_TYPES[export["format"]]
+            )
+
+
+def show_reports_page():
+    """
+    Отчёты читаются только из предагрегированных таблиц (см. utils.reports.run_report_aggregation),
+    которые пересчитываются инкрементально: кнопкой на странице или по расписанию
+    (python -m utils.reports aggregate).
+    """
+    st.title("Отчёты")
+
+    state = get_report_state()
+    info_col, refresh_col = st.columns([3, 1])
+    if refresh_col.button("Пересчитать 🔄"):
+        with st.spinner("Пересчёт отчётов..."):
+            run_report_aggregation()
+        state = get_report_state()
+    if state is None:
+        info_col.info("Отчёты ещё не считались — нажмите «Пересчитать».")
+        return
+    info_col.caption(f"Пересчитаны {state['lastRunAt']:%d.%m.%Y %H:%M:%S} за {state['lastDuration']:.1f} с")
+
+    show_difficulty_stats()
+    show_problem_stats()
+    show_contest_activity()
+    show_report_export()
@@ -1,4 +1,5 @@
 import streamlit as st
+from auth import clear_user_role
 
 
 def show_settings_page():
@@ -9,6 +10,7 @@ def show_settings_page():
 
     st.subheader("Управление аккаунтом 👤")
     if st.button("Выйти из аккаунта 🚪"):
+        clear_user_role()
         st.logout()
 
 
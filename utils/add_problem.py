@@ -1,27 +1,90 @@
-import psycopg2
+import json
 import uuid
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from db import connection, insert_rows
+from utils.problem_catalog import get_problem_catalog
 
 load_dotenv()
 
+# Базовая директория с файлами задач (не забудьте, что обратные слэши экранируются или используйте raw-string)
+PROBLEMS_DIR = os.getenv("PROBLEMS_DIR", r"C:\Users\ACER\Desktop\DIP\codigma\apps\problems")
 
-def create_problem_files(json_data):
+# Имена файлов с кодом для каждого языка (boilerplate, boilerplate-full, reference)
+LANG_FILE_MAPPING = {
+    "C++": "function.cpp",
+    "JavaScript": "function.js",
+    "Rust": "function.rs",
+    "Java": "function.java"
+}
+
+
+def get_problem_dir(title, base_dir=None):
     """
-    Функция создает файловую структуру для задачи.
-    В базовой директории (problems) создается папка с именем функции,
-    форматированным: символы "_" заменяются на "-".
-    Внутри неё создается папка tests, где располагаются подпапки inputs и outputs,
-    а также создаются папки boilerplate, boilerplate-full и файлы Problem.md и Structure.md.
+    Возвращает папку задачи: название в нижнем регистре, пробелы заменены на "-".
+    """
+    formatted_function_name = (title or "default_function").lower().replace(" ", "-")
+    return os.path.join(base_dir or PROBLEMS_DIR, formatted_function_name)
+
+
+def read_problem_metadata(problem_dir):
+    """
+    Разбирает Structure.md задачи обратно в metadata для problem_generator:
+    {"task_name", "function_name", "difficulty", "inputs": [{"name", "type"}], "outputs": [{"name", "type"}]}.
+    В Structure.md старых задач нет строки Difficulty — тогда difficulty пустая.
+    Возвращает None, если файла нет.
     """
-    # Базовая директория (не забудьте, что обратные слэши экранируются или используйте raw-string)
-    base_dir = r"C:\Users\ACER\Desktop\DIP\codigma\apps\problems"
+    structure_md_path = os.path.join(problem_dir, "Structure.md")
+    if not os.path.exists(structure_md_path):
+        return None
+
+    metadata = {"task_name": "", "function_name": "", "difficulty": "", "inputs": [], "outputs": []}
+    with open(structure_md_path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, _, value = line.rstrip("\n").partition(": ")
+            if key == "Problem Name":
+                metadata["task_name"] = value
+            elif key == "Function Name":
+                metadata["function_name"] = value
+            elif key == "Difficulty":
+                metadata["difficulty"] = value
+            elif key in ("Input Field", "Output Field"):
+                # Тип не содержит пробелов (int, list<list<int>>), имя поля идёт после первого пробела
+                field_type, _, field_name = value.partition(" ")
+                target = metadata["inputs"] if key == "Input Field" else metadata["outputs"]
+                target.append({"name": field_name, "type": field_type})
+    return metadata
+
 
-    # Получаем имя функции и форматируем его (нижний регистр, "_" заменяем на "-")
-    function_name = json_data.get("Название задачи", "default_function")
-    formatted_function_name = function_name.lower().replace(" ", "-")
-    problem_dir = os.path.join(base_dir, formatted_function_name)
+def read_reference_solutions(problem_dir):
+    """
+    Читает эталонные решения задачи из папки reference: {язык: код функции}.
+    Пустые и отсутствующие файлы пропускаются.
+    """
+    reference_dir = os.path.join(problem_dir, "reference")
+    solutions = {}
+    for lang, filename in LANG_FILE_MAPPING.items():
+        path = os.path.join(reference_dir, filename)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                code = f.read()
+            if code.strip():
+                solutions[lang] = code
+    return solutions
+
+
+def create_problem_files(json_data, base_dir=None):
+    """
+    Функция создает файловую структуру для задачи и возвращает путь к её папке.
+    В базовой директории (base_dir, по умолчанию PROBLEMS_DIR) создается папка с именем задачи,
+    форматированным: пробелы заменяются на "-".
+    Внутри неё создается папка tests, где располагаются подпапки inputs и outputs,
+    а также создаются папки boilerplate, boilerplate-full, reference и файлы Problem.md, Structure.md и Metrics.json.
+    Structure.md, Metrics.json и reference пишутся, только если их данные есть в json_data
+    (в БД они не хранятся, поэтому при выгрузке из БД существующие файлы сохраняются).
+    """
+    problem_dir = get_problem_dir(json_data.get("Название задачи", "default_function"), base_dir)
     os.makedirs(problem_dir, exist_ok=True)
 
     # Создаем папку tests и внутри неё папки inputs и outputs
@@ -32,6 +95,12 @@ def create_problem_files(json_data):
     os.makedirs(inputs_dir, exist_ok=True)
     os.makedirs(outputs_dir, exist_ok=True)
 
+    # Удаляем файлы прежних тесткейсов, чтобы при перезаписи не осталось лишних
+    for old_dir in (inputs_dir, outputs_dir):
+        for name in os.listdir(old_dir):
+            if name.endswith(".txt"):
+                os.remove(os.path.join(old_dir, name))
+
     # Создаем файлы тесткейсов
     testcases = json_data.get("Сгенерированные тесткейсы", [])
     for index, tc in enumerate(testcases):
@@ -47,14 +116,8 @@ def create_problem_files(json_data):
     # Создаем папку boilerplate и записываем в нее шаблонные коды для каждого языка
     boilerplate_dir = os.path.join(problem_dir, "boilerplate")
     os.makedirs(boilerplate_dir, exist_ok=True)
-    lang_file_mapping = {
-        "C++": "function.cpp",
-        "JavaScript": "function.js",
-        "Rust": "function.rs",
-        "Java": "function.java"
-    }
     template_codes = json_data.get("Шаблонные коды", {})
-    for lang, filename in lang_file_mapping.items():
+    for lang, filename in LANG_FILE_MAPPING.items():
         code = template_codes.get(lang, "")
         with open(os.path.join(boilerplate_dir, filename), "w", encoding="utf-8") as f:
             f.write(code)
@@ -63,11 +126,21 @@ def create_problem_files(json_data):
     boilerplate_full_dir = os.path.join(problem_dir, "boilerplate-full")
     os.makedirs(boilerplate_full_dir, exist_ok=True)
     full_template_codes = json_data.get("Полные шаблонные коды", {})
-    for lang, filename in lang_file_mapping.items():
+    for lang, filename in LANG_FILE_MAPPING.items():
         fullcode = full_template_codes.get(lang, "")
         with open(os.path.join(boilerplate_full_dir, filename), "w", encoding="utf-8") as f:
             f.write(fullcode)
 
+    # Создаем папку reference с эталонными решениями (по ним задача перепроверяется после смены шаблонов)
+    if "Эталонные решения" in json_data:
+        reference_dir = os.path.join(problem_dir, "reference")
+        os.makedirs(reference_dir, exist_ok=True)
+        reference_solutions = json_data["Эталонные решения"]
+        for lang, filename in LANG_FILE_MAPPING.items():
+            if reference_solutions.get(lang, "").strip():
+                with open(os.path.join(reference_dir, filename), "w", encoding="utf-8") as f:
+                    f.write(reference_solutions[lang])
+
     # Создаем файл Problem.md с условием задачи
     problem_md_path = os.path.join(problem_dir, "Problem.md")
     problem_statement = json_data.get("Условия задачи", "")
@@ -75,26 +148,105 @@ def create_problem_files(json_data):
         f.write(problem_statement)
 
     # Создаем файл Structure.md с описанием структуры входных и выходных данных
-    structure_md_path = os.path.join(problem_dir, "Structure.md")
-    structure_data = json_data.get("Структура входных и выходных данных", {})
-    structure_lines = []
-    structure_lines.append(f"Problem Name: {json_data.get('Название задачи', '')}")
-    structure_lines.append(f"Function Name: {json_data.get('Название функции', '')}")
-    structure_lines.append("Input Structure:")
-    for inp in structure_data.get("inputs", []):
-        field_type = inp.get("type", "")
-        field_name = inp.get("name", "")
-        structure_lines.append(f"Input Field: {field_type} {field_name}")
-    structure_lines.append("Output Structure:")
-    for out in structure_data.get("outputs", []):
-        field_type = out.get("type", "")
-        field_name = out.get("name", "")
-        structure_lines.append(f"Output Field: {field_type} {field_name}")
-
-    with open(structure_md_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(structure_lines))
+    if "Структура входных и выходных данных" in json_data:
+        structure_md_path = os.path.join(problem_dir, "Structure.md")
+        structure_data = json_data["Структура входных и выходных данных"]
+        structure_lines = []
+        structure_lines.append(f"Problem Name: {json_data.get('Название задачи', '')}")
+        structure_lines.append(f"Function Name: {json_data.get('Название функции', '')}")
+        structure_lines.append(f"Difficulty: {json_data.get('Сложность алгоритма', '')}")
+        structure_lines.append("Input Structure:")
+        for inp in structure_data.get("inputs", []):
+            field_type = inp.get("type", "")
+            field_name = inp.get("name", "")
+            structure_lines.append(f"Input Field: {field_type} {field_name}")
+        structure_lines.append("Output Structure:")
+        for out in structure_data.get("outputs", []):
+            field_type = out.get("type", "")
+            field_name = out.get("name", "")
+            structure_lines.append(f"Output Field: {field_type} {field_name}")
+
+        with open(structure_md_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(structure_lines))
+
+    # Создаем файл Metrics.json с временем и памятью эталонного решения (max/p50/p95)
+    if "Метрики эталонного решения" in json_data:
+        metrics_path = os.path.join(problem_dir, "Metrics.json")
+        with open(metrics_path, "w", encoding="utf-8") as f:
+            json.dump(json_data["Метрики эталонного решения"], f, ensure_ascii=False, indent=4)
 
     print(f"Файлы задачи созданы в: {problem_dir}")
+    return problem_dir
+
+# Столбцы таблиц, в которые сохраняется задача
+PROBLEM_COLUMNS = [
+    "id", "title", "description", "hidden", "slug", "solved", "createdAt", "updatedAt", "difficulty", "problemMarkdown"
+]
+TESTCASE_COLUMNS = ["id", "input", "output", "problemId"]
+DEFAULTCODE_COLUMNS = ["id", "languageId", "problemId", "code", "createdAt", "updatedAt", "fullcode"]
+
+# Мэппинг языков в DefaultCode: JavaScript → 1, C++ → 2, Rust → 3, Java → 4
+LANGUAGE_IDS = {
+    "JavaScript": 1,
+    "C++": 2,
+    "Rust": 3,
+    "Java": 4
+}
+
+
+def build_problem_rows(json_data, now=None):
+    """
+    Готовит строки таблиц Problem, TestCase и DefaultCode для одной задачи (формат JSON — см. save_problem_data).
+    Возвращает {"Problem": [строка], "TestCase": [строка], "DefaultCode": [строки]},
+    строки — кортежи в порядке PROBLEM_COLUMNS, TESTCASE_COLUMNS и DEFAULTCODE_COLUMNS.
+    """
+    now = now or datetime.now()
+    problem_id = str(uuid.uuid4())
+    description = json_data.get("Условия задачи", "")
+
+    problem_row = (
+        problem_id,
+        json_data.get("Название задачи", ""),
+        description,
+        False,  # hidden всегда false
+        json_data.get("Название функции", ""),  # slug
+        0,  # solved всегда 0
+        now,
+        now,
+        json_data.get("Сложность алгоритма", "").upper(),
+        description  # "problemMarkdown" – используем условие задачи
+    )
+
+    # Входы и ожидаемые выходы всех тесткейсов хранятся в одной строке TestCase в виде массивов строк
+    testcases = json_data.get("Сгенерированные тесткейсы", [])
+    testcase_row = (
+        str(uuid.uuid4()),
+        [tc.get("input", "") for tc in testcases],
+        [tc.get("expected_output", "") for tc in testcases],
+        problem_id
+    )
+
+    codes = json_data.get("Шаблонные коды", {})
+    fullcodes = json_data.get("Полные шаблонные коды", {})
+    defaultcode_rows = [
+        (str(uuid.uuid4()), LANGUAGE_IDS[lang], problem_id, code, now, now, fullcodes.get(lang, ""))
+        for lang, code in codes.items()
+        if lang in LANGUAGE_IDS  # если язык не поддерживается, пропускаем
+    ]
+
+    return {"Problem": [problem_row], "TestCase": [testcase_row], "DefaultCode": defaultcode_rows}
+
+
+def insert_problem_rows(cur, rows, copy_threshold=None):
+    """
+    Вставляет строки, собранные build_problem_rows (можно объединить строки нескольких задач),
+    в текущей транзакции: по одному запросу (или COPY) на таблицу.
+    """
+    kwargs = {} if copy_threshold is None else {"copy_threshold": copy_threshold}
+    insert_rows(cur, "Problem", PROBLEM_COLUMNS, rows["Problem"], **kwargs)
+    insert_rows(cur, "TestCase", TESTCASE_COLUMNS, rows["TestCase"], **kwargs)
+    insert_rows(cur, "DefaultCode", DEFAULTCODE_COLUMNS, rows["DefaultCode"], **kwargs)
+
 
 def save_problem_data(json_data):
     """
@@ -110,117 +262,27 @@ def save_problem_data(json_data):
         - "Шаблонные коды": словарь с кодами для каждого языка
         - "Полные шаблонные коды": словарь с полными шаблонными кодами для каждого языка
         - "Сгенерированные тесткейсы": список объектов с полями "input" и "expected_output"
+        - "Метрики эталонного решения": max/p50/p95 времени и памяти (сохраняются в Metrics.json, не в БД)
+        - "Эталонные решения": {язык: код функции} (сохраняются в папку reference, не в БД)
     """
-    # Параметры подключения к БД
-    conn_params = {
-        "dbname": os.getenv('DB_NAME'),
-        "user": os.getenv('DB_USER'),
-        "password": os.getenv('DB_PASSWORD'),
-        "host": os.getenv('DB_HOST'),
-        "port": int(os.getenv('DB_PORT'))
-    }
-
-    conn = None
     try:
-        conn = psycopg2.connect(**conn_params)
-        cur = conn.cursor()
-        now = datetime.now()
-
-        # 1. Сохраняем задачу в таблице Problem
-        problem_id = str(uuid.uuid4())
-        title = json_data.get("Название задачи", "")
-        description = json_data.get("Условия задачи", "")
-        slug = json_data.get("Название функции", "")
-        difficulty = json_data.get("Сложность алгоритма", "").upper()
-
-        query_problem = """
-            INSERT INTO "Problem" 
-                (id, title, description, hidden, slug, solved, "createdAt", "updatedAt", difficulty, "problemMarkdown")
-            VALUES 
-                (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cur.execute(query_problem, (
-            problem_id,
-            title,
-            description,
-            False,  # hidden всегда false
-            slug,
-            0,  # solved всегда 0
-            now,
-            now,
-            difficulty,
-            description  # "problemMarkdown" – используем условие задачи
-        ))
-
-        # 2. Сохраняем тесткейсы в таблице TestCase
-        testcases = json_data.get("Сгенерированные тесткейсы", [])
-        # Собираем входы и ожидаемые выходы в виде массивов строк
-        inputs = [tc.get("input", "") for tc in testcases]
-        outputs = [tc.get("expected_output", "") for tc in testcases]
-        testcase_id = str(uuid.uuid4())
-        query_testcase = """
-            INSERT INTO "TestCase" 
-                (id, input, output, "problemId")
-            VALUES 
-                (%s, %s, %s, %s)
-        """
-        cur.execute(query_testcase, (
-            testcase_id,
-            inputs,
-            outputs,
-            problem_id
-        ))
-
-        # 3. Сохраняем шаблонные коды и полные шаблонные коды в таблице DefaultCode
-        # Мэппинг языков: JavaScript → 1, C++ → 2, Rust → 3, Java → 4
-        lang_mapping = {
-            "JavaScript": 1,
-            "C++": 2,
-            "Rust": 3,
-            "Java": 4
-        }
-        codes = json_data.get("Шаблонные коды", {})
-        fullcodes = json_data.get("Полные шаблонные коды", {})
-
-        query_defaultcode = """
-            INSERT INTO "DefaultCode" 
-                (id, "languageId", "problemId", code, "createdAt", "updatedAt", fullcode)
-            VALUES 
-                (%s, %s, %s, %s, %s, %s, %s)
-        """
-
-        # Для каждого языка вставляем отдельную запись
-        for lang, code in codes.items():
-            if lang not in lang_mapping:
-                continue  # если язык не поддерживается, пропускаем
-            languageId = lang_mapping[lang]
-            fullcode = fullcodes.get(lang, "")
-            defaultcode_id = str(uuid.uuid4())
-            cur.execute(query_defaultcode, (
-                defaultcode_id,
-                languageId,
-                problem_id,
-                code,
-                now,
-                now,
-                fullcode
-            ))
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        # Соединение берётся из общего пула; при ошибке незакоммиченные изменения откатываются при его возврате
+        with connection() as conn:
+            cur = conn.cursor()
+            insert_problem_rows(cur, build_problem_rows(json_data))
+            conn.commit()
+            cur.close()
         return {"status": "success", "message": "Сохранено"}
 
     except Exception as e:
-        if conn:
-            conn.rollback()
-            conn.close()
         return {"status": "error", "message": str(e)}
 
 
 def add_problem(data):
     result = save_problem_data(data)
     if result.get("status") == "success":
+        # Новая задача должна сразу появиться в списках (например, при создании хакатона)
+        get_problem_catalog().invalidate()
         try:
             create_problem_files(data)
             return True
@@ -0,0 +1,168 @@
+import argparse
+import json
+import math
+import sys
+import time
+from utils.judge0_callback import Judge0CallbackReceiver
+from utils.judge0_client import TokenBucket, configure_judge0_client
+from utils.judge0_mock import MockJudge0Server
+from utils.run_tests_on_code import (
+    run_judge0_testcases,
+    run_judge0_testcases_batch,
+    run_judge0_testcases_callback,
+    run_judge0_testcases_concurrent
+)
+
+BENCHMARK_RUNNERS = {
+    "batch": run_judge0_testcases_batch,
+    "concurrent": run_judge0_testcases_concurrent,
+    "sequential": run_judge0_testcases,
+    "callback": run_judge0_testcases_callback
+}
+
+BENCHMARK_SIZES = [1, 10, 50, 200]
+
+# Допустимое ухудшение относительно базового замера (доля), прежде чем оно считается регрессией
+BENCHMARK_TOLERANCE = 0.2
+
+
+def _latency_percentile(latencies, percent):
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+    return latencies[max(1, math.ceil(percent / 100 * len(latencies))) - 1]
+
+
+def benchmark_runner(runner, size, mock, rate_limit, receiver=None):
+    """
+    Прогоняет size тесткейсов через раннер на локальном моке Judge0 и возвращает замер:
+    {"runner", "size", "elapsed", "tests_per_second", "latency_p50", "latency_p95",
+    "requests", "retries", "rate_limited", "server_requests", "correct"}.
+    Задержка тесткейса — время от начала прогона до его результата (on_result).
+    """
+    configure_judge0_client(
+        base_url=mock.url,
+        headers={"content-type": "application/json"},
+        bucket=TokenBucket(rate=rate_limit, burst=max(1, int(rate_limit)))
+    )
+    mock.reset_stats()
+
+    data = {
+        "language_id": 54,
+        "source_code": f"// benchmark {runner} {size} {time.time()}",
+        "testcases": [{"stdin": str(idx), "expected_output": str(idx)} for idx in range(size)]
+    }
+    latencies = []
+    start = time.monotonic()
+
+    def on_result(idx, result):
+        latencies.append(time.monotonic() - start)
+
+    runner_kwargs = {"receiver": receiver} if runner == "callback" else {}
+    answer = BENCHMARK_RUNNERS[runner](data, on_result=on_result, **runner_kwargs)
+    elapsed = time.monotonic() - start
+
+    judge_stats = answer.get("judge_stats", {})
+    return {
+        "runner": runner,
+        "size": size,
+        "elapsed": elapsed,
+        "tests_per_second": size / elapsed if elapsed else None,
+        "latency_p50": _latency_percentile(latencies, 50),
+        "latency_p95": _latency_percentile(latencies, 95),
+        "requests": judge_stats.get("requests"),
+        "retries": judge_stats.get("retries"),
+        "rate_limited": judge_stats.get("rate_limited"),
+        "server_requests": mock.stats["requests"],
+        "correct": answer["correct_tests_count"]
+    }
+
+
+def run_benchmarks(runners=None, sizes=None, client_rate_limit=1000.0, **mock_kwargs):
+    """
+    Запускает локальный мок Judge0 (параметры — см. MockJudge0Server) и замеряет каждый раннер
+    на каждом размере набора тесткейсов; client_rate_limit — ограничение частоты запросов клиента.
+    Возвращает список замеров benchmark_runner.
+    """
+    mock = MockJudge0Server(**mock_kwargs).start()
+    receiver = Judge0CallbackReceiver(host="127.0.0.1").start()
+    receiver.public_url = f"http://127.0.0.1:{receiver.port}/"
+    try:
+        return [
+            benchmark_runner(runner, size, mock, client_rate_limit, receiver)
+            for runner in (runners or list(BENCHMARK_RUNNERS))
+            for size in (sizes or BENCHMARK_SIZES)
+        ]
+    finally:
+        receiver.stop()
+        mock.stop()
+
+
+def compare_with_baseline(rows, baseline_rows, tolerance=BENCHMARK_TOLERANCE):
+    """
+    Сравнивает замеры с базовыми (по runner и size). Регрессия — падение tests/sec или рост p95 задержки
+    и числа запросов больше чем на tolerance. Возвращает список описаний регрессий.
+    """
+    baseline = {(row["runner"], row["size"]): row for row in baseline_rows}
+    regressions = []
+    for row in rows:
+        base = baseline.get((row["runner"], row["size"]))
+        if base is None:
+            continue
+        name = f"{row['runner']}/{row['size']}"
+        if row["tests_per_second"] < base["tests_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: tests/sec {base['tests_per_second']:.1f} → {row['tests_per_second']:.1f}")
+        if row["latency_p95"] > base["latency_p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['latency_p95']:.3f}s → {row['latency_p95']:.3f}s")
+        if row["server_requests"] > base["server_requests"] * (1 + tolerance):
+            regressions.append(f"{name}: запросов {base['server_requests']} → {row['server_requests']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк раннеров тесткейсов на локальном моке Judge0")
+    parser.add_argument("--runners", nargs="+", default=list(BENCHMARK_RUNNERS), choices=list(BENCHMARK_RUNNERS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=BENCHMARK_SIZES, help="размеры наборов тесткейсов")
+    parser.add_argument("--rate-limit", type=float, default=1000.0,
+                        help="ограничение частоты запросов клиента (запросов в секунду)")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа мока на запрос, с")
+    parser.add_argument("--queue-delay", type=float, default=0.1, help="время до готовности сабмишена в моке, с")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="доля запросов с ответом 503")
+    parser.add_argument("--mock-rate-limit", type=float, default=None, help="запросов в секунду до ответа 429 в моке")
+    parser.add_argument("--retry-after", type=int, default=1, help="значение Retry-After в ответе 429, с")
+    parser.add_argument("--output", default=None, help="сохранить замеры в JSON (можно использовать как baseline)")
+    parser.add_argument("--baseline", default=None, help="JSON с базовыми замерами для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE)
+    args = parser.parse_args()
+
+    rows = run_benchmarks(
+        args.runners,
+        args.sizes,
+        client_rate_limit=args.rate_limit,
+        latency=args.latency,
+        queue_delay=args.queue_delay,
+        failure_rate=args.failure_rate,
+        rate_limit=args.mock_rate_limit,
+        retry_after=args.retry_after,
+        seed=0
+    )
+
+    print(f"{'runner':<12}{'size':>6}{'tests/s':>10}{'p50, s':>9}{'p95, s':>9}{'requests':>10}{'retries':>9}{'429':>6}")
+    for row in rows:
+        print(
+            f"{row['runner']:<12}{row['size']:>6}{row['tests_per_second']:>10.1f}{row['latency_p50'] or 0:>9.3f}"
+            f"{row['latency_p95'] or 0:>9.3f}{row['server_requests']:>10}{row['retries'] or 0:>9}"
+            f"{row['rate_limited'] or 0:>6}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(rows, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}")
+        if regressions:
+            sys.exit(1)
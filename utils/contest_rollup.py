@@ -0,0 +1,141 @@
+import argparse
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from db import connection, is_contest_rollup_installed, refresh_contest_rollup
+
+load_dotenv()
+
+# Раз в сколько секунд фоновый поток пересчитывает сводку хакатонов
+# (0 — поток не запускается, сводку пересчитывает cron: python -m utils.contest_rollup refresh)
+CONTEST_ROLLUP_INTERVAL = 60
+
+
+def install_contest_rollup():
+    """
+    Создаёт сводную таблицу хакатонов "ContestRollup": по строке на контест с числом задач, участников и решений
+    (участники и решения берутся из "ContestLeaderboard", если лидерборд установлен).
+    Статус (upcoming/running/finished) не хранится, а вычисляется по времени при чтении.
+
+    Это разовая миграция: админка её не выполняет (см. db.is_contest_rollup_installed).
+    Повторный запуск безопасен. Таблица, созданная впервые, сразу заполняется по всем контестам.
+    Возвращает True, если таблица была создана.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('ContestRollup'))")
+        cur.execute("""SELECT to_regclass('"ContestRollup"') IS NULL""")
+        created = cur.fetchone()[0]
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ContestRollup" (
+                "contestId" TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                "startTime" TIMESTAMP(3) NOT NULL,
+                "endTime" TIMESTAMP(3) NOT NULL,
+                hidden BOOLEAN NOT NULL,
+                problems INTEGER NOT NULL DEFAULT 0,
+                participants INTEGER NOT NULL DEFAULT 0,
+                solves INTEGER NOT NULL DEFAULT 0,
+                "contestUpdatedAt" TIMESTAMP,
+                "refreshedAt" TIMESTAMP(3) NOT NULL
+            )
+        """)
+        # Страницы списка хакатонов читаются keyset-пагинацией по ("startTime", "contestId")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS "ContestRollup_start_idx" ON "ContestRollup" ("startTime" DESC, "contestId" DESC)
+        """)
+        conn.commit()
+        cur.close()
+    if created:
+        refresh_contest_rollup(full=True)
+    return created
+
+
+class ContestRollupRefresher:
+    """
+    Фоновый поток, который раз в interval секунд пересчитывает сводку хакатонов
+    (только контесты, которые могли измениться, см. db.refresh_contest_rollup).
+    Первый пересчёт выполняется сразу после запуска потока, не задерживая вызывающий код.
+    Ошибки пересчёта печатаются и не останавливают поток; в stats — число запусков, ошибок и время последнего.
+    """
+
+    def __init__(self, interval=CONTEST_ROLLUP_INTERVAL, refresh=refresh_contest_rollup):
+        self.interval = interval
+        self._refresh = refresh
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.stats = {"runs": 0, "errors": 0, "refreshed": 0, "last_run": None, "last_duration": None}
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="contest-rollup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self):
+        start = time.monotonic()
+        try:
+            self.stats["refreshed"] += self._refresh()
+        except Exception as e:
+            self.stats["errors"] += 1
+            print("Ошибка при пересчёте сводки хакатонов:", e)
+        self.stats["runs"] += 1
+        self.stats["last_run"] = time.time()
+        self.stats["last_duration"] = time.monotonic() - start
+
+    def _run(self):
+        self.run_once()
+        while not self._stop_event.wait(self.interval):
+            self.run_once()
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def get_contest_rollup_refresher():
+    """
+    Возвращает общий для процесса поток пересчёта сводки хакатонов, запуская его при первом обращении
+    (вызывается при старте приложения, см. app.py).
+    Интервал задаётся через CONTEST_ROLLUP_INTERVAL (секунды); при 0 поток не запускается.
+    """
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = ContestRollupRefresher(
+                interval=float(os.getenv("CONTEST_ROLLUP_INTERVAL", CONTEST_ROLLUP_INTERVAL))
+            )
+            if _refresher.interval > 0:
+                _refresher.start()
+        return _refresher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Установка и пересчёт сводки хакатонов")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("install", help="создать таблицу \"ContestRollup\" (разовая миграция)")
+    refresh_parser = commands.add_parser(
+        "refresh", help="пересчитать сводку (например, из cron при CONTEST_ROLLUP_INTERVAL=0)"
+    )
+    refresh_parser.add_argument("--full", action="store_true", help="пересчитать все контесты, а не только изменившиеся")
+    commands.add_parser("status", help="проверить, установлена ли сводка")
+    args = parser.parse_args()
+
+    if args.command == "install":
+        created = install_contest_rollup()
+        print("Сводка хакатонов установлена" + (" и заполнена" if created else ""))
+    elif args.command == "refresh":
+        if not is_contest_rollup_installed():
+            print("Сводка хакатонов не установлена: python -m utils.contest_rollup install")
+        else:
+            print(f"Обновлено контестов: {refresh_contest_rollup(full=args.full)}")
+    else:
+        print("Сводка хакатонов установлена" if is_contest_rollup_installed() else "Сводка хакатонов не установлена")
@@ -0,0 +1,162 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from psycopg2.extras import RealDictCursor
+from db import connection
+from utils.add_problem import LANGUAGE_IDS, PROBLEMS_DIR, create_problem_files, get_problem_dir
+
+# Сколько строк серверный курсор забирает из БД за один раз
+EXPORT_FETCH_SIZE = 100
+
+# Сколько потоков пишет файлы задач
+EXPORT_WORKERS = 8
+
+# Файл в базовой директории с хэшами выгруженных задач: {id задачи: {"hash", "dir"}}
+EXPORT_MANIFEST = ".export_manifest.json"
+
+LANGUAGE_NAMES = {language_id: lang for lang, language_id in LANGUAGE_IDS.items()}
+
+
+def iter_problem_data(conn, fetch_size=EXPORT_FETCH_SIZE):
+    """
+    Потоково читает все задачи с тесткейсами и шаблонными кодами через серверный (именованный) курсор.
+    Отдаёт пары (id задачи, данные в формате save_problem_data).
+    """
+    with conn.cursor(name="export_problems", cursor_factory=RealDictCursor) as cur:
+        cur.itersize = fetch_size
+        cur.execute("""
+            SELECT p.id, p.title, p.description, p.slug, p.difficulty, t.input, t.output,
+                   (
+                       SELECT json_agg(json_build_object(
+                           'languageId', d."languageId", 'code', d.code, 'fullcode', d.fullcode
+                       ))
+                       FROM "DefaultCode" d
+                       WHERE d."problemId" = p.id
+                   ) AS codes
+            FROM "Problem" p
+            LEFT JOIN "TestCase" t ON t."problemId" = p.id
+            ORDER BY p.id
+        """)
+        for problem_id, rows in itertools.groupby(cur, key=lambda row: row["id"]):
+            rows = list(rows)
+            problem = rows[0]
+            testcases = []
+            for row in rows:
+                for stdin, expected_output in zip(row["input"] or [], row["output"] or []):
+                    testcases.append({"input": stdin, "expected_output": expected_output})
+            codes = {
+                LANGUAGE_NAMES[code["languageId"]]: code
+                for code in problem["codes"] or [] if code["languageId"] in LANGUAGE_NAMES
+            }
+            yield problem_id, {
+                "Название задачи": problem["title"],
+                "Сложность алгоритма": (problem["difficulty"] or "").capitalize(),
+                "Условия задачи": problem["description"] or "",
+                "Название функции": problem["slug"] or "",
+                "Шаблонные коды": {lang: code["code"] or "" for lang, code in codes.items()},
+                "Полные шаблонные коды": {lang: code["fullcode"] or "" for lang, code in codes.items()},
+                "Сгенерированные тесткейсы": testcases
+            }
+
+
+def content_hash(json_data):
+    return hashlib.sha256(json.dumps(json_data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def export_problems(base_dir=None, max_workers=EXPORT_WORKERS, fetch_size=EXPORT_FETCH_SIZE, force=False):
+    """
+    Выгружает все задачи из БД в base_dir в формате create_problem_files.
+
+    Задачи читаются потоково, а файлы пишутся в max_workers потоках (в работе не больше 2 * max_workers задач).
+    Задача пропускается, если хэш её содержимого совпадает с записанным в манифесте при прошлой выгрузке
+    и папка на месте (force — выгрузить всё заново). Из задач с одинаковой папкой (одинаковым названием)
+    выгружается первая, остальные попадают в errors. Structure.md, Metrics.json и reference в БД не хранятся,
+    поэтому уже существующие файлы остаются как есть.
+
+    Возвращает сводку {"problems", "written", "unchanged", "errors": [{"id", "error"}], "elapsed"}.
+    """
+    base_dir = base_dir or PROBLEMS_DIR
+    os.makedirs(base_dir, exist_ok=True)
+    manifest_path = os.path.join(base_dir, EXPORT_MANIFEST)
+    manifest = _load_manifest(manifest_path)
+    summary = {"problems": 0, "written": 0, "unchanged": 0, "errors": []}
+    start = time.monotonic()
+
+    exported = {}
+    claimed_dirs = set()
+
+    def collect(future, problem_id, digest):
+        try:
+            problem_dir = future.result()
+        except Exception as e:
+            summary["errors"].append({"id": problem_id, "error": str(e)})
+            return
+        exported[problem_id] = {"hash": digest, "dir": os.path.basename(problem_dir)}
+        summary["written"] += 1
+
+    with connection() as conn, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export") as executor:
+        pending = {}
+        for problem_id, json_data in iter_problem_data(conn, fetch_size):
+            summary["problems"] += 1
+            digest = content_hash(json_data)
+            previous = manifest.get(problem_id)
+            if (not force and previous and previous["hash"] == digest
+                    and os.path.isdir(os.path.join(base_dir, previous["dir"]))):
+                exported[problem_id] = previous
+                claimed_dirs.add(previous["dir"])
+                summary["unchanged"] += 1
+                continue
+
+            # Папка задачи определяется названием: задачи с одинаковыми названиями писали бы в одну папку
+            dir_name = os.path.basename(get_problem_dir(json_data["Название задачи"], base_dir))
+            if dir_name in claimed_dirs:
+                summary["errors"].append({"id": problem_id, "error": f"Папка {dir_name} уже занята другой задачей"})
+                continue
+            claimed_dirs.add(dir_name)
+
+            future = executor.submit(create_problem_files, json_data, base_dir)
+            pending[future] = (problem_id, digest)
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future, *pending.pop(future))
+
+        for future in list(pending):
+            collect(future, *pending.pop(future))
+
+    # В манифест попадают только задачи, которые есть в БД и выгружены без ошибок
+    _save_manifest(manifest_path, exported)
+    summary["elapsed"] = time.monotonic() - start
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Инкрементальная выгрузка задач из БД в папки формата create_problem_files"
+    )
+    parser.add_argument("--problems-dir", default=None, help="папка для задач (по умолчанию PROBLEMS_DIR)")
+    parser.add_argument("--workers", type=int, default=EXPORT_WORKERS, help="потоков для записи файлов")
+    parser.add_argument("--fetch-size", type=int, default=EXPORT_FETCH_SIZE, help="сколько строк забирать из БД за раз")
+    parser.add_argument("--force", action="store_true", help="перезаписать и неизменившиеся задачи")
+    args = parser.parse_args()
+
+    result = export_problems(args.problems_dir, max_workers=args.workers, fetch_size=args.fetch_size, force=args.force)
+    print(json.dumps(result, ensure_ascii=False, indent=4))
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from db import connection
+from utils.add_problem import (
+    PROBLEMS_DIR,
+    build_problem_rows,
+    insert_problem_rows,
+    read_problem_metadata
+)
+from utils.problem_generator import problem_generator
+from utils.verify_solutions import SOLUTION_LANGUAGES
+
+# Сколько задач загружается в БД одной транзакцией (одним COPY на таблицу)
+IMPORT_BATCH_SIZE = 500
+
+# Сколько потоков читает папки задач
+IMPORT_WORKERS = 8
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _read_tests(tests_dir):
+    """
+    Читает tests/inputs/N.txt и tests/outputs/N.txt в порядке номеров N.
+    """
+    inputs_dir = os.path.join(tests_dir, "inputs")
+    outputs_dir = os.path.join(tests_dir, "outputs")
+    if not os.path.isdir(inputs_dir):
+        return []
+    numbers = sorted(
+        int(name[:-len(".txt")]) for name in os.listdir(inputs_dir)
+        if name.endswith(".txt") and name[:-len(".txt")].isdigit()
+    )
+    testcases = []
+    for number in numbers:
+        output_path = os.path.join(outputs_dir, f"{number}.txt")
+        testcases.append({
+            "input": _read_text(os.path.join(inputs_dir, f"{number}.txt")),
+            "expected_output": _read_text(output_path) if os.path.exists(output_path) else ""
+        })
+    return testcases
+
+
+def read_problem_dir(problem_dir, default_difficulty="Easy"):
+    """
+    Читает папку задачи в формате create_problem_files и возвращает данные задачи в формате save_problem_data.
+    Шаблонные коды не читаются из boilerplate/, а заново генерируются problem_generator по Structure.md.
+    Возвращает None, если в папке нет Structure.md.
+    """
+    metadata = read_problem_metadata(problem_dir)
+    if metadata is None:
+        return None
+
+    problem_md_path = os.path.join(problem_dir, "Problem.md")
+    description = _read_text(problem_md_path) if os.path.exists(problem_md_path) else ""
+    difficulty = metadata.get("difficulty") or default_difficulty
+    boilerplate_dict = problem_generator(dict(metadata, difficulty=difficulty, description=description))
+
+    return {
+        "Название задачи": metadata["task_name"],
+        "Сложность алгоритма": difficulty,
+        "Условия задачи": description,
+        "Название функции": metadata["function_name"],
+        "Структура входных и выходных данных": metadata,
+        "Шаблонные коды": {
+            lang: boilerplate_dict.get(info["template_key"], "") for lang, info in SOLUTION_LANGUAGES.items()
+        },
+        "Полные шаблонные коды": {
+            lang: boilerplate_dict.get(info["full_key"], "") for lang, info in SOLUTION_LANGUAGES.items()
+        },
+        "Сгенерированные тесткейсы": _read_tests(os.path.join(problem_dir, "tests"))
+    }
+
+
+def find_problem_dirs(base_dir):
+    """
+    Папки задач в base_dir — подпапки, в которых есть Structure.md (в порядке имён).
+    """
+    return [
+        os.path.join(base_dir, name) for name in sorted(os.listdir(base_dir))
+        if os.path.isfile(os.path.join(base_dir, name, "Structure.md"))
+    ]
+
+
+def _existing_titles(cur, titles):
+    cur.execute('SELECT title FROM "Problem" WHERE title = ANY(%s)', (list(titles),))
+    return {row[0] for row in cur.fetchall()}
+
+
+def import_problems(base_dir=None, max_workers=IMPORT_WORKERS, batch_size=IMPORT_BATCH_SIZE,
+                    default_difficulty="Easy", skip_existing=True, dry_run=False):
+    """
+    Импортирует в БД все задачи из дерева папок в формате create_problem_files.
+
+    Папки читаются параллельно в max_workers потоках, а строки Problem, TestCase и DefaultCode загружаются
+    через COPY пачками по batch_size задач, каждая пачка — в своей транзакции.
+    Задачи, название которых уже есть в БД (или повторяется в дереве), пропускаются, если skip_existing.
+    dry_run — только прочитать и проверить папки, ничего не записывая
+    (imported тогда — сколько задач прочитано, без проверки на повторы в БД).
+
+    Возвращает сводку {"found", "imported", "skipped", "errors": [{"dir", "error"}], "elapsed"}.
+    """
+    base_dir = base_dir or PROBLEMS_DIR
+    start = time.monotonic()
+    problem_dirs = find_problem_dirs(base_dir)
+    summary = {"found": len(problem_dirs), "imported": 0, "skipped": 0, "errors": []}
+    seen_titles = set()
+
+    def read(problem_dir):
+        try:
+            return problem_dir, read_problem_dir(problem_dir, default_difficulty), None
+        except Exception as e:
+            return problem_dir, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import") as executor:
+        for batch_start in range(0, len(problem_dirs), batch_size):
+            problems = []
+            for problem_dir, json_data, error in executor.map(
+                read, problem_dirs[batch_start:batch_start + batch_size]
+            ):
+                if error is not None:
+                    summary["errors"].append({"dir": problem_dir, "error": error})
+                elif json_data is not None:
+                    problems.append(json_data)
+            if dry_run or not problems:
+                summary["imported"] += len(problems)
+                continue
+
+            with connection() as conn:
+                cur = conn.cursor()
+                existing = _existing_titles(cur, {p["Название задачи"] for p in problems}) if skip_existing else set()
+                rows = {"Problem": [], "TestCase": [], "DefaultCode": []}
+                now = datetime.now()
+                for json_data in problems:
+                    title = json_data["Название задачи"]
+                    if skip_existing and (title in existing or title in seen_titles):
+                        summary["skipped"] += 1
+                        continue
+                    seen_titles.add(title)
+                    for table, table_rows in build_problem_rows(json_data, now).items():
+                        rows[table].extend(table_rows)
+                insert_problem_rows(cur, rows, copy_threshold=1)
+                conn.commit()
+                cur.close()
+            summary["imported"] += len(rows["Problem"])
+
+    summary["elapsed"] = time.monotonic() - start
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Импорт задач из папок в формате create_problem_files в БД")
+    parser.add_argument("--problems-dir", default=None, help="папка с задачами (по умолчанию PROBLEMS_DIR)")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="потоков для чтения папок")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="задач в одной транзакции")
+    parser.add_argument("--default-difficulty", default="Easy", choices=["Easy", "Medium", "Hard"],
+                        help="сложность для задач, у которых её нет в Structure.md")
+    parser.add_argument("--no-skip-existing", action="store_true",
+                        help="импортировать и задачи, название которых уже есть в БД")
+    parser.add_argument("--dry-run", action="store_true", help="только прочитать папки, ничего не записывая")
+    args = parser.parse_args()
+
+    result = import_problems(
+        args.problems_dir,
+        max_workers=args.workers,
+        batch_size=args.batch_size,
+        default_difficulty=args.default_difficulty,
+        skip_existing=not args.no_skip_existing,
+        dry_run=args.dry_run
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=4))
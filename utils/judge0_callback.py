@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Сколько секунд хранится результат, за которым никто не пришёл (callback после таймаута или для чужого процесса)
+JUDGE0_CALLBACK_RESULT_TTL = 300
+
+
+class Judge0CallbackReceiver:
+    """
+    Локальный HTTP-сервер, принимающий результаты сабмишенов от Judge0 через callback_url.
+
+    Judge0 после завершения сабмишена отправляет PUT-запрос с JSON результата
+    (token, status, stdout, stderr, ...) на адрес, указанный в callback_url.
+    Сервер сохраняет результаты по токену, а iter_results() отдаёт их по мере поступления.
+    Результаты, которые никто не забрал за result_ttl секунд, и callback-и по токенам, от которых раннер
+    отказался (discard), не накапливаются в памяти.
+
+    public_url — адрес, по которому Judge0 может достучаться до этого сервера
+    (например, адрес туннеля). По умолчанию берётся из JUDGE0_CALLBACK_URL,
+    а если он не задан — http://<host>:<port>/.
+    """
+
+    def __init__(self, host="0.0.0.0", port=0, public_url=None, result_ttl=JUDGE0_CALLBACK_RESULT_TTL):
+        self.result_ttl = result_ttl
+        self._results = {}
+        self._discarded = {}
+        self._condition = threading.Condition()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    data = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                receiver.put_result(data)
+                self.send_response(200)
+                self.end_headers()
+
+            do_POST = do_PUT
+
+            def log_message(self, format, *args):
+                pass
+
+        # Judge0 присылает результаты всей пачки почти одновременно: со стандартной очередью соединений (5)
+        # часть из них отбрасывается и доходит только после повтора SYN или не доходит вовсе
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128
+
+        self._server = Server((host, port), Handler)
+        self._thread = None
+        self.public_url = public_url or os.getenv("JUDGE0_CALLBACK_URL") or (
+            f"http://{host}:{self._server.server_address[1]}/"
+        )
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread = None
+
+    def put_result(self, data):
+        token = data.get("token")
+        if not token:
+            return
+        now = time.monotonic()
+        with self._condition:
+            self._expire(now)
+            if token in self._discarded:
+                return
+            self._results[token] = (now, data)
+            self._condition.notify_all()
+
+    def _expire(self, now):
+        deadline = now - self.result_ttl
+        for store in (self._results, self._discarded):
+            for token in [token for token, (received_at, *_) in store.items() if received_at < deadline]:
+                del store[token]
+
+    def discard(self, tokens):
+        """
+        Забывает токены, результаты по которым больше не нужны (раннер перешёл к опросу или прогон остановлен):
+        уже пришедшие результаты удаляются, а опоздавшие callback-и не сохраняются.
+        """
+        now = time.monotonic()
+        with self._condition:
+            for token in tokens:
+                self._results.pop(token, None)
+                self._discarded[token] = (now,)
+
+    def iter_results(self, tokens, timeout):
+        """
+        Отдаёт пары (токен, результат) по мере поступления, пока не придут все токены или не пройдёт timeout секунд.
+        Отданные результаты удаляются из хранилища.
+        """
+        remaining = set(tokens)
+        deadline = time.monotonic() + timeout
+        while remaining:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not remaining.isdisjoint(self._results), timeout=max(0.0, deadline - time.monotonic())
+                )
+                ready = {token: self._results.pop(token)[1] for token in remaining & self._results.keys()}
+            if not ready:
+                return
+            remaining -= ready.keys()
+            yield from ready.items()
+
+    def wait(self, tokens, timeout):
+        """
+        Ждёт результаты для всех токенов не дольше timeout секунд.
+        Возвращает словарь {токен: результат} для тех токенов, по которым результат пришёл.
+        """
+        return dict(self.iter_results(tokens, timeout))
+
+
+_receiver = None
+_receiver_lock = threading.Lock()
+
+
+def get_callback_receiver():
+    """
+    Возвращает общий для процесса приёмник callback-ов, запуская его при первом обращении.
+    Порт задаётся через JUDGE0_CALLBACK_PORT (по умолчанию 8765).
+    """
+    global _receiver
+    with _receiver_lock:
+        if _receiver is None:
+            port = int(os.getenv("JUDGE0_CALLBACK_PORT", 8765))
+            _receiver = Judge0CallbackReceiver(port=port).start()
+        return _receiver
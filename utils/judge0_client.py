@@ -0,0 +1,290 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Адрес можно переопределить, например, чтобы направить раннер на локальный мок Judge0
+JUDGE0_URL = os.getenv("JUDGE0_URL", "https://judge0-ce.p.rapidapi.com")
+
+# Размер пула keep-alive соединений общего клиента
+JUDGE0_POOL_SIZE = 10
+
+# Повторы временных ошибок: сетевые сбои, 429 и 5xx
+JUDGE0_MAX_RETRIES = 4
+JUDGE0_RETRY_BASE_DELAY = 0.5
+JUDGE0_RETRY_MAX_DELAY = 30.0
+JUDGE0_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Таймауты одного запроса (секунды): на установку соединения и на чтение ответа
+JUDGE0_CONNECT_TIMEOUT = 5
+JUDGE0_READ_TIMEOUT = 30
+
+# Ограничение частоты запросов по умолчанию (запросов в секунду и размер «пачки»)
+JUDGE0_RATE_LIMIT = 5.0
+JUDGE0_RATE_BURST = 10
+
+
+def get_judge0_headers():
+    return {
+        "content-type": "application/json",
+        "x-rapidapi-host": "judge029.p.rapidapi.com",
+        "x-rapidapi-key": os.getenv("RAPIDAPI_KEY")
+    }
+
+
+class TokenBucket:
+    """
+    Потокобезопасный token bucket.
+
+    Кроме равномерного пополнения (rate токенов в секунду, не больше burst), учитывает квоту RapidAPI:
+    по заголовкам x-ratelimit-requests-remaining / x-ratelimit-requests-reset число доступных токенов
+    не превышает остаток квоты, а при исчерпанной квоте запросы ждут её сброса
+    (если сброс дальше JUDGE0_RETRY_MAX_DELAY, клиент не ждёт, а сразу возвращает ошибку, см. blocked_for).
+    """
+
+    def __init__(self, rate=JUDGE0_RATE_LIMIT, burst=JUDGE0_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Резервирует один токен и возвращает, сколько секунд нужно подождать перед запросом.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    def update_from_headers(self, headers):
+        remaining = headers.get("x-ratelimit-requests-remaining")
+        reset = headers.get("x-ratelimit-requests-reset")
+        with self._lock:
+            if remaining is not None and remaining.isdigit():
+                self._tokens = min(self._tokens, float(remaining))
+                if int(remaining) == 0 and reset is not None and reset.isdigit():
+                    self._blocked_until = time.monotonic() + int(reset)
+
+    def blocked_for(self):
+        """
+        Сколько секунд ещё осталось до сброса исчерпанной квоты (0, если квота не исчерпана).
+        """
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def block_for(self, seconds):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class Judge0Client:
+    """
+    Клиент Judge0 с общим пулом keep-alive соединений, ограничением частоты запросов и повторами.
+
+    Повторяются сетевые ошибки (включая таймауты) и ответы из JUDGE0_RETRY_STATUSES: с экспоненциальной паузой
+    и jitter, а для 429 — с паузой из Retry-After / x-ratelimit-requests-reset.
+    Ни одна пауза не превышает JUDGE0_RETRY_MAX_DELAY: если сервер просит ждать дольше (или квота исчерпана
+    до более позднего сброса), запрос сразу считается неудачным, чтобы рабочий поток не блокировался на часы.
+    Если все попытки исчерпаны, request() возвращает None.
+
+    Счётчики в stats относятся к конкретному экземпляру; for_run() создаёт экземпляр со своими
+    счётчиками, но с тем же пулом соединений и тем же token bucket. Его запросы учитываются и в stats
+    родительского экземпляра, так что у общего клиента (get_judge0_client) счётчики — за весь процесс.
+
+    Для асинхронных запросов async_http_client() выдаёт общий httpx.AsyncClient на event loop:
+    клиент httpx привязан к loop, поэтому пул keep-alive соединений свой у каждого loop (как пулы в db_async),
+    а экземпляры из for_run() делят его с родителем.
+    """
+
+    def __init__(self, base_url=JUDGE0_URL, headers=None, pool_size=JUDGE0_POOL_SIZE,
+                 max_retries=JUDGE0_MAX_RETRIES, bucket=None, session=None, parent=None,
+                 timeout=(JUDGE0_CONNECT_TIMEOUT, JUDGE0_READ_TIMEOUT), max_delay=JUDGE0_RETRY_MAX_DELAY,
+                 async_clients=None):
+        self.base_url = base_url
+        self.headers = headers or get_judge0_headers()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.max_delay = max_delay
+        self.bucket = bucket or TokenBucket(
+            rate=float(os.getenv("JUDGE0_RATE_LIMIT", JUDGE0_RATE_LIMIT)),
+            burst=int(os.getenv("JUDGE0_RATE_BURST", JUDGE0_RATE_BURST))
+        )
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.pool_size = pool_size
+        self._async_clients = async_clients if async_clients is not None else weakref.WeakKeyDictionary()
+        self.parent = parent
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+    def for_run(self):
+        return Judge0Client(
+            self.base_url, self.headers, pool_size=self.pool_size, max_retries=self.max_retries, bucket=self.bucket,
+            session=self.session, parent=self, timeout=self.timeout, max_delay=self.max_delay,
+            async_clients=self._async_clients
+        )
+
+    def async_http_client(self):
+        """
+        Общий httpx.AsyncClient (base_url и заголовки Judge0, pool_size соединений) для текущего event loop.
+        Клиенты уже закрытых loop-ов выбрасываются; закрывать клиент нужно из его loop (close_async_http_client).
+        """
+        loop = asyncio.get_running_loop()
+        with _async_clients_lock:
+            for closed_loop in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed_loop]
+            http_client = self._async_clients.get(loop)
+            if http_client is None:
+                connect_timeout, read_timeout = self.timeout
+                http_client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers=self.headers,
+                    limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+                )
+                self._async_clients[loop] = http_client
+            return http_client
+
+    async def close_async_http_client(self):
+        """
+        Закрывает общий httpx.AsyncClient текущего event loop (перед выходом из asyncio.run).
+        """
+        with _async_clients_lock:
+            http_client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if http_client is not None:
+            await http_client.aclose()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+        if self.parent is not None:
+            self.parent._count(key)
+
+    def _retry_delay(self, attempt, response):
+        """
+        Пауза перед повтором. Для 429 учитывает подсказки сервера, иначе — экспонента с jitter.
+        Возвращает None, если сервер просит ждать дольше max_delay: такой запрос не повторяется.
+        """
+        if response is not None and response.status_code == 429:
+            self._count("rate_limited")
+            hint = response.headers.get("retry-after") or response.headers.get("x-ratelimit-requests-reset")
+            if hint is not None and hint.isdigit():
+                self.bucket.block_for(int(hint))
+                return int(hint) if int(hint) <= self.max_delay else None
+        delay = min(JUDGE0_RETRY_BASE_DELAY * 2 ** attempt, self.max_delay / 2)
+        return delay + random.uniform(0, delay)
+
+    def _reserve(self):
+        """
+        Пауза перед запросом по token bucket или None, если квота исчерпана дольше чем на max_delay.
+        """
+        if self.bucket.blocked_for() > self.max_delay:
+            return None
+        return min(self.bucket.reserve(), self.max_delay)
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve()
+            if wait is None:
+                break
+            time.sleep(wait)
+            self._count("requests")
+            try:
+                response = self.session.request(method, self.base_url + path, headers=self.headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+            else:
+                self.bucket.update_from_headers(response.headers)
+                if response.status_code not in JUDGE0_RETRY_STATUSES:
+                    return response
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+
+        self._count("failures")
+        return None
+
+    async def request_async(self, http_client, method, path, **kwargs):
+        """
+        Асинхронный вариант request() поверх переданного httpx.AsyncClient (с base_url и заголовками Judge0).
+        """
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve()
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+            self._count("requests")
+            try:
+                response = await http_client.request(method, path, **kwargs)
+            except httpx.TransportError:
+                response = None
+            else:
+                self.bucket.update_from_headers(response.headers)
+                if response.status_code not in JUDGE0_RETRY_STATUSES:
+                    return response
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    break
+                self._count("retries")
+                await asyncio.sleep(delay)
+
+        self._count("failures")
+        return None
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients_lock = threading.Lock()
+
+
+def get_judge0_client():
+    """
+    Возвращает общий для процесса клиент Judge0 (один пул соединений и один token bucket на процесс).
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Judge0Client()
+        return _client
+
+
+def configure_judge0_client(**kwargs):
+    """
+    Заменяет общий клиент Judge0 новым с переданными параметрами Judge0Client
+    (например, base_url локального мока и свой TokenBucket для бенчмарка) и возвращает его.
+    """
+    global _client
+    with _client_lock:
+        _client = Judge0Client(**kwargs)
+        return _client
@@ -0,0 +1,232 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+JUDGE0_MOCK_STATUSES = {
+    1: "In Queue",
+    2: "Processing",
+    3: "Accepted",
+    4: "Wrong Answer",
+    5: "Time Limit Exceeded",
+    6: "Compilation Error",
+    11: "Runtime Error (NZEC)"
+}
+
+
+class MockJudge0Server:
+    """
+    Локальная замена Judge0 для бенчмарков и отладки раннеров без обращения к платному RapidAPI.
+
+    Поддерживает те же запросы, что используют раннеры: POST /submissions, POST /submissions/batch,
+    GET /submissions/<token> и GET /submissions/batch?tokens=..., а также callback_url.
+    Код не выполняется: каждый сабмишен через queue_delay секунд после отправки получает статус status_id
+    (по умолчанию Accepted), до этого — In Queue / Processing.
+
+    latency — задержка ответа на каждый запрос (секунды);
+    failure_rate — доля запросов, на которые отвечается 503;
+    rate_limit — сколько запросов в секунду принимается, остальные получают 429 с Retry-After: retry_after.
+    В stats считаются запросы, сабмишены, ответы 429 и 503.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, queue_delay=0.1, failure_rate=0.0,
+                 rate_limit=None, retry_after=1, status_id=3, seed=None):
+        self.latency = latency
+        self.queue_delay = queue_delay
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.status_id = status_id
+        self._random = random.Random(seed)
+        self._submissions = {}
+        self._window = []
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "submissions": 0, "rate_limited": 0, "failures": 0}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not server._admit(self):
+                    return
+                try:
+                    data = json.loads(body or b"{}")
+                except ValueError:
+                    self._send(400, {"error": "invalid json"})
+                    return
+                path = urlparse(self.path).path.rstrip("/")
+                if path == "/submissions/batch":
+                    self._send(201, [{"token": server._create(item)} for item in data.get("submissions", [])])
+                elif path == "/submissions":
+                    self._send(201, {"token": server._create(data)})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_GET(self):
+                if not server._admit(self):
+                    return
+                url = urlparse(self.path)
+                path = url.path.rstrip("/")
+                if path == "/submissions/batch":
+                    tokens = parse_qs(url.query).get("tokens", [""])[0].split(",")
+                    self._send(200, {"submissions": [server._result(token) for token in tokens if token]})
+                elif path.startswith("/submissions/"):
+                    result = server._result(path[len("/submissions/"):])
+                    self._send(200 if result else 404, result or {"error": "not found"})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def _send(self, status, data, headers=None):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Раннеры открывают десятки соединений одновременно; стандартной очереди соединений (5) для этого мало
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128
+
+        self._server = Server((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread = None
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "submissions": 0, "rate_limited": 0, "failures": 0}
+            self._submissions.clear()
+
+    def _admit(self, handler):
+        """
+        Имитирует задержку, отказы и ограничение частоты. Возвращает False, если ответ уже отправлен.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.rate_limit is not None:
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.rate_limit:
+                    self.stats["rate_limited"] += 1
+                    limited = True
+                else:
+                    self._window.append(now)
+                    limited = False
+            else:
+                limited = False
+            failed = not limited and self._random.random() < self.failure_rate
+            if failed:
+                self.stats["failures"] += 1
+
+        if limited:
+            handler._send(429, {"message": "Too many requests"}, {"Retry-After": str(self.retry_after)})
+            return False
+        if failed:
+            handler._send(503, {"error": "Service unavailable"})
+            return False
+        return True
+
+    def _create(self, submission):
+        token = str(uuid.uuid4())
+        with self._lock:
+            self.stats["submissions"] += 1
+            self._submissions[token] = {"created": time.monotonic(), "submission": submission}
+        callback_url = submission.get("callback_url")
+        if callback_url:
+            timer = threading.Timer(self.queue_delay, self._send_callback, (token, callback_url))
+            timer.daemon = True
+            timer.start()
+        return token
+
+    def _result(self, token):
+        with self._lock:
+            entry = self._submissions.get(token)
+        if entry is None:
+            return None
+        elapsed = time.monotonic() - entry["created"]
+        if elapsed < self.queue_delay:
+            status_id = 1 if elapsed < self.queue_delay / 2 else 2
+            return {"token": token, "status": {"id": status_id, "description": JUDGE0_MOCK_STATUSES[status_id]}}
+        return {
+            "token": token,
+            "status": {"id": self.status_id, "description": JUDGE0_MOCK_STATUSES.get(self.status_id, "")},
+            "stdout": entry["submission"].get("expected_output"),
+            "stderr": None,
+            "compile_output": None,
+            "time": "0.010",
+            "wall_time": "0.020",
+            "memory": 1024
+        }
+
+    def _send_callback(self, token, callback_url):
+        request = urllib.request.Request(
+            callback_url,
+            data=json.dumps(self._result(token)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="PUT"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальный мок Judge0 (направьте на него раннеры через JUDGE0_URL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2358)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа на запрос, с")
+    parser.add_argument("--queue-delay", type=float, default=0.1, help="время до готовности сабмишена, с")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="доля запросов с ответом 503")
+    parser.add_argument("--rate-limit", type=float, default=None, help="запросов в секунду до ответа 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="значение Retry-After в ответе 429, с")
+    parser.add_argument("--status-id", type=int, default=3, help="итоговый статус сабмишенов")
+    args = parser.parse_args()
+
+    mock = MockJudge0Server(
+        args.host, args.port, latency=args.latency, queue_delay=args.queue_delay, failure_rate=args.failure_rate,
+        rate_limit=args.rate_limit, retry_after=args.retry_after, status_id=args.status_id
+    )
+    print(f"Мок Judge0 запущен: {mock.url}")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
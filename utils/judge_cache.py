@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Значения по умолчанию: сутки жизни записи и не более 50 000 записей
+JUDGE_CACHE_TTL = 24 * 60 * 60
+JUDGE_CACHE_MAX_ENTRIES = 50000
+
+
+def make_cache_key(language_id, source_code, stdin, expected_output, backend=None):
+    """
+    Контентный ключ результата: sha256 от (backend, language_id, подготовленный код, stdin, expected_output).
+    backend — чем получен результат (например, Judge0 или локальный раннер), чтобы вердикты разных
+    проверяющих систем не выдавались друг за друга.
+    """
+    raw = json.dumps([backend, language_id, source_code, stdin, expected_output], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JudgeResultCache:
+    """
+    Персистентный кэш результатов тесткейсов на SQLite.
+
+    Хранит результат одного тесткейса (словарь {"token", "status_id", "stderr", ...}) по контентному ключу.
+    Записи старше ttl секунд считаются устаревшими, а при превышении max_entries
+    вытесняются записи, к которым дольше всего не обращались.
+    Счётчики hits/misses ведутся в памяти процесса.
+    """
+
+    def __init__(self, path, ttl=JUDGE_CACHE_TTL, max_entries=JUDGE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS judge_results ("
+            " key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS judge_results_accessed ON judge_results (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM judge_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE judge_results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set_many(self, items):
+        """
+        Сохраняет пары (ключ, результат) одной транзакцией и выполняет вытеснение.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO judge_results (key, result, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(result, ensure_ascii=False), now, now) for key, result in items]
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM judge_results WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM judge_results WHERE key IN ("
+            " SELECT key FROM judge_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM judge_results")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM judge_results").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_judge_cache():
+    """
+    Возвращает общий для процесса кэш. Путь к файлу задаётся через JUDGE_CACHE_PATH.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = JudgeResultCache(
+                os.getenv("JUDGE_CACHE_PATH", ".judge_cache.sqlite3"),
+                ttl=int(os.getenv("JUDGE_CACHE_TTL", JUDGE_CACHE_TTL)),
+                max_entries=int(os.getenv("JUDGE_CACHE_MAX_ENTRIES", JUDGE_CACHE_MAX_ENTRIES))
+            )
+        return _cache
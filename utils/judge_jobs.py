@@ -0,0 +1,226 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from utils.local_runner import run_local_testcases
+from utils.run_tests_on_code import (
+    run_judge0_testcases,
+    run_judge0_testcases_batch,
+    run_judge0_testcases_cached,
+    run_judge0_testcases_callback,
+    run_judge0_testcases_concurrent
+)
+
+load_dotenv()
+
+# Раннеры указываются по имени, чтобы задание можно было сохранить в таблице и перезапустить
+JOB_RUNNERS = {
+    "batch": run_judge0_testcases_batch,
+    "concurrent": run_judge0_testcases_concurrent,
+    "sequential": run_judge0_testcases,
+    "callback": run_judge0_testcases_callback,
+    "local": run_local_testcases
+}
+
+JUDGE_JOB_WORKERS = 4
+
+# Сколько секунд хранятся завершённые задания (по умолчанию неделя)
+JUDGE_JOBS_RETENTION = 7 * 24 * 60 * 60
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLING = "cancelling"
+JOB_CANCELLED = "cancelled"
+
+JOB_FINISHED_STATUSES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class JudgeJobQueue:
+    """
+    Локальная очередь заданий на прогон тесткейсов: пул рабочих потоков и персистентная таблица заданий (SQLite).
+
+    Задание создаётся через submit() и выполняется в фоне, независимо от перезапусков скрипта Streamlit;
+    страница опрашивает его состояние через get(job_id). Результаты отдельных тесткейсов записываются
+    в таблицу по мере готовности, поэтому прогресс виден во время выполнения.
+    Задания, которые не успели завершиться до остановки процесса, при старте очереди запускаются заново;
+    отмена хранится в самой таблице (статус cancelling), поэтому отменённые задания после перезапуска не оживают.
+    Завершённые задания старше retention секунд удаляются при старте очереди и при постановке новых заданий.
+    """
+
+    def __init__(self, path, max_workers=JUDGE_JOB_WORKERS, retention=JUDGE_JOBS_RETENTION):
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS judge_jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, runner TEXT NOT NULL, runner_kwargs TEXT NOT NULL,"
+            " payload TEXT NOT NULL, tests_count INTEGER NOT NULL, results TEXT NOT NULL, answer TEXT, error TEXT,"
+            " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS judge_jobs_finished ON judge_jobs (finished_at)")
+        # Отмена, которую выполнявшееся задание не успело довести до конца перед остановкой процесса
+        self._conn.execute(
+            "UPDATE judge_jobs SET status = ?, finished_at = ? WHERE status = ?",
+            (JOB_CANCELLED, time.time(), JOB_CANCELLING)
+        )
+        self._prune(time.time())
+        self._conn.commit()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="judge-job")
+
+        for (job_id,) in self._conn.execute(
+            "SELECT id FROM judge_jobs WHERE status IN (?, ?) ORDER BY created_at", (JOB_QUEUED, JOB_RUNNING)
+        ).fetchall():
+            self._executor.submit(self._run, job_id)
+
+    def submit(self, data, runner="batch", **runner_kwargs):
+        """
+        Ставит прогон в очередь и возвращает id задания.
+        data — данные в формате run_judge0_testcases, runner — имя из JOB_RUNNERS.
+        """
+        if runner not in JOB_RUNNERS:
+            raise ValueError(f"Неизвестный раннер: {runner}")
+        job_id = str(uuid.uuid4())
+        tests_count = len(data.get("testcases", []))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO judge_jobs (id, status, runner, runner_kwargs, payload, tests_count, results, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, JOB_QUEUED, runner, json.dumps(runner_kwargs), json.dumps(data, ensure_ascii=False),
+                    tests_count, json.dumps([None] * tests_count), time.time()
+                )
+            )
+            self._prune(time.time())
+            self._conn.commit()
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Отменяет задание: ещё не начатое сразу становится cancelled, а выполняющееся — cancelling,
+        и рабочий поток пропускает оставшиеся тесткейсы и переводит его в cancelled.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE judge_jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED)
+            )
+            self._conn.execute(
+                "UPDATE judge_jobs SET status = ? WHERE id = ? AND status = ?", (JOB_CANCELLING, job_id, JOB_RUNNING)
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        """
+        Возвращает состояние задания: {"id", "status", "tests_count", "done_count", "results", "answer", "error"}
+        или None, если задания нет.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, tests_count, results, answer, error, created_at, started_at, finished_at"
+                " FROM judge_jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        results = json.loads(row[3])
+        return {
+            "id": row[0],
+            "status": row[1],
+            "tests_count": row[2],
+            "done_count": sum(1 for result in results if result is not None),
+            "results": results,
+            "answer": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8]
+        }
+
+    def _prune(self, now):
+        placeholders = ", ".join("?" for _ in JOB_FINISHED_STATUSES)
+        self._conn.execute(
+            f"DELETE FROM judge_jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+            (*JOB_FINISHED_STATUSES, now - self.retention)
+        )
+
+    def _status(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM judge_jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE judge_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _run(self, job_id):
+        started = 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT runner, runner_kwargs, payload, tests_count FROM judge_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is not None:
+                results = [None] * row[3]
+                # Статус меняется только у не отменённого задания, иначе отмена могла бы потеряться
+                started = self._conn.execute(
+                    "UPDATE judge_jobs SET status = ?, started_at = ?, results = ? WHERE id = ? AND status IN (?, ?)",
+                    (JOB_RUNNING, time.time(), json.dumps(results), job_id, JOB_QUEUED, JOB_RUNNING)
+                ).rowcount
+                self._conn.commit()
+        if row is None or not started:
+            return
+
+        runner, runner_kwargs, payload, _ = row
+
+        def on_result(idx, result):
+            results[idx] = result
+            self._update(job_id, results=json.dumps(results, ensure_ascii=False))
+            return self._status(job_id) != JOB_CANCELLING
+
+        try:
+            answer = run_judge0_testcases_cached(
+                json.loads(payload), runner=JOB_RUNNERS[runner], on_result=on_result, **json.loads(runner_kwargs)
+            )
+        except Exception as e:
+            self._update(job_id, status=JOB_FAILED, error=str(e), finished_at=time.time())
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE judge_jobs SET status = CASE WHEN status = ? THEN ? ELSE ? END,"
+                " answer = ?, results = ?, finished_at = ? WHERE id = ?",
+                (
+                    JOB_CANCELLING, JOB_CANCELLED, JOB_DONE, json.dumps(answer, ensure_ascii=False),
+                    json.dumps(answer["results"], ensure_ascii=False), time.time(), job_id
+                )
+            )
+            self._conn.commit()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_judge_job_queue():
+    """
+    Возвращает общую для процесса очередь заданий (одну на все сессии Streamlit).
+    Путь к таблице заданий задаётся через JUDGE_JOBS_PATH, число рабочих потоков — через JUDGE_JOB_WORKERS,
+    срок хранения завершённых заданий (секунды) — через JUDGE_JOBS_RETENTION.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JudgeJobQueue(
+                os.getenv("JUDGE_JOBS_PATH", ".judge_jobs.sqlite3"),
+                max_workers=int(os.getenv("JUDGE_JOB_WORKERS", JUDGE_JOB_WORKERS)),
+                retention=int(os.getenv("JUDGE_JOBS_RETENTION", JUDGE_JOBS_RETENTION))
+            )
+        return _queue
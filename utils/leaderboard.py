@@ -0,0 +1,143 @@
+import argparse
+from db import connection, is_leaderboard_installed, rebuild_leaderboard
+
+LEADERBOARD_TRIGGER = "contest_leaderboard_apply"
+
+
+def install_leaderboard():
+    """
+    Создаёт сводную таблицу лидерборда "ContestLeaderboard" (очки, решённые задачи, число отправок
+    и время последней отправки каждого участника контеста) и триггер на "ContestSubmission",
+    который обновляет её на разницу очков при каждой вставке, изменении или удалении отправки.
+    Так таблица поддерживается инкрементально, без пересчёта GROUP BY по всем отправкам.
+    Тот же триггер ведёт счётчик участников контеста в "ContestLeaderboardStats",
+    чтобы лидерборд не считал COUNT(*) по всем участникам при каждом показе.
+
+    Это разовая миграция: админка её не выполняет, а только читает таблицу (см. db.is_leaderboard_installed).
+    Повторный запуск безопасен: существующий триггер не пересоздаётся, так что "ContestSubmission"
+    блокируется только при первой установке. Таблица, созданная впервые, заполняется по уже существующим отправкам.
+    Возвращает True, если таблица была создана.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        # Несколько запусков миграции не должны создавать таблицу и триггер одновременно
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('ContestLeaderboard'))")
+        cur.execute("""
+            SELECT to_regclass('"ContestLeaderboard"') IS NULL OR to_regclass('"ContestLeaderboardStats"') IS NULL
+        """)
+        created = cur.fetchone()[0]
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ContestLeaderboard" (
+                "contestId" TEXT NOT NULL,
+                "userId" TEXT NOT NULL,
+                points INTEGER NOT NULL DEFAULT 0,
+                solved INTEGER NOT NULL DEFAULT 0,
+                submissions INTEGER NOT NULL DEFAULT 0,
+                "lastSubmissionAt" TIMESTAMP(3),
+                PRIMARY KEY ("contestId", "userId")
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ContestLeaderboardStats" (
+                "contestId" TEXT PRIMARY KEY,
+                participants INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # Топ-N контеста читается сканированием первых N записей индекса, независимо от числа участников
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS "ContestLeaderboard_rank_idx"
+            ON "ContestLeaderboard" ("contestId", points DESC, "lastSubmissionAt", "userId")
+        """)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION contest_leaderboard_apply() RETURNS trigger AS $$
+            DECLARE
+                changed INTEGER;
+                joined BOOLEAN;
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    UPDATE "ContestLeaderboard"
+                    SET points = points - OLD.points, solved = solved - (OLD.points > 0)::int,
+                        submissions = submissions - 1
+                    WHERE "contestId" = OLD."contestId" AND "userId" = OLD."userId";
+                    -- Участник без отправок больше не считается участником контеста
+                    DELETE FROM "ContestLeaderboard"
+                    WHERE "contestId" = OLD."contestId" AND "userId" = OLD."userId" AND submissions <= 0;
+                    GET DIAGNOSTICS changed = ROW_COUNT;
+                    IF changed > 0 THEN
+                        UPDATE "ContestLeaderboardStats" SET participants = participants - 1
+                        WHERE "contestId" = OLD."contestId";
+                    END IF;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO "ContestLeaderboard" ("contestId", "userId", points, solved, submissions, "lastSubmissionAt")
+                    VALUES (NEW."contestId", NEW."userId", NEW.points, (NEW.points > 0)::int, 1, NEW."updatedAt")
+                    ON CONFLICT ("contestId", "userId") DO UPDATE
+                    SET points = "ContestLeaderboard".points + EXCLUDED.points,
+                        solved = "ContestLeaderboard".solved + EXCLUDED.solved,
+                        submissions = "ContestLeaderboard".submissions + 1,
+                        "lastSubmissionAt" = GREATEST("ContestLeaderboard"."lastSubmissionAt", EXCLUDED."lastSubmissionAt")
+                    RETURNING xmax = 0 INTO joined;
+                    -- xmax = 0 только у вставленной строки: это первая отправка участника в контесте
+                    IF joined THEN
+                        INSERT INTO "ContestLeaderboardStats" ("contestId", participants)
+                        VALUES (NEW."contestId", 1)
+                        ON CONFLICT ("contestId") DO UPDATE
+                        SET participants = "ContestLeaderboardStats".participants + 1;
+                    END IF;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cur.execute(
+            """SELECT 1 FROM pg_trigger WHERE tgname = %s AND tgrelid = '"ContestSubmission"'::regclass""",
+            (LEADERBOARD_TRIGGER,)
+        )
+        if cur.fetchone() is None:
+            cur.execute(f"""
+                CREATE TRIGGER {LEADERBOARD_TRIGGER}
+                AFTER INSERT OR DELETE OR UPDATE OF points, "contestId", "userId" ON "ContestSubmission"
+                FOR EACH ROW EXECUTE FUNCTION contest_leaderboard_apply()
+            """)
+        conn.commit()
+        cur.close()
+    if created:
+        rebuild_leaderboard()
+    return created
+
+
+def uninstall_leaderboard():
+    """
+    Убирает триггер, функцию и таблицы лидерборда (обратная миграция к install_leaderboard).
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f'DROP TRIGGER IF EXISTS {LEADERBOARD_TRIGGER} ON "ContestSubmission"')
+        cur.execute("DROP FUNCTION IF EXISTS contest_leaderboard_apply()")
+        cur.execute('DROP TABLE IF EXISTS "ContestLeaderboardStats"')
+        cur.execute('DROP TABLE IF EXISTS "ContestLeaderboard"')
+        conn.commit()
+        cur.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Установка и обслуживание сводной таблицы лидерборда")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("install", help="создать таблицу и триггер на \"ContestSubmission\" (разовая миграция)")
+    rebuild_parser = commands.add_parser("rebuild", help="пересчитать таблицу по всем отправкам")
+    rebuild_parser.add_argument("--contest", default=None, help="пересчитать только этот контест")
+    commands.add_parser("uninstall", help="удалить триггер, функцию и таблицы")
+    commands.add_parser("status", help="проверить, установлен ли лидерборд")
+    args = parser.parse_args()
+
+    if args.command == "install":
+        created = install_leaderboard()
+        print("Лидерборд установлен" + (" и заполнен по существующим отправкам" if created else ""))
+    elif args.command == "rebuild":
+        rebuild_leaderboard(args.contest)
+        print("Лидерборд пересчитан")
+    elif args.command == "uninstall":
+        uninstall_leaderboard()
+        print("Лидерборд удалён")
+    else:
+        print("Лидерборд установлен" if is_leaderboard_installed() else "Лидерборд не установлен")
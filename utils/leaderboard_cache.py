@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from dotenv import load_dotenv
+from db import get_leaderboard
+
+load_dotenv()
+
+# Сколько секунд снимок лидерборда отдаётся без обращения к БД
+LEADERBOARD_CACHE_TTL = 30
+
+# Сколько снимков (контест, N) хранится в кэше (вытесняются давно не использованные)
+LEADERBOARD_CACHE_MAX_ENTRIES = 64
+
+
+class LeaderboardCache:
+    """
+    Кэш снимков лидерборда в памяти процесса, общий для всех сессий.
+
+    Снимок — топ-N контеста из "ContestLeaderboard" (см. db.get_leaderboard) и число участников;
+    между обновлениями (раз в ttl секунд) страница рейтинга не обращается к БД.
+    Загружает снимок только один поток, остальные ждут его результат.
+    invalidate(contest_id) сбрасывает снимки контеста сразу (кнопка «Обновить»).
+    """
+
+    def __init__(self, loader=get_leaderboard, ttl=LEADERBOARD_CACHE_TTL, max_entries=LEADERBOARD_CACHE_MAX_ENTRIES):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, contest_id, limit=100):
+        """
+        Снимок {"rows", "participants", "refreshed_at"}; rows — как у db.get_leaderboard.
+        """
+        key = (contest_id, limit)
+        with self._lock:
+            entry = self._snapshots.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._snapshots.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+            rows, participants = self._loader(contest_id, limit)
+            snapshot = {"rows": rows, "participants": participants, "refreshed_at": datetime.now()}
+            self._snapshots[key] = (time.monotonic(), snapshot)
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+            return snapshot
+
+    def invalidate(self, contest_id=None):
+        with self._lock:
+            if contest_id is None:
+                self._snapshots.clear()
+            else:
+                for key in [key for key in self._snapshots if key[0] == contest_id]:
+                    del self._snapshots[key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["snapshots"] = len(self._snapshots)
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_leaderboard_cache():
+    """
+    Возвращает общий для процесса кэш лидербордов. TTL задаётся через LEADERBOARD_CACHE_TTL (секунды).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LeaderboardCache(ttl=float(os.getenv("LEADERBOARD_CACHE_TTL", LEADERBOARD_CACHE_TTL)))
+        return _cache
@@ -0,0 +1,277 @@
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.run_tests_on_code import build_answer, finish_result, skipped_result
+
+# Лимиты по умолчанию для одного запуска теста
+LOCAL_TIME_LIMIT = 2.0
+LOCAL_MEMORY_LIMIT_MB = 256
+LOCAL_COMPILE_TIMEOUT = 60
+
+# Утилиты, через которые запускается тест: prlimit ограничивает ресурсы, GNU time измеряет пик памяти
+PRLIMIT_BINARY = "prlimit"
+TIME_BINARY = "/usr/bin/time"
+
+# Статусы в терминах Judge0, чтобы ответ был совместим с run_judge0_testcases
+STATUS_ACCEPTED = 3
+STATUS_WRONG_ANSWER = 4
+STATUS_TIME_LIMIT = 5
+STATUS_COMPILATION_ERROR = 6
+STATUS_RUNTIME_ERROR = 11
+
+# language_id Judge0 -> имя файла, команда компиляции и команда запуска.
+# {memory} подставляется в мегабайтах: JVM и V8 резервируют много виртуальной памяти,
+# поэтому для них память ограничивается флагом рантайма, а не RLIMIT_AS.
+LOCAL_LANGUAGES = {
+    54: {
+        "file": "main.cpp",
+        "compile": ["g++", "-O2", "-std=c++17", "-o", "main", "main.cpp"],
+        "run": ["./main"]
+    },
+    63: {
+        "file": "main.js",
+        "compile": None,
+        "run": ["node", "--max-old-space-size={memory}", "main.js"],
+        "managed_memory": True
+    },
+    73: {
+        "file": "main.rs",
+        "compile": ["rustc", "-O", "-o", "main", "main.rs"],
+        "run": ["./main"]
+    },
+    62: {
+        "file": "Main.java",
+        "compile": ["javac", "Main.java"],
+        "run": ["java", "-Xmx{memory}m", "-cp", ".", "Main"],
+        "managed_memory": True
+    }
+}
+
+
+def _limits_command(run_cmd, time_limit, memory_limit_mb, limit_address_space):
+    """
+    Оборачивает команду запуска в prlimit: процессорное время, объём памяти и размер создаваемых файлов.
+    Лимиты выставляются уже в дочернем процессе, поэтому Popen обходится без preexec_fn
+    и не форкает процесс Streamlit целиком (preexec_fn из рабочих потоков к тому же чреват взаимоблокировкой).
+    """
+    prlimit = shutil.which(PRLIMIT_BINARY)
+    if prlimit is None:
+        raise RuntimeError("Для локального раннера нужна утилита prlimit (пакет util-linux)")
+    cpu = int(time_limit) + 1
+    command = [prlimit, f"--cpu={cpu}", f"--fsize={1024 * 1024}", "--core=0"]
+    if limit_address_space:
+        command.append(f"--as={memory_limit_mb * 1024 * 1024}")
+    return command + ["--"] + run_cmd
+
+
+def _sandbox_env(work_dir):
+    """
+    Окружение для запуска тестов: только PATH, язык и HOME во временной директории.
+    """
+    return {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": work_dir, "LANG": "C.UTF-8"}
+
+
+def _compile_env():
+    """
+    Окружение для компиляции: окружение процесса целиком. Обёрткам тулчейнов (rustup, sdkman и т. п.)
+    нужны настоящие HOME, RUSTUP_HOME и CARGO_HOME, иначе компилятор не запускается и любое решение
+    получает ложный Compilation Error, который затем попадает в кэш результатов.
+    """
+    return dict(os.environ, LANG="C.UTF-8")
+
+
+def _read_time_output(path):
+    """
+    Разбирает файл, записанный GNU time с форматом "%M".
+    Возвращает (пик памяти в КБ или None, номер сигнала, которым был убит процесс, или None).
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+    except OSError:
+        return None, None
+    signal_number = None
+    for line in lines:
+        if line.startswith("Command terminated by signal"):
+            signal_number = int(line.rsplit(" ", 1)[1])
+    memory = int(lines[-1]) if lines and lines[-1].isdigit() else None
+    return memory, signal_number
+
+
+def _run_with_rusage(run_cmd, work_dir, stdin, time_limit, memory_limit_mb, limit_address_space):
+    """
+    Запускает тест в отдельной сессии под prlimit и, в отличие от subprocess.run, забирает процесс через os.wait4,
+    чтобы получить процессорное время именно этого запуска.
+    Пик памяти берётся из GNU time (если он установлен): ru_maxrss процесса, запущенного из Streamlit,
+    включает память родителя на момент exec и для памяти решения не годится. Без GNU time память не сообщается.
+    Возвращает (код возврата, stdout, stderr, истёк ли таймаут, CPU-время в с, реальное время в с, память в КБ или None).
+    """
+    command = _limits_command(run_cmd, time_limit, memory_limit_mb, limit_address_space)
+    time_output = None
+    if os.access(TIME_BINARY, os.X_OK):
+        time_output = os.path.join(work_dir, f".time-{threading.get_ident()}")
+        command = [TIME_BINARY, "-f", "%M", "-o", time_output] + command
+
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        command,
+        cwd=work_dir,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=_sandbox_env(work_dir),
+        start_new_session=True
+    )
+    output = {}
+
+    def read(name, stream):
+        output[name] = stream.read().decode("utf-8", errors="replace")
+
+    readers = [
+        threading.Thread(target=read, args=("stdout", proc.stdout)),
+        threading.Thread(target=read, args=("stderr", proc.stderr))
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        proc.stdin.write(stdin.encode("utf-8"))
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        # Процесс — лидер своей сессии, поэтому вместе с обёртками убивается и само решение
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    timer = threading.Timer(time_limit, kill)
+    timer.start()
+    _, wait_status, rusage = os.wait4(proc.pid, 0)
+    timer.cancel()
+    wall_time = time.monotonic() - start
+    proc.returncode = os.waitstatus_to_exitcode(wait_status)
+    for reader in readers:
+        reader.join()
+
+    memory = None
+    if time_output is not None:
+        memory, signal_number = _read_time_output(time_output)
+        if signal_number is not None:
+            # GNU time завершается с кодом 128 + сигнал, а сигнал решения сообщает отдельной строкой
+            proc.returncode = -signal_number
+        if os.path.exists(time_output):
+            os.remove(time_output)
+
+    # В rusage завершённого процесса входит и время дочерних процессов, которых он дождался
+    cpu_time = rusage.ru_utime + rusage.ru_stime
+    return (
+        proc.returncode, output.get("stdout", ""), output.get("stderr", ""), timed_out.is_set(),
+        cpu_time, wall_time, memory
+    )
+
+
+def _run_test(idx, run_cmd, work_dir, testcase, time_limit, memory_limit_mb, limit_address_space):
+    stdin = testcase.get("stdin", "")
+    expected_output = str(testcase.get("expected_output", ""))
+    returncode, stdout, stderr, timed_out, cpu_time, wall_time, memory = _run_with_rusage(
+        run_cmd, work_dir, stdin, time_limit, memory_limit_mb, limit_address_space
+    )
+    result = {
+        "token": f"local-{idx}",
+        "stderr": stderr or None,
+        "time": round(cpu_time, 3),
+        "wall_time": round(wall_time, 3),
+        "memory": memory
+    }
+
+    # При превышении RLIMIT_CPU процесс получает SIGXCPU, а при жёстком лимите — SIGKILL
+    if timed_out or returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        result["status_id"] = STATUS_TIME_LIMIT
+    elif returncode != 0:
+        result["status_id"] = STATUS_RUNTIME_ERROR
+    elif stdout.strip() != expected_output.strip():
+        result["status_id"] = STATUS_WRONG_ANSWER
+    else:
+        result["status_id"] = STATUS_ACCEPTED
+    return result
+
+
+def run_local_testcases(data, max_workers=None, time_limit=LOCAL_TIME_LIMIT, memory_limit_mb=LOCAL_MEMORY_LIMIT_MB,
+                        fail_fast=None, on_result=None):
+    """
+    Локальная альтернатива run_judge0_testcases: подготовленный код компилируется один раз
+    во временной директории, после чего все тесткейсы запускаются на полученном бинарнике
+    параллельно (не более max_workers процессов одновременно) с ограничениями по времени и памяти.
+
+    Принимает и возвращает данные в том же формате, что и run_judge0_testcases.
+    Если код не скомпилировался, все тесткейсы помечаются как Compilation Error,
+    а вывод компилятора возвращается в stderr.
+    При fail_fast=FAIL_FAST_FIRST_FAILURE ещё не запущенные тесткейсы пропускаются после первого непройденного.
+    on_result(индекс, результат) вызывается по мере готовности тесткейсов; False от него отменяет прогон.
+    """
+    testcases = data.get("testcases", [])
+    language = LOCAL_LANGUAGES.get(data.get("language_id"))
+    if language is None:
+        raise ValueError(f"Язык с id {data.get('language_id')} не поддерживается локальным раннером")
+
+    work_dir = tempfile.mkdtemp(prefix="codigma-judge-")
+    try:
+        with open(os.path.join(work_dir, language["file"]), "w", encoding="utf-8") as f:
+            f.write(data.get("source_code", ""))
+
+        if language["compile"]:
+            try:
+                compiled = subprocess.run(
+                    language["compile"],
+                    cwd=work_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=LOCAL_COMPILE_TIMEOUT,
+                    env=_compile_env()
+                )
+                compile_output = compiled.stderr or compiled.stdout
+                compile_failed = compiled.returncode != 0
+            except subprocess.TimeoutExpired:
+                compile_output = f"Компиляция не завершилась за {LOCAL_COMPILE_TIMEOUT} с"
+                compile_failed = True
+
+            if compile_failed:
+                results = [
+                    {"token": f"local-{idx}", "status_id": STATUS_COMPILATION_ERROR, "stderr": compile_output}
+                    for idx in range(len(testcases))
+                ]
+                if results:
+                    finish_result(0, results[0], fail_fast, on_result)
+                return build_answer(results)
+
+        run_cmd = [part.format(memory=memory_limit_mb) for part in language["run"]]
+        limit_address_space = not language.get("managed_memory", False)
+        results = [skipped_result() for _ in testcases]
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = {
+                executor.submit(
+                    _run_test, idx, run_cmd, work_dir, testcase, time_limit, memory_limit_mb, limit_address_space
+                ): idx
+                for idx, testcase in enumerate(testcases)
+            }
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                results[futures[future]] = future.result()
+                if finish_result(futures[future], results[futures[future]], fail_fast, on_result):
+                    # Отменяются только ещё не начатые запуски, текущие доработают до конца
+                    for pending_future in futures:
+                        pending_future.cancel()
+        return build_answer(results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
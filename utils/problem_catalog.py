@@ -0,0 +1,164 @@
+import argparse
+import os
+import psycopg2
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from db import connection, get_all_tasks, search_problems
+
+load_dotenv()
+
+# Сколько секунд каталог задач считается актуальным
+PROBLEM_CATALOG_TTL = 300
+
+# Сколько страниц результатов поиска хранится в кэше (вытесняются давно не использованные)
+PROBLEM_CATALOG_MAX_PAGES = 256
+
+# Индексы "Problem" для db.search_problems: индекс (title, id) для keyset-пагинации
+# и триграммные GIN-индексы для ILIKE '%...%' (нужно расширение pg_trgm)
+PROBLEM_SEARCH_INDEXES = {
+    "Problem_visible_title_id_idx": "(title, id) WHERE hidden = false"
+}
+PROBLEM_TRGM_INDEXES = {
+    "Problem_title_trgm_idx": "USING gin (title gin_trgm_ops)",
+    "Problem_description_trgm_idx": "USING gin (description gin_trgm_ops)"
+}
+
+
+class ProblemCatalog:
+    """
+    Кэш каталога задач (список {"id", "title"} из get_all_tasks) в памяти процесса, общий для всех сессий.
+
+    Каталог перечитывается из БД не чаще раза в ttl секунд; при одновременных обращениях к устаревшему
+    каталогу запрос в БД выполняет только один поток, остальные ждут его результат.
+    Так же, с тем же ttl, кэшируются страницы поиска (search, см. db.search_problems).
+    invalidate() сбрасывает кэш сразу (вызывается после добавления задачи).
+    """
+
+    def __init__(self, loader=get_all_tasks, searcher=search_problems, ttl=PROBLEM_CATALOG_TTL,
+                 max_pages=PROBLEM_CATALOG_MAX_PAGES):
+        self._loader = loader
+        self._searcher = searcher
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._tasks = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self):
+        with self._lock:
+            if self._tasks is not None and time.monotonic() - self._loaded_at < self.ttl:
+                self._stats["hits"] += 1
+                return list(self._tasks)
+            self._stats["misses"] += 1
+            self._tasks = self._loader()
+            self._loaded_at = time.monotonic()
+            return list(self._tasks)
+
+    def search(self, query="", difficulties=None, after=None, limit=20):
+        """
+        Страница результатов поиска задач: (строки, курсор следующей страницы), как у db.search_problems.
+        """
+        key = ((query or "").strip().lower(), tuple(sorted(difficulties or [])), tuple(after or ()), limit)
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._pages.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+            version = self._version
+
+        page = self._searcher(query, difficulties, after, limit)
+        with self._lock:
+            # Если во время запроса кэш был сброшен, результат мог устареть — не сохраняем его
+            if version == self._version:
+                self._pages[key] = (time.monotonic(), page)
+                self._pages.move_to_end(key)
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+        return page
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._tasks = None
+            self._pages.clear()
+
+    def stats(self):
+        """
+        {"hits", "misses", "size", "pages", "age"} — size: задач в каталоге, pages: страниц поиска в кэше,
+        age: сколько секунд назад каталог загружен (None, если не загружен).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._tasks) if self._tasks is not None else 0
+            stats["pages"] = len(self._pages)
+            stats["age"] = time.monotonic() - self._loaded_at if self._tasks is not None else None
+        return stats
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_problem_catalog():
+    """
+    Возвращает общий для процесса каталог задач. TTL задаётся через PROBLEM_CATALOG_TTL (секунды).
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ProblemCatalog(ttl=float(os.getenv("PROBLEM_CATALOG_TTL", PROBLEM_CATALOG_TTL)))
+        return _catalog
+
+
+def _create_index_concurrently(cur, name, definition):
+    # Недостроенный (INVALID) индекс, оставшийся от прерванного запуска, удаляется и строится заново
+    cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (f'"{name}"',))
+    index = cur.fetchone()
+    if index is not None and not index[0]:
+        cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+    cur.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "Problem" {definition}')
+
+
+def install_problem_search_indexes():
+    """
+    Создаёт индексы для поиска задач (разовая миграция: python -m utils.problem_catalog install-indexes).
+    Индексы строятся CONCURRENTLY вне транзакции, поэтому запись задач на время построения не блокируется.
+    Если расширение pg_trgm недоступно, триграммные индексы пропускаются: поиск работает и без них, только медленнее.
+    Возвращает True, если триграммные индексы созданы.
+    """
+    with connection() as conn:
+        conn.autocommit = True
+        try:
+            cur = conn.cursor()
+            for name, definition in PROBLEM_SEARCH_INDEXES.items():
+                _create_index_concurrently(cur, name, definition)
+            try:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except psycopg2.Error as e:
+                print("Не удалось установить расширение pg_trgm, триграммные индексы не созданы:", e)
+                cur.close()
+                return False
+            for name, definition in PROBLEM_TRGM_INDEXES.items():
+                _create_index_concurrently(cur, name, definition)
+            cur.close()
+        finally:
+            conn.autocommit = False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Обслуживание каталога и поиска задач")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("install-indexes", help="создать индексы \"Problem\" для поиска задач (разовая миграция)")
+    args = parser.parse_args()
+
+    if args.command == "install-indexes":
+        trgm = install_problem_search_indexes()
+        print("Индексы для поиска задач созданы" + ("" if trgm else " (без триграммных)"))
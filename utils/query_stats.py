@@ -0,0 +1,247 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from dotenv import load_dotenv
+from psycopg2.extensions import connection as pg_connection, cursor as pg_cursor
+
+load_dotenv()
+
+# Верхние границы корзин гистограммы задержек, секунды (последняя корзина — всё, что дольше)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Запросы дольше этого (миллисекунды) попадают в журнал медленных запросов
+SLOW_QUERY_MS = 500
+
+# Сколько последних медленных запросов хранится в журнале
+SLOW_QUERY_LOG_SIZE = 100
+
+# Сколько символов текста запроса сохраняется в журнале
+SLOW_QUERY_TEXT_LIMIT = 500
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с фиксированными корзинами LATENCY_BUCKETS. Не потокобезопасна сама по себе:
+    вызывающая сторона держит свою блокировку.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+
+    def add(self, seconds):
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, percent):
+        """
+        Оценка перцентиля сверху — граница корзины, в которую он попадает (None, если замеров нет;
+        inf, если он в последней корзине).
+        """
+        total = sum(self.counts)
+        if not total:
+            return None
+        threshold = percent / 100 * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self):
+        """
+        {"≤ 1 мс": число замеров, ..., "> 10000 мс": ...} — в порядке корзин.
+        """
+        labels = [f"≤ {bound * 1000:g} мс" for bound in self.buckets] + [f"> {self.buckets[-1] * 1000:g} мс"]
+        return dict(zip(labels, self.counts))
+
+
+class QueryStats:
+    """
+    Статистика SQL-запросов процесса по местам вызова (модуль.функция:строка, см. call_site):
+    число запросов и ошибок, число строк (rowcount), суммарное и максимальное время, гистограмма задержек.
+    Запросы дольше slow_query_ms дополнительно пишутся в журнал медленных запросов (последние log_size).
+    """
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, log_size=SLOW_QUERY_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self._sites = {}
+        self._slow = deque(maxlen=log_size)
+        self._lock = threading.Lock()
+
+    def record(self, site, seconds, rows=0, statement=None, error=None):
+        with self._lock:
+            entry = self._sites.get(site)
+            if entry is None:
+                entry = self._sites[site] = {
+                    "count": 0, "errors": 0, "rows": 0, "total": 0.0, "max": 0.0, "histogram": LatencyHistogram()
+                }
+            entry["count"] += 1
+            entry["rows"] += max(rows, 0)
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["histogram"].add(seconds)
+            if error is not None:
+                entry["errors"] += 1
+            slow = seconds * 1000 >= self.slow_query_ms
+            if slow:
+                self._slow.append({
+                    "time": datetime.now().isoformat(timespec="seconds"),
+                    "site": site,
+                    "duration_ms": round(seconds * 1000, 1),
+                    "rows": rows,
+                    "error": error,
+                    "statement": _statement_text(statement)
+                })
+        if slow:
+            print(f"Медленный запрос ({seconds * 1000:.0f} мс) в {site}: {_statement_text(statement)}")
+
+    def sites(self):
+        """
+        Сводка по местам вызова, отсортированная по суммарному времени:
+        [{"site", "count", "errors", "rows", "total_ms", "avg_ms", "p50_ms", "p95_ms", "max_ms", "histogram"}].
+        p50/p95 — оценки сверху по корзинам гистограммы.
+        """
+        with self._lock:
+            rows = []
+            for site, entry in self._sites.items():
+                histogram = entry["histogram"]
+                p50, p95 = histogram.percentile(50), histogram.percentile(95)
+                rows.append({
+                    "site": site,
+                    "count": entry["count"],
+                    "errors": entry["errors"],
+                    "rows": entry["rows"],
+                    "total_ms": entry["total"] * 1000,
+                    "avg_ms": entry["total"] * 1000 / entry["count"],
+                    "p50_ms": p50 * 1000,
+                    "p95_ms": p95 * 1000,
+                    "max_ms": entry["max"] * 1000,
+                    "histogram": histogram.to_dict()
+                })
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def slow_queries(self):
+        """
+        Журнал медленных запросов, самые свежие первыми.
+        """
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._sites.clear()
+            self._slow.clear()
+
+
+def _statement_text(statement):
+    if statement is None:
+        return None
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    text = " ".join(str(statement).split())
+    return text if len(text) <= SLOW_QUERY_TEXT_LIMIT else text[:SLOW_QUERY_TEXT_LIMIT] + "…"
+
+
+# Код функций-обёрток (например, db.insert_rows): место вызова ищется выше них по стеку
+_helper_codes = set()
+
+
+def query_helper(func):
+    """
+    Помечает функцию как обёртку над запросами: в статистике запрос будет приписан тому, кто её вызвал.
+    """
+    _helper_codes.add(func.__code__)
+    return func
+
+
+def call_site():
+    """
+    Место вызова запроса "модуль.функция:строка" — первый кадр стека вне psycopg2, этого модуля
+    и функций, помеченных query_helper.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not (module == __name__ or module.startswith("psycopg2") or frame.f_code in _helper_codes):
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class _InstrumentedCursorMixin:
+    """
+    Замеряет execute, executemany и copy_expert курсора и записывает их в get_query_stats().
+    Для именованных (серверных) курсоров замеряется только объявление курсора, без последующих выборок.
+    """
+
+    def _timed(self, method, *args):
+        site = call_site()
+        start = time.perf_counter()
+        try:
+            result = method(*args)
+        except Exception as e:
+            get_query_stats().record(site, time.perf_counter() - start, 0, args[0], error=type(e).__name__)
+            raise
+        get_query_stats().record(site, time.perf_counter() - start, self.rowcount, args[0])
+        return result
+
+    def execute(self, query, vars=None):
+        return self._timed(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed(super().copy_expert, sql, file, size)
+
+
+_cursor_classes = {}
+_cursor_classes_lock = threading.Lock()
+
+
+def instrumented_cursor_class(cursor_factory):
+    """
+    Подкласс курсора cursor_factory (например, RealDictCursor) с замером запросов; создаётся один раз на класс.
+    """
+    with _cursor_classes_lock:
+        cls = _cursor_classes.get(cursor_factory)
+        if cls is None:
+            cls = _cursor_classes[cursor_factory] = type(
+                f"Instrumented{cursor_factory.__name__}", (_InstrumentedCursorMixin, cursor_factory), {}
+            )
+        return cls
+
+
+class InstrumentedConnection(pg_connection):
+    """
+    Соединение psycopg2, все курсоры которого (с любым cursor_factory) замеряют свои запросы.
+    Передаётся в psycopg2.connect / пул как connection_factory.
+    """
+
+    def cursor(self, *args, **kwargs):
+        cursor_factory = kwargs.pop("cursor_factory", None) or self.cursor_factory or pg_cursor
+        return super().cursor(*args, cursor_factory=instrumented_cursor_class(cursor_factory), **kwargs)
+
+
+_query_stats = None
+_query_stats_lock = threading.Lock()
+
+
+def get_query_stats():
+    """
+    Возвращает общую для процесса статистику запросов. Порог медленного запроса задаётся через
+    DB_SLOW_QUERY_MS (миллисекунды).
+    """
+    global _query_stats
+    with _query_stats_lock:
+        if _query_stats is None:
+            _query_stats = QueryStats(slow_query_ms=float(os.getenv("DB_SLOW_QUERY_MS", SLOW_QUERY_MS)))
+        return _query_stats
@@ -0,0 +1,485 @@
+import argparse
+import csv
+import json
+import os
+import time
+from psycopg2.extras import RealDictCursor
+from db import connection
+
+# Сколько секунд до прошлого водяного знака пересматривается при инкрементальном пересчёте:
+# отправки из транзакций, закоммиченных после прошлого запуска, но с более ранним "updatedAt", не теряются
+REPORT_OVERLAP_SECONDS = 300
+
+# Сколько строк серверный курсор забирает из БД за один раз при выгрузке
+REPORT_EXPORT_FETCH_SIZE = 5000
+
+# Индексы "Submission", по которым инкрементальный пересчёт находит изменившиеся отправки
+REPORT_SUBMISSION_INDEXES = {
+    "Submission_updatedAt_idx": '("updatedAt")',
+    "Submission_problemId_idx": '("problemId")',
+    "Submission_activeContestId_createdAt_idx": '("activeContestId", "createdAt")'
+}
+
+# Выгружаемые отчёты: запрос и столбцы (имя, тип pyarrow для Parquet)
+REPORT_EXPORTS = {
+    "problem_stats": {
+        "title": "Решаемость задач",
+        "query": """
+            SELECT "problemId", title, difficulty, submissions, accepted, "usersAttempted", "usersSolved",
+                   "updatedAt"
+            FROM "ReportProblemStats"
+            ORDER BY difficulty, title
+        """,
+        "columns": [
+            ("problemId", "string"), ("title", "string"), ("difficulty", "string"), ("submissions", "int64"),
+            ("accepted", "int64"), ("usersAttempted", "int64"), ("usersSolved", "int64"), ("updatedAt", "timestamp")
+        ]
+    },
+    "difficulty_stats": {
+        "title": "Статистика по сложности",
+        "query": """
+            SELECT difficulty, problems, submissions, accepted, "avgSolveRate"
+            FROM "ReportDifficultyStats"
+            ORDER BY difficulty
+        """,
+        "columns": [
+            ("difficulty", "string"), ("problems", "int64"), ("submissions", "int64"), ("accepted", "int64"),
+            ("avgSolveRate", "float64")
+        ]
+    },
+    "contest_activity": {
+        "title": "Активность в контестах",
+        "query": """
+            SELECT "contestId", "contestTitle", day, submissions, accepted, "activeUsers"
+            FROM "ReportContestActivity"
+            ORDER BY "contestId", day
+        """,
+        "columns": [
+            ("contestId", "string"), ("contestTitle", "string"), ("day", "date"), ("submissions", "int64"),
+            ("accepted", "int64"), ("activeUsers", "int64")
+        ]
+    },
+    "submissions": {
+        "title": "Все отправки (без кода)",
+        "query": """
+            SELECT s.id, s."problemId", p.title AS "problemTitle", p.difficulty::text AS difficulty, s."userId",
+                   s."activeContestId" AS "contestId", s.status::text AS status, s.time, s.memory, s."createdAt"
+            FROM "Submission" s
+            JOIN "Problem" p ON p.id = s."problemId"
+            ORDER BY s."createdAt", s.id
+        """,
+        "columns": [
+            ("id", "string"), ("problemId", "string"), ("problemTitle", "string"), ("difficulty", "string"),
+            ("userId", "string"), ("contestId", "string"), ("status", "string"), ("time", "float64"),
+            ("memory", "int64"), ("createdAt", "timestamp")
+        ]
+    }
+}
+
+_report_tables_ready = False
+
+
+def ensure_report_tables():
+    """
+    Один раз за процесс создаёт таблицы отчётов (индексы "Submission" создаёт install_report_indexes).
+    """
+    global _report_tables_ready
+    if _report_tables_ready:
+        return
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ReportProblemStats" (
+                "problemId" TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                submissions INTEGER NOT NULL,
+                accepted INTEGER NOT NULL,
+                "usersAttempted" INTEGER NOT NULL,
+                "usersSolved" INTEGER NOT NULL,
+                "updatedAt" TIMESTAMP(3) NOT NULL
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ReportDifficultyStats" (
+                difficulty TEXT PRIMARY KEY,
+                problems INTEGER NOT NULL,
+                submissions INTEGER NOT NULL,
+                accepted INTEGER NOT NULL,
+                "avgSolveRate" DOUBLE PRECISION
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ReportContestActivity" (
+                "contestId" TEXT NOT NULL,
+                "contestTitle" TEXT NOT NULL,
+                day DATE NOT NULL,
+                submissions INTEGER NOT NULL,
+                accepted INTEGER NOT NULL,
+                "activeUsers" INTEGER NOT NULL,
+                PRIMARY KEY ("contestId", day)
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS "ReportState" (
+                name TEXT PRIMARY KEY,
+                watermark TIMESTAMP NOT NULL,
+                "lastRunAt" TIMESTAMP NOT NULL,
+                "lastDuration" DOUBLE PRECISION
+            )
+        """)
+        conn.commit()
+        cur.close()
+    _report_tables_ready = True
+
+
+def install_report_indexes():
+    """
+    Создаёт индексы "Submission" из REPORT_SUBMISSION_INDEXES
+    (разовая миграция: python -m utils.reports install-indexes).
+    Индексы строятся CONCURRENTLY вне транзакции, поэтому запись отправок на время построения не блокируется.
+    Недостроенный (INVALID) индекс, оставшийся от прерванного запуска, удаляется и строится заново.
+    Без этих индексов пересчёт отчётов работает, но просматривает "Submission" целиком.
+    """
+    with connection() as conn:
+        conn.autocommit = True
+        try:
+            cur = conn.cursor()
+            for name, columns in REPORT_SUBMISSION_INDEXES.items():
+                cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (f'"{name}"',))
+                index = cur.fetchone()
+                if index is not None and not index[0]:
+                    cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+                cur.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "Submission" {columns}')
+            cur.close()
+        finally:
+            conn.autocommit = False
+
+
+def _refresh_problem_stats(cur, problem_ids):
+    """
+    Пересчитывает строки "ReportProblemStats" для задач problem_ids (None — для всех задач).
+    Считаются только проверенные отправки (не PENDING).
+    """
+    condition, params = ("WHERE p.id = ANY(%s)", (problem_ids,)) if problem_ids is not None else ("", ())
+    if problem_ids is None:
+        cur.execute('DELETE FROM "ReportProblemStats"')
+    else:
+        # Удалённые задачи пропадают из отчёта
+        cur.execute(
+            'DELETE FROM "ReportProblemStats" r WHERE r."problemId" = ANY(%s) '
+            'AND NOT EXISTS (SELECT 1 FROM "Problem" p WHERE p.id = r."problemId")',
+            (problem_ids,)
+        )
+    cur.execute(f"""
+        INSERT INTO "ReportProblemStats" (
+            "problemId", title, difficulty, submissions, accepted, "usersAttempted", "usersSolved", "updatedAt"
+        )
+        SELECT p.id, p.title, p.difficulty::text,
+               COUNT(s.id) FILTER (WHERE s.status <> 'PENDING'),
+               COUNT(s.id) FILTER (WHERE s.status = 'AC'),
+               COUNT(DISTINCT s."userId") FILTER (WHERE s.status <> 'PENDING'),
+               COUNT(DISTINCT s."userId") FILTER (WHERE s.status = 'AC'),
+               LOCALTIMESTAMP
+        FROM "Problem" p
+        LEFT JOIN "Submission" s ON s."problemId" = p.id
+        {condition}
+        GROUP BY p.id
+        ON CONFLICT ("problemId") DO UPDATE
+        SET title = EXCLUDED.title,
+            difficulty = EXCLUDED.difficulty,
+            submissions = EXCLUDED.submissions,
+            accepted = EXCLUDED.accepted,
+            "usersAttempted" = EXCLUDED."usersAttempted",
+            "usersSolved" = EXCLUDED."usersSolved",
+            "updatedAt" = EXCLUDED."updatedAt"
+    """, params)
+    return cur.rowcount
+
+
+def _refresh_contest_activity(cur, contest_days):
+    """
+    Пересчитывает строки "ReportContestActivity" для пар (контест, день) из contest_days (None — для всех).
+    """
+    if contest_days is None:
+        cur.execute('DELETE FROM "ReportContestActivity"')
+        join, params = "", ()
+    else:
+        contest_ids = [contest_id for contest_id, _ in contest_days]
+        days = [day for _, day in contest_days]
+        cur.execute("""
+            DELETE FROM "ReportContestActivity" r
+            USING unnest(%s::text[], %s::date[]) AS k("contestId", day)
+            WHERE r."contestId" = k."contestId" AND r.day = k.day
+        """, (contest_ids, days))
+        join = """
+            JOIN unnest(%s::text[], %s::date[]) AS k("contestId", day)
+              ON k."contestId" = s."activeContestId" AND k.day = s."createdAt"::date
+        """
+        params = (contest_ids, days)
+    cur.execute(f"""
+        INSERT INTO "ReportContestActivity" ("contestId", "contestTitle", day, submissions, accepted, "activeUsers")
+        SELECT s."activeContestId", c.title, s."createdAt"::date,
+               COUNT(*), COUNT(*) FILTER (WHERE s.status = 'AC'), COUNT(DISTINCT s."userId")
+        FROM "Submission" s
+        {join}
+        JOIN "Contest" c ON c.id = s."activeContestId"
+        WHERE s."activeContestId" IS NOT NULL
+        GROUP BY s."activeContestId", c.title, s."createdAt"::date
+    """, params)
+    return cur.rowcount
+
+
+def _refresh_difficulty_stats(cur):
+    """
+    "ReportDifficultyStats" целиком пересчитывается из "ReportProblemStats" (в нём по строке на задачу).
+    """
+    cur.execute('DELETE FROM "ReportDifficultyStats"')
+    cur.execute("""
+        INSERT INTO "ReportDifficultyStats" (difficulty, problems, submissions, accepted, "avgSolveRate")
+        SELECT difficulty, COUNT(*), SUM(submissions), SUM(accepted),
+               AVG(accepted::float / submissions) FILTER (WHERE submissions > 0)
+        FROM "ReportProblemStats"
+        GROUP BY difficulty
+    """)
+
+
+def run_report_aggregation(full=False):
+    """
+    Обновляет таблицы отчётов и возвращает сводку {"full", "problems", "contest_days", "elapsed"}.
+
+    Инкрементальный режим пересчитывает только затронутые ключи: задачи, у которых с прошлого запуска
+    появились или изменились отправки (или изменилась сама задача), и пары (контест, день) таких отправок.
+    Изменения ищутся по "Submission"."updatedAt" от водяного знака прошлого запуска (с запасом
+    REPORT_OVERLAP_SECONDS, быстро — при установленных install_report_indexes индексах).
+    Первый запуск и full=True пересчитывают всё (так же учитываются удалённые отправки).
+    Весь пересчёт — одна транзакция; параллельные запуски ждут друг друга.
+    """
+    ensure_report_tables()
+    start = time.monotonic()
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext('ReportAggregation'))")
+        cur.execute("SELECT LOCALTIMESTAMP")
+        run_at = cur.fetchone()[0]
+        cur.execute("""SELECT watermark FROM "ReportState" WHERE name = 'reports'""")
+        state = cur.fetchone()
+        full = full or state is None
+
+        if full:
+            problems = _refresh_problem_stats(cur, None)
+            contest_days = _refresh_contest_activity(cur, None)
+        else:
+            since = (state[0], REPORT_OVERLAP_SECONDS)
+            cur.execute("""
+                SELECT "problemId" FROM "Submission" WHERE "updatedAt" > %s - make_interval(secs => %s)
+                UNION
+                SELECT id FROM "Problem" WHERE "updatedAt" > %s - make_interval(secs => %s)
+            """, since + since)
+            problem_ids = [row[0] for row in cur.fetchall()]
+            cur.execute("""
+                SELECT DISTINCT "activeContestId", "createdAt"::date FROM "Submission"
+                WHERE "updatedAt" > %s - make_interval(secs => %s) AND "activeContestId" IS NOT NULL
+            """, since)
+            changed_days = cur.fetchall()
+            problems = _refresh_problem_stats(cur, problem_ids) if problem_ids else 0
+            contest_days = _refresh_contest_activity(cur, changed_days) if changed_days else 0
+
+        if full or problems:
+            _refresh_difficulty_stats(cur)
+        elapsed = time.monotonic() - start
+        cur.execute("""
+            INSERT INTO "ReportState" (name, watermark, "lastRunAt", "lastDuration") VALUES ('reports', %s, %s, %s)
+            ON CONFLICT (name) DO UPDATE
+            SET watermark = EXCLUDED.watermark, "lastRunAt" = EXCLUDED."lastRunAt", "lastDuration" = EXCLUDED."lastDuration"
+        """, (run_at, run_at, elapsed))
+        conn.commit()
+        cur.close()
+    return {"full": full, "problems": problems, "contest_days": contest_days, "elapsed": elapsed}
+
+
+def get_report_state():
+    """
+    Когда и за сколько секунд отчёты пересчитывались в последний раз: {"lastRunAt", "lastDuration"} или None.
+    """
+    ensure_report_tables()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("""SELECT "lastRunAt", "lastDuration" FROM "ReportState" WHERE name = 'reports'""")
+        state = cur.fetchone()
+        cur.close()
+    return state
+
+
+def get_difficulty_stats():
+    ensure_report_tables()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(REPORT_EXPORTS["difficulty_stats"]["query"])
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+def get_problem_stats(order="hardest", difficulty=None, limit=50):
+    """
+    Задачи из "ReportProblemStats" с долей принятых отправок (solveRate).
+    order — "hardest" (сначала с наименьшей долей), "easiest" или "popular" (больше всего отправок);
+    задачи без проверенных отправок в "hardest"/"easiest" не попадают.
+    """
+    ensure_report_tables()
+    orders = {
+        "hardest": 'ORDER BY "solveRate", submissions DESC',
+        "easiest": 'ORDER BY "solveRate" DESC, submissions DESC',
+        "popular": 'ORDER BY submissions DESC, title'
+    }
+    conditions, params = [], []
+    if order in ("hardest", "easiest"):
+        conditions.append("submissions > 0")
+    if difficulty:
+        conditions.append("difficulty = %s")
+        params.append(difficulty.upper())
+    where = f'WHERE {" AND ".join(conditions)}' if conditions else ""
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(f"""
+            SELECT "problemId", title, difficulty, submissions, accepted, "usersAttempted", "usersSolved",
+                   accepted::float / NULLIF(submissions, 0) AS "solveRate"
+            FROM "ReportProblemStats"
+            {where}
+            {orders[order]}
+            LIMIT %s
+        """, (*params, limit))
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+def get_report_contests():
+    """
+    Контесты, по которым есть активность: список {"contestId", "contestTitle", "submissions"}, сначала активные.
+    """
+    ensure_report_tables()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("""
+            SELECT "contestId", MAX("contestTitle") AS "contestTitle", SUM(submissions) AS submissions
+            FROM "ReportContestActivity"
+            GROUP BY "contestId"
+            ORDER BY submissions DESC
+        """)
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+def get_contest_activity(contest_id):
+    """
+    Активность по дням в контесте: список {"day", "submissions", "accepted", "activeUsers"}.
+    """
+    ensure_report_tables()
+    with connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("""
+            SELECT day, submissions, accepted, "activeUsers" FROM "ReportContestActivity"
+            WHERE "contestId" = %s ORDER BY day
+        """, (contest_id,))
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+def _iter_batches(report, fetch_size):
+    """
+    Потоково читает отчёт через серверный (именованный) курсор пачками по fetch_size строк.
+    """
+    ensure_report_tables()
+    with connection() as conn:
+        with conn.cursor(name=f"report_export_{report}") as cur:
+            cur.itersize = fetch_size
+            cur.execute(REPORT_EXPORTS[report]["query"])
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield rows
+
+
+def _arrow_schema(columns):
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(), "int64": pa.int64(), "float64": pa.float64(),
+        "timestamp": pa.timestamp("ms"), "date": pa.date32()
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _check_export_size(path, max_bytes):
+    if max_bytes is not None and os.path.getsize(path) > max_bytes:
+        raise ValueError(
+            f"Выгрузка больше {max_bytes / (1024 * 1024):g} МБ: используйте python -m utils.reports export"
+        )
+
+
+def export_report(report, path, fmt="csv", fetch_size=REPORT_EXPORT_FETCH_SIZE, max_bytes=None):
+    """
+    Выгружает отчет report (ключ REPORT_EXPORTS) в файл path в формате "csv" или "parquet" и возвращает число строк.
+    Строки читаются серверным курсором и пишутся пачками по fetch_size, поэтому в памяти процесса
+    одновременно находится не больше одной пачки (для Parquet — одна пачка = одна row group).
+    Если файл превысил max_bytes, выгрузка прерывается с ValueError; недописанный файл удаляет вызывающий.
+    """
+    columns = REPORT_EXPORTS[report]["columns"]
+    names = [name for name, _ in columns]
+    count = 0
+    if fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            for rows in _iter_batches(report, fetch_size):
+                writer.writerows(rows)
+                count += len(rows)
+                f.flush()
+                _check_export_size(path, max_bytes)
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _arrow_schema(columns)
+        with pq.ParquetWriter(path, schema) as writer:
+            for rows in _iter_batches(report, fetch_size):
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array([row[index] for row in rows], type=field.type) for index, field in enumerate(schema)],
+                    schema=schema
+                )
+                writer.write_batch(batch)
+                count += len(rows)
+                _check_export_size(path, max_bytes)
+    else:
+        raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчёт таблиц отчётов и выгрузка отчётов")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    aggregate_parser = subparsers.add_parser("aggregate", help="пересчитать таблицы отчётов (например, из cron)")
+    aggregate_parser.add_argument("--full", action="store_true", help="пересчитать всё, а не только изменившееся")
+    export_parser = subparsers.add_parser("export", help="выгрузить отчёт в файл")
+    export_parser.add_argument("report", choices=list(REPORT_EXPORTS))
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    export_parser.add_argument("--fetch-size", type=int, default=REPORT_EXPORT_FETCH_SIZE)
+    subparsers.add_parser(
+        "install-indexes", help="создать индексы \"Submission\" для инкрементального пересчёта (CONCURRENTLY)"
+    )
+    args = parser.parse_args()
+
+    if args.command == "aggregate":
+        result = run_report_aggregation(full=args.full)
+    elif args.command == "install-indexes":
+        install_report_indexes()
+        result = {"indexes": list(REPORT_SUBMISSION_INDEXES)}
+    else:
+        result = {"rows": export_report(args.report, args.path, args.format, args.fetch_size)}
+    print(json.dumps(result, ensure_ascii=False, indent=4))
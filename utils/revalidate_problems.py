@@ -0,0 +1,195 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from psycopg2.extras import RealDictCursor
+from db import connection
+from utils.add_problem import get_problem_dir, read_problem_metadata, read_reference_solutions
+from utils.judge_jobs import JOB_RUNNERS
+from utils.problem_generator import problem_generator
+from utils.run_tests_on_code import FAIL_FAST_COMPILE, FAIL_FAST_FIRST_FAILURE
+from utils.verify_solutions import verify_reference_solutions
+
+# Сколько задач читается из БД одним коротким запросом
+REVALIDATE_FETCH_SIZE = 100
+
+# Сколько задач проверяется одновременно; в очереди на проверку держится не больше двух окон
+REVALIDATE_WORKERS = 4
+
+REVALIDATE_OK = "ok"
+REVALIDATE_REGRESSION = "regression"
+REVALIDATE_ERROR = "error"
+REVALIDATE_SKIPPED = "skipped"
+
+
+def iter_problems(fetch_size=REVALIDATE_FETCH_SIZE):
+    """
+    Постранично читает нескрытые задачи с тесткейсами (keyset-пагинация по id, по fetch_size задач за раз),
+    не загружая всю таблицу в память. Отдаёт словари {"id", "title", "testcases"},
+    где testcases — [{"stdin", "expected_output"}] из всех строк TestCase задачи.
+
+    Каждая страница читается в своей короткой транзакции, и соединение возвращается в пул до того,
+    как задачи уходят на проверку: многочасовой прогон не держит ни слот пула, ни открытую транзакцию.
+    """
+    after = ""
+    while True:
+        with connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT p.id, p.title, t.input, t.output
+                    FROM (
+                        SELECT id, title FROM "Problem"
+                        WHERE hidden = false AND id > %s
+                        ORDER BY id
+                        LIMIT %s
+                    ) p
+                    LEFT JOIN "TestCase" t ON t."problemId" = p.id
+                    ORDER BY p.id
+                """, (after, fetch_size))
+                page = cur.fetchall()
+        if not page:
+            return
+
+        for problem_id, rows in itertools.groupby(page, key=lambda row: row["id"]):
+            rows = list(rows)
+            testcases = []
+            for row in rows:
+                for stdin, expected_output in zip(row["input"] or [], row["output"] or []):
+                    testcases.append({"stdin": stdin, "expected_output": expected_output})
+            yield {"id": problem_id, "title": rows[0]["title"], "testcases": testcases}
+        after = page[-1]["id"]
+
+
+def revalidate_problem(problem, runner, base_dir=None, **runner_kwargs):
+    """
+    Перепроверяет одну задачу: заново генерирует шаблоны через problem_generator по Structure.md
+    и прогоняет сохранённые тесткейсы на эталонных решениях из папки reference.
+    Возвращает список строк отчёта — по одной на язык (или одну строку, если задачу проверить нельзя).
+    """
+    row = {"problem_id": problem["id"], "title": problem["title"]}
+    problem_dir = get_problem_dir(problem["title"], base_dir)
+
+    metadata = read_problem_metadata(problem_dir)
+    if metadata is None:
+        return [{**row, "language": None, "status": REVALIDATE_SKIPPED, "reason": "Нет Structure.md"}]
+    solutions = read_reference_solutions(problem_dir)
+    if not solutions:
+        return [{**row, "language": None, "status": REVALIDATE_SKIPPED, "reason": "Нет эталонного решения"}]
+    if not problem["testcases"]:
+        return [{**row, "language": None, "status": REVALIDATE_SKIPPED, "reason": "Нет тесткейсов"}]
+
+    # Языки одной задачи проверяются последовательно: параллельность ограничивается числом задач.
+    # Кэш результатов не используется, иначе попадание в кэш скрыло бы регрессию в Judge0 или в тесткейсах
+    matrix = verify_reference_solutions(
+        problem_generator(metadata), solutions, problem["testcases"], runner=runner, max_workers=1, use_cache=False,
+        **runner_kwargs
+    )
+
+    report = []
+    for lang, result in matrix.items():
+        if result["status"] == 1:
+            status = REVALIDATE_OK
+        elif result["incorrect_test_indexes"]:
+            status = REVALIDATE_REGRESSION
+        else:
+            # Неверных ответов нет, но часть тестов не удалось прогнать: это сбой Judge0, а не регрессия
+            status = REVALIDATE_ERROR
+        report.append({
+            **row,
+            "language": lang,
+            "status": status,
+            "tests_count": result["tests_count"],
+            "correct_tests_count": result["correct_tests_count"],
+            "incorrect_test_indexes": result["incorrect_test_indexes"],
+            "error_test_indexes": result["error_test_indexes"],
+            "stderr": result["stderr"] if status != REVALIDATE_OK else None,
+            "elapsed": result["elapsed"]
+        })
+    return report
+
+
+def revalidate_all(report_path, runner="batch", max_workers=REVALIDATE_WORKERS, fetch_size=REVALIDATE_FETCH_SIZE,
+                   base_dir=None, **runner_kwargs):
+    """
+    Перепроверяет все нескрытые задачи и пишет отчёт в report_path (JSON Lines, строка на задачу и язык).
+
+    Задачи читаются из БД страницами по fetch_size (см. iter_problems) и проверяются в max_workers потоках;
+    новые задачи берутся по мере освобождения потоков, поэтому на проверке одновременно не больше 2 * max_workers задач.
+    runner — имя из JOB_RUNNERS, остальные именованные аргументы передаются в раннер (например, fail_fast).
+
+    Возвращает сводку {"problems", "ok", "regression", "error", "skipped", "elapsed"}.
+    """
+    if runner not in JOB_RUNNERS:
+        raise ValueError(f"Неизвестный раннер: {runner}")
+
+    summary = {"problems": 0, REVALIDATE_OK: 0, REVALIDATE_REGRESSION: 0, REVALIDATE_ERROR: 0, REVALIDATE_SKIPPED: 0}
+    start = time.monotonic()
+
+    def write_rows(report_file, rows):
+        for row in rows:
+            summary[row["status"]] += 1
+            report_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        report_file.flush()
+
+    with open(report_path, "w", encoding="utf-8") as report_file, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="revalidate") as executor:
+        pending = {}
+        for problem in iter_problems(fetch_size):
+            summary["problems"] += 1
+            future = executor.submit(
+                revalidate_problem, problem, JOB_RUNNERS[runner], base_dir, **runner_kwargs
+            )
+            pending[future] = problem
+            if len(pending) >= 2 * max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write_rows(report_file, _future_rows(future, pending.pop(future)))
+
+        for future in list(pending):
+            write_rows(report_file, _future_rows(future, pending.pop(future)))
+
+    summary["elapsed"] = time.monotonic() - start
+    return summary
+
+
+def _future_rows(future, problem):
+    try:
+        return future.result()
+    except Exception as e:
+        return [{
+            "problem_id": problem["id"],
+            "title": problem["title"],
+            "language": None,
+            "status": REVALIDATE_ERROR,
+            "reason": str(e)
+        }]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ночная перепроверка тесткейсов всех задач на эталонных решениях"
+    )
+    parser.add_argument("--report", default=f"revalidation-{time.strftime('%Y%m%d')}.jsonl",
+                        help="файл отчёта (JSON Lines)")
+    parser.add_argument("--runner", default="batch", choices=sorted(JOB_RUNNERS), help="раннер тесткейсов")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("REVALIDATE_WORKERS", REVALIDATE_WORKERS)),
+                        help="сколько задач проверять одновременно")
+    parser.add_argument("--fetch-size", type=int, default=REVALIDATE_FETCH_SIZE,
+                        help="сколько задач читать из БД за раз")
+    parser.add_argument("--problems-dir", default=None, help="папка с файлами задач (по умолчанию PROBLEMS_DIR)")
+    parser.add_argument("--fail-fast", default=None, choices=[FAIL_FAST_COMPILE, FAIL_FAST_FIRST_FAILURE],
+                        help="останавливать прогон задачи на первой ошибке")
+    args = parser.parse_args()
+
+    result = revalidate_all(
+        args.report,
+        runner=args.runner,
+        max_workers=args.workers,
+        fetch_size=args.fetch_size,
+        base_dir=args.problems_dir,
+        fail_fast=args.fail_fast
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=4))
+    print(f"Отчёт записан в: {args.report}")
@@ -1,14 +1,283 @@
+import asyncio
 import base64
-import requests
+import math
 import time
 from dotenv import load_dotenv
-import os
-import json
+from utils.judge0_callback import get_callback_receiver
+from utils.judge0_client import get_judge0_client
+from utils.judge_cache import get_judge_cache, make_cache_key
 
 load_dotenv()
 
+# Judge0 по умолчанию принимает не более 20 сабмишенов в одном batch-запросе
+JUDGE0_BATCH_SIZE = 20
 
-def run_judge0_testcases(data):
+# Сколько сабмишенов асинхронный раннер держит в работе одновременно
+JUDGE0_MAX_IN_FLIGHT = 5
+
+# Параметры опроса: первая пауза короткая, дальше растёт экспоненциально до потолка
+JUDGE0_POLL_FIRST_DELAY = 0.2
+JUDGE0_POLL_BACKOFF = 2.0
+JUDGE0_POLL_MAX_DELAY = 5.0
+
+# Сколько секунд ждать callback-ов от Judge0, прежде чем перейти к опросу
+JUDGE0_CALLBACK_TIMEOUT = 30
+
+# Сколько секунд пакетный опрос ждёт завершения сабмишенов, прежде чем пометить оставшиеся как ошибку
+JUDGE0_POLL_TIMEOUT = 300
+
+JUDGE0_STATUS_ACCEPTED = 3
+JUDGE0_STATUS_COMPILATION_ERROR = 6
+
+# Сбои на стороне Judge0, а не вердикт по решению: повторный запуск может дать другой результат
+JUDGE0_TRANSIENT_STATUSES = {13, 14}
+
+JUDGE0_STATUS_NAMES = {
+    3: "Accepted",
+    4: "Wrong Answer",
+    5: "Time Limit Exceeded",
+    6: "Compilation Error",
+    7: "Runtime Error (SIGSEGV)",
+    8: "Runtime Error (SIGXFSZ)",
+    9: "Runtime Error (SIGFPE)",
+    10: "Runtime Error (SIGABRT)",
+    11: "Runtime Error (NZEC)",
+    12: "Runtime Error (Other)",
+    13: "Internal Error",
+    14: "Exec Format Error"
+}
+
+# Режимы досрочной остановки (параметр fail_fast у раннеров):
+# "compile" — прекратить прогон при ошибке компиляции,
+# "first_failure" — прекратить прогон при первом непройденном тесте
+FAIL_FAST_COMPILE = "compile"
+FAIL_FAST_FIRST_FAILURE = "first_failure"
+
+
+def poll_delays(first=JUDGE0_POLL_FIRST_DELAY, backoff=JUDGE0_POLL_BACKOFF, max_delay=JUDGE0_POLL_MAX_DELAY):
+    """
+    Бесконечный генератор пауз между опросами Judge0: first, first * backoff, ... но не больше max_delay.
+    """
+    delay = first
+    while True:
+        yield delay
+        delay = min(delay * backoff, max_delay)
+
+
+def encode_base64(text):
+    return base64.b64encode(text.encode()).decode("utf-8")
+
+
+def decode_base64(text):
+    if text is None:
+        return None
+    return base64.b64decode(text).decode("utf-8", errors="replace")
+
+
+def error_result():
+    return {"token": "Ошибка", "status_id": None, "stderr": None}
+
+
+def skipped_result(token="Пропущен"):
+    return {"token": token, "status_id": None, "stderr": None, "skipped": True}
+
+
+def _to_number(value, cast=float):
+    if value is None or value == "":
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def result_from_submission(token, result_data):
+    """
+    Превращает ответ Judge0 (base64_encoded=true) в результат тесткейса.
+    При ошибке компиляции в stderr попадает вывод компилятора.
+    Метрики Judge0 сохраняются как time и wall_time (секунды) и memory (КБ, пик памяти).
+    """
+    status_id = result_data["status"]["id"]
+    stderr = result_data.get("stderr")
+    if status_id == JUDGE0_STATUS_COMPILATION_ERROR and result_data.get("compile_output"):
+        stderr = result_data.get("compile_output")
+    return {
+        "token": token,
+        "status_id": status_id,
+        "stderr": decode_base64(stderr),
+        "time": _to_number(result_data.get("time")),
+        "wall_time": _to_number(result_data.get("wall_time")),
+        "memory": _to_number(result_data.get("memory"), int)
+    }
+
+
+def _percentile(sorted_values, percent):
+    """
+    Перцентиль по методу ближайшего ранга для отсортированного списка.
+    """
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_metrics(results):
+    """
+    Считает max/p50/p95 по времени CPU (time), реальному времени (wall_time) и памяти (memory)
+    среди тесткейсов, для которых эти метрики известны.
+    Возвращает {"time": {"max", "p50", "p95"}, "wall_time": {...}, "memory": {...}};
+    для метрики без данных все значения равны None.
+    """
+    metrics = {}
+    for key in ("time", "wall_time", "memory"):
+        values = sorted(result[key] for result in results if result.get(key) is not None)
+        if values:
+            metrics[key] = {"max": values[-1], "p50": _percentile(values, 50), "p95": _percentile(values, 95)}
+        else:
+            metrics[key] = {"max": None, "p50": None, "p95": None}
+    return metrics
+
+
+def is_definitive(result):
+    """
+    Является ли результат окончательным вердиктом по решению, который можно кэшировать:
+    не ошибка связи, не пропущенный тесткейс и не внутренний сбой Judge0 (JUDGE0_TRANSIENT_STATUSES).
+    """
+    return (
+        result.get("status_id") is not None
+        and not result.get("skipped")
+        and result["status_id"] not in JUDGE0_TRANSIENT_STATUSES
+    )
+
+
+def should_stop(result, fail_fast):
+    """
+    Нужно ли прекратить прогон после этого результата в режиме fail_fast.
+    """
+    if not fail_fast or result.get("status_id") is None:
+        return False
+    if result["status_id"] == JUDGE0_STATUS_COMPILATION_ERROR:
+        return True
+    return fail_fast == FAIL_FAST_FIRST_FAILURE and result["status_id"] != JUDGE0_STATUS_ACCEPTED
+
+
+def finish_result(idx, result, fail_fast, on_result):
+    """
+    Сообщает on_result(idx, result) о готовом тесткейсе и решает, нужно ли прекратить прогон:
+    либо этого требует fail_fast, либо on_result вернул False (прогон отменён).
+    """
+    cancelled = on_result is not None and on_result(idx, result) is False
+    return cancelled or should_stop(result, fail_fast)
+
+
+def build_submission(language_id, encoded_source_code, testcase, callback_url=None):
+    """
+    Формирует тело сабмишена Judge0 для одного тесткейса (все поля в base64).
+    Если передан callback_url, Judge0 отправит туда результат после завершения.
+    """
+    stdin = testcase.get("stdin", "")
+    expected_output = str(testcase.get("expected_output", ""))
+    submission = {
+        "language_id": language_id,
+        "source_code": encoded_source_code,
+        "stdin": encode_base64(stdin),
+        "expected_output": encode_base64(expected_output)
+    }
+    if callback_url:
+        submission["callback_url"] = callback_url
+    return submission
+
+
+def build_answer(results, judge_stats=None):
+    """
+    Собирает итоговый ответ из результатов по каждому тесткейсу.
+    Каждый результат — словарь вида:
+    {"token": <токен или "Ошибка">, "status_id": <id статуса Judge0 или None>, "stderr": <stderr или None>}
+    Тесткейсы, пропущенные в режиме fail_fast ("skipped": True), не считаются ни правильными,
+    ни неправильными и попадают в skipped_test_indexes.
+    Тесткейсы, которые не удалось отправить или опросить (token "Ошибка"), попадают в error_test_indexes,
+    а не в incorrect_test_indexes: это сбой связи с Judge0, а не неверный ответ.
+    judge_stats — счётчики запросов к Judge0 (запросы, повторы, 429, отказы), если они есть.
+    В metrics попадает сводка по времени и памяти (см. summarize_metrics).
+    """
+    tests_count = len(results)
+    correct_tests_count = 0
+    incorrect_test_indexes = []
+    skipped_test_indexes = []
+    error_test_indexes = []
+    tokens = []
+    first_stderr = None  # переменная для хранения первого ненулевого stderr
+
+    for idx, result in enumerate(results):
+        tokens.append(result["token"])
+        if result.get("skipped"):
+            skipped_test_indexes.append(idx)
+            continue
+        if result["token"] == "Ошибка":
+            error_test_indexes.append(idx)
+            # Если еще не установлен stderr, можно установить значение по умолчанию
+            if first_stderr is None:
+                first_stderr = "Правильно"
+            continue
+
+        # Если значение stderr еще не установлено и в ответе оно не None, сохраняем его
+        if first_stderr is None and result.get("stderr") is not None:
+            first_stderr = result.get("stderr")
+
+        if result["status_id"] == 3:
+            correct_tests_count += 1
+        else:
+            incorrect_test_indexes.append(idx)
+
+    status = 1 if correct_tests_count == tests_count else 0
+
+    answer = {
+        "tests_count": tests_count,
+        "status": status,
+        "stderr": first_stderr if first_stderr is not None else "Правильно",
+        "tokens": tokens,
+        "correct_tests_count": correct_tests_count,
+        "incorrect_test_indexes": incorrect_test_indexes,
+        "skipped_test_indexes": skipped_test_indexes,
+        "error_test_indexes": error_test_indexes,
+        "metrics": summarize_metrics(results),
+        "results": results
+    }
+    if judge_stats is not None:
+        answer["judge_stats"] = judge_stats
+
+    return answer
+
+
+def _run_judge0_testcase(client, language_id, encoded_source_code, testcase):
+    """
+    Отправляет один тесткейс и дожидается его результата.
+    """
+    payload = build_submission(language_id, encoded_source_code, testcase)
+
+    response = client.post("/submissions?base64_encoded=true&wait=false", json=payload)
+    if response is None or response.status_code != 201:
+        return error_result()
+
+    token = response.json().get("token")
+    if not token:
+        return error_result()
+
+    # Опрос API с нарастающей паузой, пока выполнение не завершится
+    delays = poll_delays()
+    while True:
+        result_response = client.get(f"/submissions/{token}?base64_encoded=true")
+        if result_response is None:
+            return error_result()
+        result_data = result_response.json()
+        status_id = result_data["status"]["id"]
+        if status_id in [1, 2]:
+            time.sleep(next(delays))
+        else:
+            break
+
+    return result_from_submission(token, result_data)
+
+
+def run_judge0_testcases(data, fail_fast=None, on_result=None):
     """
     Принимает JSON с данными:
     {
@@ -26,92 +295,375 @@ def run_judge0_testcases(data):
         "stderr": <значение stderr первого теста, где stderr не равен null, или "Правильно">,
         "tokens": ["токены judge0 для каждого тесткейса"],
         "correct_tests_count": <количество правильных тесткейсов>,
-        "incorrect_test_indexes": [<индексы неправильных тесткейсов>]
+        "incorrect_test_indexes": [<индексы неправильных тесткейсов>],
+        "skipped_test_indexes": [<индексы тесткейсов, пропущенных из-за fail_fast>],
+        "error_test_indexes": [<индексы тесткейсов, которые не удалось отправить в Judge0>],
+        "judge_stats": {"requests", "retries", "rate_limited", "failures"},
+        "metrics": {"time": {"max", "p50", "p95"}, "wall_time": {...}, "memory": {...}},
+        "results": [<результат по каждому тесткейсу: {"token", "status_id", "stderr", "time", "wall_time", "memory"}>]
     }
+
+    fail_fast: None, FAIL_FAST_COMPILE или FAIL_FAST_FIRST_FAILURE — после ошибки компиляции
+    (или первого непройденного теста) оставшиеся тесткейсы не отправляются.
+    on_result: необязательный callback on_result(индекс, результат), вызывается по мере готовности
+    каждого тесткейса; если он вернёт False, прогон прекращается, а оставшиеся тесткейсы пропускаются.
     """
     testcases = data.get("testcases", [])
-    tests_count = len(testcases)
-    correct_tests_count = 0
-    incorrect_test_indexes = []
-    tokens = []
-    first_stderr = None  # переменная для хранения первого ненулевого stderr
+    results = []
 
     language_id = data.get("language_id")
     source_code = data.get("source_code")
     # Кодируем исходный код один раз
-    encoded_source_code = base64.b64encode(source_code.encode()).decode("utf-8")
+    encoded_source_code = encode_base64(source_code)
 
-    url = "https://judge0-ce.p.rapidapi.com/submissions?base64_encoded=true&wait=false"
-    headers = {
-        "content-type": "application/json",
-        "x-rapidapi-host": "judge029.p.rapidapi.com",
-        "x-rapidapi-key": os.getenv("RAPIDAPI_KEY")
-    }
+    client = get_judge0_client().for_run()
 
     for idx, testcase in enumerate(testcases):
-        stdin = testcase.get("stdin", "")
-        expected_output = str(testcase.get("expected_output", ""))
+        results.append(_run_judge0_testcase(client, language_id, encoded_source_code, testcase))
+
+        if finish_result(idx, results[-1], fail_fast, on_result):
+            results.extend(skipped_result() for _ in testcases[idx + 1:])
+            break
 
-        encoded_stdin = base64.b64encode(stdin.encode()).decode("utf-8")
-        encoded_expected_output = base64.b64encode(expected_output.encode()).decode("utf-8")
+    return build_answer(results, client.stats)
 
+
+def _submit_batch(client, language_id, encoded_source_code, testcases, callback_url=None, first_index=0):
+    """
+    Отправляет тесткейсы через /submissions/batch порциями по JUDGE0_BATCH_SIZE.
+    Возвращает словарь {токен: индекс тесткейса} для успешно принятых сабмишенов
+    (индексы отсчитываются от first_index).
+    """
+    pending = {}
+    for start in range(0, len(testcases), JUDGE0_BATCH_SIZE):
+        chunk = testcases[start:start + JUDGE0_BATCH_SIZE]
         payload = {
-            "language_id": language_id,
-            "source_code": encoded_source_code,
-            "stdin": encoded_stdin,
-            "expected_output": encoded_expected_output
+            "submissions": [
+                build_submission(language_id, encoded_source_code, tc, callback_url) for tc in chunk
+            ]
         }
-
-        response = requests.post(url, json=payload, headers=headers)
-        if response.status_code != 201:
-            tokens.append("Ошибка")
-            incorrect_test_indexes.append(idx)
-            # Если еще не установлен stderr, можно установить значение по умолчанию
-            if first_stderr is None:
-                first_stderr = "Правильно"
+        response = client.post("/submissions/batch?base64_encoded=true", json=payload)
+        if response is None or response.status_code != 201:
             continue
 
-        token = response.json().get("token")
-        print(token)
-        if not token:
-            tokens.append("Ошибка")
-            incorrect_test_indexes.append(idx)
-            if first_stderr is None:
-                first_stderr = "Правильно"
+        # Ответ — список в том же порядке, что и сабмишены: {"token": ...} или описание ошибки
+        for offset, item in enumerate(response.json()):
+            token = item.get("token") if isinstance(item, dict) else None
+            if token:
+                pending[token] = first_index + start + offset
+    return pending
+
+
+def _skip_pending(pending, results):
+    """
+    Помечает все ещё не завершённые сабмишены как пропущенные и очищает pending.
+    """
+    for token, idx in pending.items():
+        results[idx] = skipped_result(token)
+    pending.clear()
+
+
+def _report_unsubmitted(indexes, pending, results, fail_fast, on_result):
+    """
+    Сообщает on_result о тесткейсах, которые не удалось отправить. Возвращает True, если прогон нужно прервать.
+    """
+    submitted = set(pending.values())
+    for idx in indexes:
+        if idx not in submitted and finish_result(idx, results[idx], fail_fast, on_result):
+            return True
+    return False
+
+
+def _fail_pending(tokens, pending, results, fail_fast, on_result):
+    """
+    Помечает переданные токены как ошибку связи с Judge0. Возвращает True, если прогон нужно прервать
+    (оставшиеся сабмишены при этом помечаются как пропущенные).
+    """
+    for token in tokens:
+        idx = pending.pop(token, None)
+        if idx is None:
             continue
+        results[idx] = error_result()
+        if finish_result(idx, results[idx], fail_fast, on_result):
+            _skip_pending(pending, results)
+            return True
+    return False
+
+
+def _poll_batch(client, pending, results, fail_fast=None, on_result=None, timeout=JUDGE0_POLL_TIMEOUT):
+    """
+    Опрашивает все незавершённые токены через GET /submissions/batch?tokens=...,
+    пока выполнение не завершится, и записывает результаты в results по индексам из pending.
+    В режиме fail_fast (или если on_result вернул False) опрос прекращается,
+    как только встречается результат, требующий остановки.
+    Токены порции помечаются как ошибка связи, если Judge0 так и не ответил после всех повторов
+    или ответил неповторяемой ошибкой (например, 401/404); токены, не завершившиеся за timeout секунд, — тоже.
+    """
+    delays = poll_delays()
+    deadline = time.monotonic() + timeout
+    while pending:
+        tokens = list(pending.keys())
+        for start in range(0, len(tokens), JUDGE0_BATCH_SIZE):
+            chunk = tokens[start:start + JUDGE0_BATCH_SIZE]
+            result_response = client.get(
+                f"/submissions/batch?tokens={','.join(chunk)}"
+                f"&base64_encoded=true&fields=token,status,stderr,compile_output,time,wall_time,memory"
+            )
+            # Повторяемые ошибки (сеть, 429, 5xx) клиент уже повторил, остальные не исправятся сами
+            if result_response is None or result_response.status_code != 200:
+                if _fail_pending(chunk, pending, results, fail_fast, on_result):
+                    return
+                continue
+
+            for result_data in result_response.json().get("submissions", []):
+                if not result_data:
+                    continue
+                status_id = result_data["status"]["id"]
+                if status_id in [1, 2]:
+                    continue
+                token = result_data["token"]
+                idx = pending.pop(token, None)
+                if idx is not None:
+                    results[idx] = result_from_submission(token, result_data)
+                    if finish_result(idx, results[idx], fail_fast, on_result):
+                        _skip_pending(pending, results)
+                        return
+
+        if pending and time.monotonic() >= deadline:
+            _fail_pending(list(pending), pending, results, fail_fast, on_result)
+            return
+        if pending:
+            time.sleep(min(next(delays), max(0.0, deadline - time.monotonic())))
+
+
+def run_judge0_testcases_batch(data, fail_fast=None, on_result=None):
+    """
+    Пакетный вариант run_judge0_testcases: все тесткейсы отправляются через /submissions/batch
+    (порциями по JUDGE0_BATCH_SIZE), а затем все токены опрашиваются одним запросом
+    GET /submissions/batch?tokens=...
+
+    В режиме fail_fast сначала отдельно прогоняется первый тесткейс: если код не компилируется
+    (или первый тест не прошёл при FAIL_FAST_FIRST_FAILURE), остальные тесткейсы не отправляются.
+
+    Принимает и возвращает данные в том же формате, что и run_judge0_testcases.
+    """
+    testcases = data.get("testcases", [])
+    results = [error_result() for _ in testcases]
+
+    language_id = data.get("language_id")
+    encoded_source_code = encode_base64(data.get("source_code"))
+    client = get_judge0_client().for_run()
+
+    first_index = 0
+    if fail_fast and len(testcases) > 1:
+        pending = _submit_batch(client, language_id, encoded_source_code, testcases[:1])
+        stopped = _report_unsubmitted([0], pending, results, fail_fast, on_result)
+        first_result = {}
+        _poll_batch(client, pending, results, on_result=lambda idx, result: first_result.update(result=result))
+        if not stopped and "result" in first_result:
+            stopped = finish_result(0, first_result["result"], fail_fast, on_result)
+        if stopped:
+            results[1:] = [skipped_result() for _ in testcases[1:]]
+            return build_answer(results, client.stats)
+        first_index = 1
+
+    pending = _submit_batch(
+        client, language_id, encoded_source_code, testcases[first_index:], first_index=first_index
+    )
+    if _report_unsubmitted(range(first_index, len(testcases)), pending, results, fail_fast, on_result):
+        _skip_pending(pending, results)
+    _poll_batch(client, pending, results, fail_fast, on_result)
+
+    return build_answer(results, client.stats)
+
+
+def run_judge0_testcases_callback(data, receiver=None, timeout=JUDGE0_CALLBACK_TIMEOUT, fail_fast=None,
+                                  on_result=None):
+    """
+    Вариант run_judge0_testcases без опроса: сабмишены отправляются пакетно с callback_url,
+    и Judge0 сам присылает результаты на локальный приёмник (см. utils/judge0_callback.py).
+    Результаты сообщаются on_result по мере прихода callback-ов; токены, по которым callback не пришёл
+    за timeout секунд, дозапрашиваются обычным опросом (и их callback-и приёмник больше не хранит).
+
+    Принимает и возвращает данные в том же формате, что и run_judge0_testcases.
+    """
+    receiver = receiver or get_callback_receiver()
+    testcases = data.get("testcases", [])
+    results = [error_result() for _ in testcases]
+
+    language_id = data.get("language_id")
+    encoded_source_code = encode_base64(data.get("source_code"))
+    client = get_judge0_client().for_run()
+
+    pending = _submit_batch(client, language_id, encoded_source_code, testcases, receiver.public_url)
+    stopped = _report_unsubmitted(range(len(testcases)), pending, results, fail_fast, on_result)
 
-        tokens.append(token)
-        result_url = f"https://judge0-ce.p.rapidapi.com/submissions/{token}?base64_encoded=true"
-
-        # Опрос API каждые 5 секунд, пока выполнение не завершится
-        while True:
-            result_response = requests.get(result_url, headers=headers)
-            result_data = result_response.json()
-            status_id = result_data["status"]["id"]
-            if status_id in [1, 2]:
-                time.sleep(5)
-            else:
+    if not stopped:
+        for token, result_data in receiver.iter_results(list(pending), timeout):
+            idx = pending.pop(token)
+            results[idx] = result_from_submission(token, result_data)
+            if finish_result(idx, results[idx], fail_fast, on_result):
+                stopped = True
                 break
 
-        # Если значение stderr еще не установлено и в ответе оно не None, сохраняем его
-        if first_stderr is None and result_data.get("stderr") is not None:
-            first_stderr = result_data.get("stderr")
+    receiver.discard(pending)
+    if stopped:
+        _skip_pending(pending, results)
+    _poll_batch(client, pending, results, fail_fast, on_result)
 
-        if status_id == 3:
-            correct_tests_count += 1
-        else:
-            incorrect_test_indexes.append(idx)
+    return build_answer(results, client.stats)
 
-    status = 1 if correct_tests_count == tests_count else 0
 
-    answer = {
-        "tests_count": tests_count,
-        "status": status,
-        "stderr": first_stderr if first_stderr is not None else "Правильно",
-        "tokens": tokens,
-        "correct_tests_count": correct_tests_count,
-        "incorrect_test_indexes": incorrect_test_indexes
-    }
+async def _run_judge0_testcase_async(client, http_client, semaphore, stop_event, fail_fast, on_result, idx,
+                                     language_id, encoded_source_code, testcase):
+    """
+    Отправляет один тесткейс и опрашивает его результат, не занимая больше одного слота семафора.
+    Если другой тесткейс уже выставил stop_event, тесткейс пропускается.
+    """
+    async with semaphore:
+        if stop_event.is_set():
+            return skipped_result()
+        result = await _submit_and_poll_async(client, http_client, stop_event, language_id, encoded_source_code,
+                                              testcase)
+        if not result.get("skipped") and finish_result(idx, result, fail_fast, on_result):
+            stop_event.set()
+        return result
+
+
+async def _submit_and_poll_async(client, http_client, stop_event, language_id, encoded_source_code, testcase):
+    """
+    Отправляет один тесткейс и опрашивает его результат; опрос прерывается, если выставлен stop_event.
+    """
+    payload = build_submission(language_id, encoded_source_code, testcase)
+    response = await client.request_async(
+        http_client, "POST", "/submissions?base64_encoded=true&wait=false", json=payload
+    )
+    if response is None or response.status_code != 201:
+        return error_result()
+
+    token = response.json().get("token")
+    if not token:
+        return error_result()
+
+    delays = poll_delays()
+    while True:
+        result_response = await client.request_async(
+            http_client, "GET", f"/submissions/{token}?base64_encoded=true"
+        )
+        if result_response is None:
+            return error_result()
+        result_data = result_response.json()
+        status_id = result_data["status"]["id"]
+        if status_id not in [1, 2]:
+            break
+        if stop_event.is_set():
+            return skipped_result(token)
+        await asyncio.sleep(next(delays))
+
+    return result_from_submission(token, result_data)
+
+
+async def run_judge0_testcases_async(data, max_in_flight=JUDGE0_MAX_IN_FLIGHT, fail_fast=None, on_result=None):
+    """
+    Асинхронный вариант run_judge0_testcases: тесткейсы отправляются и опрашиваются конкурентно,
+    но одновременно в работе находится не более max_in_flight сабмишенов.
+    Все запросы идут через общий httpx.AsyncClient текущего event loop (см. Judge0Client.async_http_client)
+    и общий с остальными раннерами token bucket; одновременно в работе не больше max_in_flight запросов этого прогона.
+
+    Порядок результатов и индексы в incorrect_test_indexes совпадают с порядком тесткейсов.
+    В режиме fail_fast ещё не отправленные тесткейсы пропускаются, а опрос остальных прекращается.
+    """
+    testcases = data.get("testcases", [])
+    language_id = data.get("language_id")
+    encoded_source_code = encode_base64(data.get("source_code"))
+
+    client = get_judge0_client().for_run()
+    semaphore = asyncio.Semaphore(max_in_flight)
+    stop_event = asyncio.Event()
+    http_client = client.async_http_client()
+    results = await asyncio.gather(*[
+        _run_judge0_testcase_async(
+            client, http_client, semaphore, stop_event, fail_fast, on_result, idx,
+            language_id, encoded_source_code, testcase
+        )
+        for idx, testcase in enumerate(testcases)
+    ])
+
+    return build_answer(list(results), client.stats)
+
+
+def run_judge0_testcases_concurrent(data, max_in_flight=JUDGE0_MAX_IN_FLIGHT, fail_fast=None, on_result=None):
+    """
+    Синхронная обёртка над run_judge0_testcases_async для вызова из Streamlit.
+    Каждый вызов работает в своём asyncio.run, поэтому клиент httpx этого loop закрывается в конце прогона.
+    """
+    async def run():
+        try:
+            return await run_judge0_testcases_async(
+                data, max_in_flight=max_in_flight, fail_fast=fail_fast, on_result=on_result
+            )
+        finally:
+            await get_judge0_client().close_async_http_client()
+
+    return asyncio.run(run())
+
+
+def run_judge0_testcases_cached(data, runner=run_judge0_testcases_batch, cache=None, on_result=None, **runner_kwargs):
+    """
+    Запускает тесткейсы через runner, пропуская те пары (код, тест), результат которых уже есть в кэше.
+    Ключ кэша — хэш (модуль runner, language_id, подготовленный код, stdin, expected_output), см. utils/judge_cache.py:
+    все раннеры Judge0 делят записи между собой, а у локального раннера (utils/local_runner.py) они свои.
+    Кэшируются только окончательные вердикты (см. is_definitive): ошибки связи, пропуски
+    и внутренние сбои Judge0 при следующем прогоне запрашиваются заново.
+
+    Принимает и возвращает данные в том же формате, что и run_judge0_testcases;
+    в ответ дополнительно добавляется "cache": {"hits", "misses", "size"}.
+    on_result вызывается и для результатов из кэша (сразу), и для результатов runner (по мере готовности).
+    Остальные именованные аргументы (например, fail_fast) передаются в runner.
+    """
+    cache = cache or get_judge_cache()
+    testcases = data.get("testcases", [])
+    language_id = data.get("language_id")
+    source_code = data.get("source_code")
+
+    backend = runner.__module__
+    keys = [
+        make_cache_key(language_id, source_code, tc.get("stdin", ""), str(tc.get("expected_output", "")), backend)
+        for tc in testcases
+    ]
+    results = [cache.get(key) for key in keys]
+    missing_indexes = [idx for idx, result in enumerate(results) if result is None]
+
+    cancelled = False
+    for idx, result in enumerate(results):
+        if result is not None and on_result is not None and on_result(idx, result) is False:
+            cancelled = True
+            break
+
+    if cancelled:
+        results = [result if result is not None else skipped_result() for result in results]
+        missing_indexes = []
+
+    runner_on_result = None
+    if on_result is not None:
+        # runner нумерует только промахи кэша, поэтому индексы переводятся обратно в исходные
+        def runner_on_result(missing_idx, result):
+            return on_result(missing_indexes[missing_idx], result)
+
+    judge_stats = None
+    if missing_indexes:
+        missing_data = dict(data, testcases=[testcases[idx] for idx in missing_indexes])
+        missing_answer = runner(missing_data, on_result=runner_on_result, **runner_kwargs)
+        missing_results = missing_answer["results"]
+        judge_stats = missing_answer.get("judge_stats")
+        for idx, result in zip(missing_indexes, missing_results):
+            results[idx] = result
+        cache.set_many([
+            (keys[idx], result) for idx, result in zip(missing_indexes, missing_results)
+            if is_definitive(result)
+        ])
 
+    answer = build_answer(results, judge_stats)
+    answer["cache"] = cache.stats()
     return answer
 
@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.run_tests_on_code import run_judge0_testcases_batch, run_judge0_testcases_cached
+
+# Языки, для которых problem_generator генерирует шаблоны:
+# ключи шаблонов в boilerplate_dict и language_id Judge0
+SOLUTION_LANGUAGES = {
+    "C++": {"template_key": "cppTemplate", "full_key": "fullCpp", "language_id": 54},
+    "JavaScript": {"template_key": "jsTemplate", "full_key": "fullJs", "language_id": 63},
+    "Rust": {"template_key": "rustTemplate", "full_key": "fullRust", "language_id": 73},
+    "Java": {"template_key": "javaTemplate", "full_key": "fullJava", "language_id": 62}
+}
+
+
+def prepare_source_code(boilerplate_dict, language, solution_code):
+    """
+    Подставляет решение в полный шаблон языка (на место ##USER_CODE_HERE##).
+    """
+    full_code = boilerplate_dict.get(SOLUTION_LANGUAGES[language]["full_key"], "")
+    return full_code.replace("##USER_CODE_HERE##", solution_code)
+
+
+def _verify_language(boilerplate_dict, language, solution_code, testcases, runner, use_cache, runner_kwargs):
+    data = {
+        "language_id": SOLUTION_LANGUAGES[language]["language_id"],
+        "source_code": prepare_source_code(boilerplate_dict, language, solution_code),
+        "testcases": testcases
+    }
+    start = time.monotonic()
+    if use_cache:
+        answer = run_judge0_testcases_cached(data, runner=runner, **runner_kwargs)
+    else:
+        answer = runner(data, **runner_kwargs)
+    answer["elapsed"] = time.monotonic() - start
+    return answer
+
+
+def verify_reference_solutions(boilerplate_dict, solutions, testcases, runner=run_judge0_testcases_batch,
+                               max_workers=4, use_cache=True, **runner_kwargs):
+    """
+    Прогоняет эталонные решения на нескольких языках по одному набору тесткейсов параллельно.
+
+    solutions: {"C++": <код функции>, "Java": <код функции>, ...} — языки из SOLUTION_LANGUAGES.
+    testcases: [{"stdin": str, "expected_output": str}, ...]
+    Каждое решение оборачивается в свой полный шаблон из boilerplate_dict (результат problem_generator)
+    и запускается через runner (с кэшем результатов, если use_cache); остальные именованные аргументы
+    передаются в runner.
+
+    Возвращает матрицу {язык: {"status", "tests_count", "correct_tests_count", "incorrect_test_indexes",
+    "error_test_indexes", "stderr", "elapsed"}}, где elapsed — время прогона в секундах.
+    """
+    solutions = {lang: code for lang, code in solutions.items() if lang in SOLUTION_LANGUAGES and code.strip()}
+    if not solutions:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(solutions))) as executor:
+        futures = {
+            lang: executor.submit(
+                _verify_language, boilerplate_dict, lang, code, testcases, runner, use_cache, runner_kwargs
+            )
+            for lang, code in solutions.items()
+        }
+        answers = {lang: future.result() for lang, future in futures.items()}
+
+    matrix = {}
+    for lang, answer in answers.items():
+        matrix[lang] = {
+            "status": answer["status"],
+            "tests_count": answer["tests_count"],
+            "correct_tests_count": answer["correct_tests_count"],
+            "incorrect_test_indexes": answer["incorrect_test_indexes"],
+            "error_test_indexes": answer["error_test_indexes"],
+            "stderr": answer["stderr"],
+            "elapsed": answer["elapsed"]
+        }
+    return matrix